@@ -43,6 +43,14 @@ except ImportError:
     ANALYTICS_AVAILABLE = False
     print("Analytics engine not available")
 
+# Import incremental indicator engine
+try:
+    from src.analytics.indicators import get_indicator_engine
+    INDICATORS_AVAILABLE = True
+except ImportError:
+    INDICATORS_AVAILABLE = False
+    print("Indicator engine not available")
+
 # Import validation and SEO
 try:
     from src.utils import InputValidator, ValidationError, initialize_seo_and_meta
@@ -51,6 +59,9 @@ except ImportError:
     VALIDATION_AVAILABLE = False
     print("Validation module not available")
 
+# Import synthetic market data engine
+from src.data.synthetic_bars import generate_synthetic_bars
+
 # Import live data module (with fallback if not available)
 try:
     from src.data import LiveMarketData, get_market_data_hybrid, get_portfolio_live_prices
@@ -59,6 +70,22 @@ except ImportError:
     LIVE_DATA_AVAILABLE = False
     print("Live data module not available, using synthetic data only")
 
+# Import incremental portfolio valuation
+try:
+    from src.trading.valuation import PortfolioValuationEngine
+    VALUATION_AVAILABLE = True
+except ImportError:
+    VALUATION_AVAILABLE = False
+    print("Valuation engine not available")
+
+# Import streaming tick engine (shared across sessions)
+try:
+    from src.data.tick_engine import get_tick_engine
+    TICK_ENGINE_AVAILABLE = True
+except ImportError:
+    TICK_ENGINE_AVAILABLE = False
+    print("Tick engine not available, using static alerts")
+
 # Initialize enhancements at app start
 if ENHANCEMENTS_AVAILABLE:
     enable_debug_mode()
@@ -967,55 +994,78 @@ def generate_market_data(symbol, days=30, use_live=False):
             print(f"Live data failed, using synthetic: {e}")
     
     # Synthetic data (fallback or default)
-    dates = pd.date_range(end=datetime.now(), periods=days*24*4, freq='15min')
-    
-    # Base prices for known stocks (realistic ranges)
-    base_prices = {
-        'AAPL': 178.0,
-        'GOOGL': 142.0,
-        'MSFT': 385.0,
-        'TSLA': 238.0,
-        'NVDA': 502.0,
-        'AMZN': 145.0,
-        'META': 312.0
-    }
-    
-    base_price = base_prices.get(symbol, random.uniform(50, 500))
-    returns = np.random.normal(0, 0.02, len(dates))
-    price = base_price * (1 + returns).cumprod()
-    
-    # Add some volatility
-    price = price + np.random.normal(0, base_price*0.01, len(dates))
-    
-    df = pd.DataFrame({
-        'timestamp': dates,
-        'open': price,
-        'high': price * (1 + abs(np.random.normal(0, 0.005, len(dates)))),
-        'low': price * (1 - abs(np.random.normal(0, 0.005, len(dates)))),
-        'close': price,
-        'volume': np.random.uniform(1000000, 5000000, len(dates))
-    })
-    
-    return df
+    return generate_synthetic_bars(symbol, days)
+
+PORTFOLIO_POSITIONS = [
+    {'symbol': 'AAPL', 'shares': 50, 'avg_price': 172.50, 'current_price': 178.32},
+    {'symbol': 'GOOGL', 'shares': 25, 'avg_price': 139.80, 'current_price': 142.15},
+    {'symbol': 'MSFT', 'shares': 40, 'avg_price': 378.90, 'current_price': 385.20},
+    {'symbol': 'TSLA', 'shares': 15, 'avg_price': 242.30, 'current_price': 238.75},
+    {'symbol': 'NVDA', 'shares': 30, 'avg_price': 485.20, 'current_price': 502.40},
+]
+
+def get_portfolio_valuation():
+    """
+    This session's valuation engine and holdings table
+
+    Lives in session state, outside any cached function, so every rerun
+    revalues against current quotes. The table is built once in position
+    order and then patched from each ValuationDiff.
+    """
+    valuation = st.session_state.get('portfolio_valuation')
+    if valuation is None:
+        valuation = PortfolioValuationEngine.from_positions(PORTFOLIO_POSITIONS)
+        order = [pos['symbol'] for pos in PORTFOLIO_POSITIONS]
+        holdings = valuation.snapshot().set_index('symbol').loc[order].reset_index()
+        st.session_state['portfolio_valuation'] = valuation
+        st.session_state['portfolio_holdings'] = holdings
+    return valuation, st.session_state['portfolio_holdings']
+
+def get_live_portfolio_data():
+    """
+    Revalue this session's portfolio from the shared quote cache
+
+    Only the positions whose price moved are rewritten in the holdings
+    table; weights follow the new total.
+
+    Returns:
+        DataFrame: Portfolio data in the original position order
+    """
+    valuation, holdings = get_portfolio_valuation()
+    try:
+        quotes = LiveMarketData().get_multiple_quotes(valuation.symbols)
+        diff = valuation.apply_prices({
+            symbol: quote['price'] for symbol, quote in quotes.items()
+            if quote and quote.get('price', 0) > 0
+        })
+    except Exception as e:
+        print(f"Could not fetch live prices: {e}")
+        return holdings
+    
+    if diff:
+        rows = pd.Index(holdings['symbol']).get_indexer(list(diff.changes))
+        changes = list(diff.changes.values())
+        holdings.loc[rows, 'current_price'] = [c.price for c in changes]
+        holdings.loc[rows, 'market_value'] = [c.market_value for c in changes]
+        holdings.loc[rows, 'gain_loss'] = [c.gain_loss for c in changes]
+        holdings.loc[rows, 'gain_loss_pct'] = [c.gain_loss_pct for c in changes]
+        holdings['weight'] = holdings['market_value'] / diff.total_value if diff.total_value else 0.0
+    return holdings
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
 def generate_portfolio_data(use_live=False):
     """
     Generate portfolio data with optional live prices
     
+    Live sessions with the valuation engine use get_live_portfolio_data instead.
+    
     Args:
         use_live: Whether to use live prices (default: False for demo reliability)
         
     Returns:
         DataFrame: Portfolio data
     """
-    positions = [
-        {'symbol': 'AAPL', 'shares': 50, 'avg_price': 172.50, 'current_price': 178.32},
-        {'symbol': 'GOOGL', 'shares': 25, 'avg_price': 139.80, 'current_price': 142.15},
-        {'symbol': 'MSFT', 'shares': 40, 'avg_price': 378.90, 'current_price': 385.20},
-        {'symbol': 'TSLA', 'shares': 15, 'avg_price': 242.30, 'current_price': 238.75},
-        {'symbol': 'NVDA', 'shares': 30, 'avg_price': 485.20, 'current_price': 502.40},
-    ]
+    positions = [dict(pos) for pos in PORTFOLIO_POSITIONS]
     
     # Try to get live prices if enabled
     if use_live and LIVE_DATA_AVAILABLE:
@@ -1439,20 +1489,26 @@ def create_price_chart(df, symbol):
         name=symbol
     ))
     
-    # Add moving averages
-    df['MA20'] = df['close'].rolling(window=20).mean()
-    df['MA50'] = df['close'].rolling(window=50).mean()
+    # Add moving averages (incremental; only new bars are computed and df is left untouched)
+    if INDICATORS_AVAILABLE:
+        indicators = get_indicator_engine().compute(symbol, df.attrs.get('interval', '15m'), df,
+                                                    ['sma:20', 'sma:50'],
+                                                    source=df.attrs.get('source', 'synthetic'))
+        ma20, ma50 = indicators['sma_20'], indicators['sma_50']
+    else:
+        ma20 = df['close'].rolling(window=20).mean()
+        ma50 = df['close'].rolling(window=50).mean()
     
     fig.add_trace(go.Scatter(
         x=df['timestamp'], 
-        y=df['MA20'], 
+        y=ma20, 
         name='MA20',
         line=dict(color='#2AA5B3', width=2)
     ))
     
     fig.add_trace(go.Scatter(
         x=df['timestamp'], 
-        y=df['MA50'], 
+        y=ma50, 
         name='MA50',
         line=dict(color='#1D6F7A', width=2)
     ))
@@ -1516,18 +1572,43 @@ def get_relative_time(minutes_ago):
         days = int(minutes_ago / 1440)
         return f"{days} day{'s' if days != 1 else ''} ago"
 
+WATCHLIST = ['AAPL', 'GOOGL', 'MSFT', 'TSLA', 'NVDA']
+
+def get_tick_subscription():
+    """Subscribe this session to the shared tick stream (one subscription per session)"""
+    subscription = st.session_state.get('tick_subscription')
+    if subscription is None or subscription.closed:
+        engine = get_tick_engine(WATCHLIST)
+        subscription = engine.bus.subscribe(WATCHLIST, policy='conflate')
+        st.session_state['tick_subscription'] = subscription
+    return subscription
+
 def generate_live_alerts():
-    """Generate real-time looking alerts"""
+    """Generate real-time alerts from the shared tick stream"""
     alerts = []
     
-    # Recent trade alert (feels live)
-    alerts.append({
-        'type': 'success',
-        'icon': '✅',
-        'message': f"AAPL crossed $178 resistance",
-        'time': get_relative_time(random.randint(2, 15)),
-        'detail': 'Bullish signal detected'
-    })
+    latest = get_tick_subscription().latest() if TICK_ENGINE_AVAILABLE else {}
+    
+    if latest:
+        # Biggest mover on the watchlist
+        mover = max(latest.values(), key=lambda t: abs(t.change_pct))
+        direction = "up" if mover.change_pct >= 0 else "down"
+        alerts.append({
+            'type': 'success' if mover.change_pct >= 0 else 'warning',
+            'icon': '📈' if mover.change_pct >= 0 else '📉',
+            'message': f"{mover.symbol} {direction} {abs(mover.change_pct):.2f}% at ${mover.price:,.2f}",
+            'time': get_relative_time((datetime.now() - mover.timestamp).total_seconds() / 60),
+            'detail': 'Biggest mover on your watchlist'
+        })
+    else:
+        # Recent trade alert (feels live)
+        alerts.append({
+            'type': 'success',
+            'icon': '✅',
+            'message': f"AAPL crossed $178 resistance",
+            'time': get_relative_time(random.randint(2, 15)),
+            'detail': 'Bullish signal detected'
+        })
     
     # Market alert (real-time feel)
     alerts.append({
@@ -2578,11 +2659,15 @@ Provide helpful, concise advice (2-3 sentences) considering their emotional stat
         
         # Show data source indicator
         if use_live and LIVE_DATA_AVAILABLE:
-            st.caption("📡 Using live portfolio prices (5min cache)")
+            st.caption("📡 Using live portfolio prices (1min quote cache)" if VALUATION_AVAILABLE
+                       else "📡 Using live portfolio prices (5min cache)")
         else:
             st.caption("📊 Using demo portfolio data")
         
-        portfolio_df = generate_portfolio_data(use_live=use_live)
+        if use_live and LIVE_DATA_AVAILABLE and VALUATION_AVAILABLE:
+            portfolio_df = get_live_portfolio_data()
+        else:
+            portfolio_df = generate_portfolio_data(use_live=use_live)
         total_value = portfolio_df['market_value'].sum()
         total_cost = portfolio_df['cost_basis'].sum()
         total_gain = total_value - total_cost
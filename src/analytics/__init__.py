@@ -14,8 +14,38 @@ from .analytics_engine import (
     TradingInsight
 )
 
+# Incremental technical indicators
+from .indicators import IndicatorEngine, get_indicator_engine
+
+# Cross-sectional signal scanning
+from .signal_scanner import SignalScanner, scan_universe
+
+# Batch (multi-portfolio) analytics
+from .batch_analytics import analyze_portfolios
+
+# Historical-returns risk
+from .risk_engine import (
+    RiskEngine,
+    ReturnsMatrix,
+    get_risk_engine,
+    returns_from_prices,
+    returns_from_store
+)
+
+# Correlation clustering and diversification
+from .correlation import CorrelationService, RollingCorrelation, get_correlation_service
+
+# Time- and money-weighted returns
+from .performance import PerformanceIndex, solve_irr
+
 # Cash flow and business analytics (new)
 from .cashflow_engine import CashFlowEngine
+from .cashflow_forecast import CashFlowForecaster, InvoiceIndex
+from .seasonality import SeasonalityModel, SeasonalFactors, get_seasonality_model
+from .scenario_grid import scenario_grid, scenario_heatmap
+
+# Nightly batch health scoring
+from .health_scoring import HealthScoreStore, get_health_score_store, run_batch_scoring, score_health
 
 # Unified insights (new)
 from .unified_insights import UnifiedInsights
@@ -29,8 +59,34 @@ __all__ = [
     'TradingSignal',
     'EmotionalState',
     'TradingInsight',
+    'IndicatorEngine',
+    'get_indicator_engine',
+    'SignalScanner',
+    'scan_universe',
+    'analyze_portfolios',
+    'RiskEngine',
+    'ReturnsMatrix',
+    'get_risk_engine',
+    'returns_from_prices',
+    'returns_from_store',
+    'CorrelationService',
+    'RollingCorrelation',
+    'get_correlation_service',
+    'PerformanceIndex',
+    'solve_irr',
     # Business
     'CashFlowEngine',
+    'CashFlowForecaster',
+    'InvoiceIndex',
+    'SeasonalityModel',
+    'SeasonalFactors',
+    'get_seasonality_model',
+    'scenario_grid',
+    'scenario_heatmap',
+    'HealthScoreStore',
+    'get_health_score_store',
+    'run_batch_scoring',
+    'score_health',
     # Unified
     'UnifiedInsights'
 ]
@@ -11,6 +11,9 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 
+from .indicators import get_indicator_engine
+from .risk_engine import ReturnsMatrix, get_risk_engine
+
 
 class TradingSignal(Enum):
     """Trading signal recommendations"""
@@ -244,12 +247,17 @@ class PortfolioAnalytics:
     """Advanced portfolio analytics and insights"""
     
     @staticmethod
-    def analyze_portfolio_health(portfolio_df: pd.DataFrame) -> Dict[str, Any]:
+    def analyze_portfolio_health(portfolio_df: pd.DataFrame,
+                                 diversification: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Comprehensive portfolio health analysis
         
         Args:
             portfolio_df: DataFrame with portfolio holdings
+            diversification: Optional correlation-based diversification
+                             (see CorrelationService.diversification). When given,
+                             the diversity score counts effective independent bets
+                             instead of weight concentration alone.
             
         Returns:
             dict: Health metrics and recommendations
@@ -259,14 +267,15 @@ class PortfolioAnalytics:
         total_gain = total_value - total_cost
         total_gain_pct = (total_gain / total_cost) * 100
         
-        # Calculate concentration risk
-        portfolio_df['weight'] = portfolio_df['market_value'] / total_value
-        max_concentration = portfolio_df['weight'].max()
+        # Calculate concentration risk (without modifying the caller's frame)
+        weights = portfolio_df['market_value'] / total_value
+        max_concentration = weights.max()
         
         # Calculate diversity score (0-100)
         num_positions = len(portfolio_df)
-        herfindahl_index = (portfolio_df['weight'] ** 2).sum()
-        diversity_score = min(100, (1 - herfindahl_index) * 150)  # Normalized
+        herfindahl_index = (weights ** 2).sum()
+        effective_positions = diversification['effective_bets'] if diversification else 1 / herfindahl_index
+        diversity_score = min(100, (1 - 1 / effective_positions) * 150)  # Normalized
         
         # Assess risk level
         if max_concentration > 0.40:
@@ -303,12 +312,14 @@ class PortfolioAnalytics:
             'diversity_score': round(diversity_score, 1),
             'num_positions': num_positions,
             'max_concentration': round(max_concentration * 100, 1),
+            'effective_bets': diversification['effective_bets'] if diversification else None,
+            'largest_cluster_pct': diversification['largest_cluster_pct'] if diversification else None,
             'risk_level': risk_level,
             'risk_message': risk_message,
             'sharpe_ratio': round(sharpe_ratio, 2),
             'performance_rating': performance_rating,
             'recommendations': PortfolioAnalytics._generate_portfolio_recommendations(
-                portfolio_df, max_concentration, diversity_score, total_gain_pct
+                portfolio_df, max_concentration, diversity_score, total_gain_pct, diversification
             )
         }
     
@@ -316,7 +327,8 @@ class PortfolioAnalytics:
     def _generate_portfolio_recommendations(portfolio_df: pd.DataFrame,
                                            max_concentration: float,
                                            diversity_score: float,
-                                           return_pct: float) -> List[str]:
+                                           return_pct: float,
+                                           diversification: Optional[Dict[str, Any]] = None) -> List[str]:
         """Generate specific portfolio recommendations"""
         recommendations = []
         
@@ -336,15 +348,24 @@ class PortfolioAnalytics:
                 "🎯 Improve sector diversification - currently too concentrated"
             )
         
-        # Check for sector concentration (simplified - assumes tech heavy)
-        tech_stocks = ['AAPL', 'GOOGL', 'MSFT', 'NVDA', 'META']
-        tech_value = portfolio_df[portfolio_df['symbol'].isin(tech_stocks)]['market_value'].sum()
-        tech_pct = (tech_value / portfolio_df['market_value'].sum()) * 100
-        
-        if tech_pct > 70:
-            recommendations.append(
-                f"💼 Tech stocks represent {tech_pct:.0f}% of portfolio - consider diversifying into other sectors"
-            )
+        # Check for concentration in positions that move together (correlation clusters)
+        if diversification and len(diversification['clusters'][0]['symbols']) > 1:
+            cluster = diversification['clusters'][0]
+            if cluster['weight_pct'] > 70:
+                recommendations.append(
+                    f"💼 {', '.join(cluster['symbols'][:5])} move together and represent "
+                    f"{cluster['weight_pct']:.0f}% of portfolio - consider diversifying into less correlated assets"
+                )
+        elif diversification is None:
+            # No correlation data: fall back to the sector heuristic (assumes tech heavy)
+            tech_stocks = ['AAPL', 'GOOGL', 'MSFT', 'NVDA', 'META']
+            tech_value = portfolio_df[portfolio_df['symbol'].isin(tech_stocks)]['market_value'].sum()
+            tech_pct = (tech_value / portfolio_df['market_value'].sum()) * 100
+            
+            if tech_pct > 70:
+                recommendations.append(
+                    f"💼 Tech stocks represent {tech_pct:.0f}% of portfolio - consider diversifying into other sectors"
+                )
         
         # Winner/loser analysis
         losers = portfolio_df[portfolio_df['gain_loss_pct'] < -10]
@@ -364,16 +385,23 @@ class PortfolioAnalytics:
         return recommendations
     
     @staticmethod
-    def calculate_risk_metrics(portfolio_df: pd.DataFrame) -> Dict[str, Any]:
+    def calculate_risk_metrics(portfolio_df: pd.DataFrame,
+                               returns: Optional[ReturnsMatrix] = None) -> Dict[str, Any]:
         """
         Calculate portfolio risk metrics
         
         Args:
             portfolio_df: DataFrame with portfolio holdings
+            returns: Optional historical returns matrix (see risk_engine.returns_from_store).
+                     When given, VaR/CVaR, volatility, drawdown and beta come
+                     from price history instead of the cross-sectional approximation.
             
         Returns:
             dict: Risk metrics
         """
+        if returns is not None and set(portfolio_df['symbol']) & set(returns.symbols) and returns.window > 1:
+            return PortfolioAnalytics._historical_risk_metrics(portfolio_df, returns)
+        
         # Value at Risk (simplified)
         returns = portfolio_df['gain_loss_pct'] / 100
         total_value = portfolio_df['market_value'].sum()
@@ -404,6 +432,48 @@ class PortfolioAnalytics:
             'risk_category': risk_category,
             'downside_risk': round(returns[returns < 0].std() * np.sqrt(252) * 100, 2)
         }
+    
+    @staticmethod
+    def _historical_risk_metrics(portfolio_df: pd.DataFrame,
+                                 returns: ReturnsMatrix) -> Dict[str, Any]:
+        """
+        Risk metrics from the historical returns of the current allocation
+
+        Weights are normalized over the symbols with return history, so the
+        dollar VaR/CVaR are scaled by the value of those holdings only; the
+        rest is reported as uncovered_pct.
+        """
+        allocation = portfolio_df.groupby('symbol')['market_value'].sum().to_dict()
+        total_value = portfolio_df['market_value'].sum()
+        universe = set(returns.symbols)
+        covered_value = sum(v for s, v in allocation.items() if s in universe)
+        risk = get_risk_engine().analyze(allocation, returns, portfolio_value=covered_value)
+        
+        # Without a stored benchmark, fall back to the volatility ratio
+        beta = risk['beta']
+        if np.isnan(beta):
+            beta = risk['volatility_annual'] / 0.15
+        
+        if beta > 1.3:
+            risk_category = "Aggressive"
+        elif beta > 1.1:
+            risk_category = "Growth-Oriented"
+        elif beta > 0.9:
+            risk_category = "Moderate"
+        else:
+            risk_category = "Conservative"
+        
+        return {
+            'var_95_daily': round(risk['var_historical_amount'], 2),
+            'cvar_95_daily': round(risk['cvar_historical_amount'], 2),
+            'var_95_parametric': round(risk['var_parametric_amount'], 2),
+            'max_drawdown': round(risk['max_drawdown'] * 100, 2),
+            'volatility_annual': round(risk['volatility_annual'] * 100, 2),
+            'beta': round(beta, 2),
+            'risk_category': risk_category,
+            'downside_risk': round(risk['downside_risk'] * 100, 2),
+            'uncovered_pct': round(float(1 - covered_value / total_value) * 100, 2) if total_value else 0.0
+        }
 
 
 class MarketInsights:
@@ -471,7 +541,9 @@ class MarketInsights:
     
     @staticmethod
     def generate_trading_signal(symbol: str, price: float, 
-                               emotional_state: str) -> Dict[str, Any]:
+                               emotional_state: str,
+                               bars: Optional[pd.DataFrame] = None,
+                               interval: str = '15m') -> Dict[str, Any]:
         """
         Generate comprehensive trading signal
         
@@ -479,14 +551,40 @@ class MarketInsights:
             symbol: Stock symbol
             price: Current price
             emotional_state: Current emotional state
+            bars: Optional OHLCV history; RSI/MACD are updated incrementally from it
+                  (neutral when omitted)
+            interval: Bar interval of `bars` (indicator cache key)
             
         Returns:
             dict: Trading signal with reasoning
         """
-        # Simulated technical indicators (in production, calculate from real data)
-        rsi = np.random.uniform(30, 70)
-        macd_signal = np.random.choice(['bullish', 'bearish', 'neutral'])
-        volume_trend = np.random.choice(['increasing', 'decreasing', 'stable'])
+        # Technical indicators from the shared incremental engine. Without
+        # bars there is nothing to score, so RSI/MACD stay neutral.
+        latest = {}
+        if bars is not None and len(bars) > 0:
+            latest = get_indicator_engine().compute(
+                symbol, interval, bars, ['rsi:14', 'macd:12,26,9'],
+                source=bars.attrs.get('source', 'live')
+            ).iloc[-1].to_dict()
+        
+        rsi = latest.get('rsi_14', np.nan)
+        rsi = 50.0 if np.isnan(rsi) else rsi
+        
+        macd_hist = latest.get('macd_hist', np.nan)
+        if np.isnan(macd_hist) or macd_hist == 0:
+            macd_signal = 'neutral'
+        else:
+            macd_signal = 'bullish' if macd_hist > 0 else 'bearish'
+        
+        volume_trend = 'stable'
+        if bars is not None and 'volume' in bars and len(bars) >= 20:
+            recent_volume = bars['volume'].iloc[-5:].mean()
+            baseline_volume = bars['volume'].iloc[-20:].mean()
+            if baseline_volume > 0:
+                if recent_volume > baseline_volume * 1.1:
+                    volume_trend = 'increasing'
+                elif recent_volume < baseline_volume * 0.9:
+                    volume_trend = 'decreasing'
         
         # Determine signal
         bullish_score = 0
@@ -532,6 +630,11 @@ class MarketInsights:
             'action': action,
             'confidence': round(confidence, 1),
             'price': price,
+            'indicators': {
+                'rsi': round(rsi, 1),
+                'macd_signal': macd_signal,
+                'volume_trend': volume_trend
+            },
             'reasoning': MarketInsights._generate_reasoning(
                 signal, rsi, macd_signal, emotional_state
             ),
@@ -568,13 +671,15 @@ class MarketInsights:
 
 
 def generate_daily_insights(portfolio_df: pd.DataFrame, 
-                           emotions: Dict[str, float]) -> List[TradingInsight]:
+                           emotions: Dict[str, float],
+                           diversification: Optional[Dict[str, Any]] = None) -> List[TradingInsight]:
     """
     Generate comprehensive daily trading insights
     
     Args:
         portfolio_df: Current portfolio holdings
         emotions: Current emotional state
+        diversification: Optional correlation-based diversification for the holdings
         
     Returns:
         list: Daily trading insights
@@ -598,7 +703,7 @@ def generate_daily_insights(portfolio_df: pd.DataFrame,
         ))
     
     # Portfolio health
-    portfolio_health = PortfolioAnalytics.analyze_portfolio_health(portfolio_df)
+    portfolio_health = PortfolioAnalytics.analyze_portfolio_health(portfolio_df, diversification)
     if portfolio_health['risk_level'] in ['High', 'Medium-High']:
         insights.append(TradingInsight(
             title="⚠️ Portfolio Risk Alert",
@@ -3,163 +3,77 @@ Cash Flow Engine Module
 Provides cash flow forecasting, runway calculation, and financial insights
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence, Union
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import streamlit as st
 
+from .cashflow_forecast import CashFlowForecaster, InvoiceIndex
+from .seasonality import SeasonalFactors, get_seasonality_model
+from .scenario_grid import scenario_grid
+
 class CashFlowEngine:
     """Manages cash flow analysis and forecasting for freelancers"""
     
     @staticmethod
-    @st.cache_data(ttl=300)
+    @st.cache_data(ttl=300, hash_funcs={InvoiceIndex: InvoiceIndex.fingerprint})
     def forecast_cash_flow(income_history: pd.DataFrame,
                           expense_history: pd.DataFrame,
-                          outstanding_invoices: List[Dict[str, Any]],
-                          forecast_days: int = 90) -> Dict[str, Any]:
+                          outstanding_invoices: Union[List[Dict[str, Any]], InvoiceIndex],
+                          forecast_days: int = 90,
+                          seed: Optional[int] = None,
+                          user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Forecast cash flow for next N days
         
         Args:
             income_history: Historical income data
             expense_history: Historical expense data
-            outstanding_invoices: Invoices awaiting payment
+            outstanding_invoices: Invoices awaiting payment (or a prebuilt InvoiceIndex)
             forecast_days: Days to forecast
+            seed: Random seed for a reproducible forecast
+            user_id: Key of the user's fitted seasonality
             
         Returns:
-            dict: Cash flow forecast with confidence bands
+            dict: Cash flow forecast with Monte Carlo confidence bands
         """
-        # Calculate historical patterns
-        if not income_history.empty:
-            avg_monthly_income = income_history.groupby(
-                income_history['date'].dt.to_period('M')
-            )['amount'].sum().mean()
-        else:
-            avg_monthly_income = 5000  # Default
-        
-        if not expense_history.empty:
-            avg_monthly_expenses = expense_history.groupby(
-                expense_history['date'].dt.to_period('M')
-            )['amount'].sum().mean()
-        else:
-            avg_monthly_expenses = 2000  # Default
-        
-        # Detect seasonality (simplified)
-        seasonality_factor = CashFlowEngine._detect_seasonality(income_history)
-        
-        # Project future dates
-        forecast_dates = pd.date_range(
-            start=datetime.now(),
-            periods=forecast_days,
-            freq='D'
-        )
-        
-        # Project income
-        daily_income_base = avg_monthly_income / 30
-        projected_income = []
-        
-        for i, date in enumerate(forecast_dates):
-            # Apply seasonality
-            seasonal_mult = seasonality_factor.get(date.month, 1.0)
-            
-            # Add some randomness but trending toward average
-            income = daily_income_base * seasonal_mult * np.random.uniform(0.7, 1.3)
-            
-            # Add known invoices
-            for inv in outstanding_invoices:
-                inv_due = inv.get('due_date')
-                if isinstance(inv_due, str):
-                    inv_due = datetime.fromisoformat(inv_due)
-                
-                if inv_due and inv_due.date() == date.date():
-                    # 70% probability they pay on time
-                    if np.random.random() < 0.7:
-                        income += inv.get('total', 0)
-            
-            projected_income.append(income)
-        
-        # Project expenses
-        daily_expense_base = avg_monthly_expenses / 30
-        projected_expenses = []
-        
-        for i, date in enumerate(forecast_dates):
-            # Expenses more stable than income
-            expense = daily_expense_base * np.random.uniform(0.8, 1.2)
-            projected_expenses.append(expense)
-        
-        # Calculate cumulative cash flow
-        net_daily = np.array(projected_income) - np.array(projected_expenses)
-        cumulative_cf = np.cumsum(net_daily)
-        
-        # Calculate confidence bands (simulate uncertainty)
-        confidence_high = cumulative_cf * 1.2
-        confidence_low = cumulative_cf * 0.8
-        
-        forecast_df = pd.DataFrame({
-            'date': forecast_dates,
-            'projected_income': projected_income,
-            'projected_expenses': projected_expenses,
-            'net_cash_flow': net_daily,
-            'cumulative_cash_flow': cumulative_cf,
-            'confidence_high': confidence_high,
-            'confidence_low': confidence_low
-        })
-        
-        return {
-            'forecast': forecast_df,
-            'summary': {
-                'avg_monthly_income': avg_monthly_income,
-                'avg_monthly_expenses': avg_monthly_expenses,
-                'avg_monthly_net': avg_monthly_income - avg_monthly_expenses,
-                'forecast_end_balance': cumulative_cf[-1],
-                'total_projected_income': sum(projected_income),
-                'total_projected_expenses': sum(projected_expenses),
-                'forecast_accuracy': 'Medium'  # Based on historical data volume
-            }
-        }
+        seasonality = get_seasonality_model().fit(user_id, income_history)
+        forecaster = CashFlowForecaster(income_history, expense_history,
+                                        outstanding_invoices, seasonality)
+        return forecaster.forecast(forecast_days, seed=seed)
     
     @staticmethod
-    def _detect_seasonality(income_history: pd.DataFrame) -> Dict[int, float]:
-        """Detect seasonal patterns in income"""
-        if income_history.empty or len(income_history) < 180:  # Need 6+ months
-            return {i: 1.0 for i in range(1, 13)}  # No seasonality
-        
-        # Group by month and calculate average
-        monthly_avg = income_history.groupby(
-            income_history['date'].dt.month
-        )['amount'].mean()
-        
-        overall_avg = monthly_avg.mean()
-        
-        # Calculate seasonal factors
-        seasonal_factors = {}
-        for month in range(1, 13):
-            if month in monthly_avg.index:
-                seasonal_factors[month] = monthly_avg[month] / overall_avg
-            else:
-                seasonal_factors[month] = 1.0
-        
-        return seasonal_factors
+    def _detect_seasonality(income_history: pd.DataFrame,
+                            user_id: Optional[str] = None) -> Dict[int, float]:
+        """Month (1-12) -> income multiplier from the shared seasonality model"""
+        return get_seasonality_model().fit(user_id, income_history).month_dict()
     
     @staticmethod
     def calculate_runway(current_balance: float,
                         monthly_burn_rate: float,
-                        monthly_income: float = 0) -> Dict[str, Any]:
+                        monthly_income: float = 0,
+                        seasonality: Optional[SeasonalFactors] = None) -> Dict[str, Any]:
         """
         Calculate financial runway
         
         Args:
             current_balance: Current cash balance
             monthly_burn_rate: Monthly expenses
-            monthly_income: Expected monthly income
+            monthly_income: Expected monthly income (seasonal average)
+            seasonality: Fitted factors; income then follows the coming
+                months' seasonal pattern instead of a flat average
             
         Returns:
             dict: Runway calculation
         """
         net_burn = monthly_burn_rate - monthly_income
+        seasonal_runway = None
+        if seasonality is not None:
+            # Lean months can exhaust cash even when the yearly average is positive
+            seasonal_runway = seasonality.runway_months(current_balance, monthly_income, monthly_burn_rate)
         
-        if net_burn <= 0:
+        if net_burn <= 0 and (seasonal_runway is None or seasonal_runway == float('inf')):
             return {
                 'runway_months': float('inf'),
                 'runway_days': float('inf'),
@@ -168,7 +82,10 @@ class CashFlowEngine:
                 'recommendation': 'Consider investing surplus cash or building emergency fund.'
             }
         
-        runway_months = current_balance / net_burn
+        if seasonal_runway is not None and seasonal_runway != float('inf'):
+            runway_months = seasonal_runway
+        else:
+            runway_months = current_balance / net_burn
         runway_days = runway_months * 30
         
         if runway_months < 3:
@@ -196,6 +113,7 @@ class CashFlowEngine:
             'monthly_income': monthly_income,
             'net_monthly_burn': net_burn,
             'cash_positive': False,
+            'seasonal': seasonal_runway is not None,
             'status': status,
             'message': message,
             'recommendation': recommendation,
@@ -295,7 +213,8 @@ class CashFlowEngine:
     def scenario_analysis(current_balance: float,
                          monthly_income: float,
                          monthly_expenses: float,
-                         scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                         scenarios: List[Dict[str, Any]],
+                         seasonality: Optional[SeasonalFactors] = None) -> List[Dict[str, Any]]:
         """
         Run what-if scenario analysis
         
@@ -304,15 +223,28 @@ class CashFlowEngine:
             monthly_income: Current monthly income
             monthly_expenses: Current monthly expenses
             scenarios: List of scenario definitions
+            seasonality: Fitted factors for seasonal runway and balances
             
         Returns:
             list: Scenario analysis results
         """
         results = []
         
+        def runway(income: float, expenses: float) -> float:
+            if seasonality is not None:
+                months = seasonality.runway_months(current_balance, income, expenses)
+                if months != float('inf'):
+                    return months
+            return current_balance / (expenses - income) if expenses > income else float('inf')
+        
+        def balance_in(months: int, income: float, expenses: float) -> float:
+            if seasonality is not None:
+                return float(seasonality.balance_path(current_balance, income, expenses, months)[-1])
+            return current_balance + (income - expenses) * months
+        
         # Base case
         base_net = monthly_income - monthly_expenses
-        base_runway = current_balance / (monthly_expenses - monthly_income) if monthly_expenses > monthly_income else float('inf')
+        base_runway = runway(monthly_income, monthly_expenses)
         
         results.append({
             'name': 'Current Baseline',
@@ -321,8 +253,8 @@ class CashFlowEngine:
             'monthly_expenses': monthly_expenses,
             'net_monthly': base_net,
             'runway_months': base_runway,
-            'balance_in_6_months': current_balance + (base_net * 6),
-            'balance_in_12_months': current_balance + (base_net * 12)
+            'balance_in_6_months': balance_in(6, monthly_income, monthly_expenses),
+            'balance_in_12_months': balance_in(12, monthly_income, monthly_expenses)
         })
         
         # Run each scenario
@@ -333,7 +265,7 @@ class CashFlowEngine:
             new_income = monthly_income * (1 + income_change / 100)
             new_expenses = monthly_expenses * (1 + expense_change / 100)
             new_net = new_income - new_expenses
-            new_runway = current_balance / (new_expenses - new_income) if new_expenses > new_income else float('inf')
+            new_runway = runway(new_income, new_expenses)
             
             results.append({
                 'name': scenario.get('name', 'Scenario'),
@@ -343,8 +275,8 @@ class CashFlowEngine:
                 'monthly_expenses': new_expenses,
                 'net_monthly': new_net,
                 'runway_months': new_runway,
-                'balance_in_6_months': current_balance + (new_net * 6),
-                'balance_in_12_months': current_balance + (new_net * 12),
+                'balance_in_6_months': balance_in(6, new_income, new_expenses),
+                'balance_in_12_months': balance_in(12, new_income, new_expenses),
                 'vs_baseline': {
                     'income_delta': new_income - monthly_income,
                     'expense_delta': new_expenses - monthly_expenses,
@@ -355,6 +287,37 @@ class CashFlowEngine:
         
         return results
     
+    @staticmethod
+    def scenario_grid(current_balance: float,
+                      monthly_income: float,
+                      monthly_expenses: float,
+                      income_shocks: Sequence[float] = (0,),
+                      expense_shocks: Sequence[float] = (0,),
+                      client_losses: Sequence[float] = (0,),
+                      horizons: Sequence[int] = (6, 12),
+                      seasonality: Optional[SeasonalFactors] = None) -> pd.DataFrame:
+        """
+        Stress-test grid: every combination of shocks in one vectorized pass
+        
+        Args:
+            current_balance: Current cash balance
+            monthly_income: Current monthly income
+            monthly_expenses: Current monthly expenses
+            income_shocks: Income changes in percent
+            expense_shocks: Expense changes in percent
+            client_losses: Income lost to departing clients in percent
+                (see scenario_grid.client_loss_shares)
+            horizons: Months at which to report the balance
+            seasonality: Fitted factors for seasonal income
+            
+        Returns:
+            pd.DataFrame: Runway and end balance per cell (pivot with
+            scenario_grid.scenario_heatmap)
+        """
+        return scenario_grid(current_balance, monthly_income, monthly_expenses,
+                             income_shocks, expense_shocks, client_losses, horizons,
+                             seasonality=seasonality)
+    
     @staticmethod
     @st.cache_data(ttl=300)
     def get_financial_health_score(balance: float,
@@ -362,7 +325,8 @@ class CashFlowEngine:
                                    monthly_expenses: float,
                                    debt: float,
                                    emergency_fund: float,
-                                   income_diversity_score: float) -> Dict[str, Any]:
+                                   income_diversity_score: float,
+                                   seasonality: Optional[SeasonalFactors] = None) -> Dict[str, Any]:
         """
         Calculate overall financial health score (0-100)
         
@@ -373,6 +337,8 @@ class CashFlowEngine:
             debt: Total debt
             emergency_fund: Emergency fund balance
             income_diversity_score: Income concentration score (0-100, lower is better)
+            seasonality: Fitted factors; cash flow is then scored on the
+                coming quarter's seasonal income
             
         Returns:
             dict: Financial health assessment
@@ -392,7 +358,10 @@ class CashFlowEngine:
         score_components['runway'] = runway_score
         
         # 2. Cash flow (25 points max)
-        net_cash_flow = monthly_income - monthly_expenses
+        expected_income = monthly_income
+        if seasonality is not None:
+            expected_income = monthly_income * float(seasonality.months_ahead(3).mean())
+        net_cash_flow = expected_income - monthly_expenses
         if net_cash_flow > monthly_expenses * 0.3:  # 30% profit margin
             cashflow_score = 25
         elif net_cash_flow > 0:
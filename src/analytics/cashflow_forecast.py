@@ -0,0 +1,423 @@
+"""
+Cash Flow Forecasting
+Horizon-wide income/expense projection over pre-indexed outstanding invoices
+
+Best Practices Implemented:
+- Invoices parsed and sorted by due day once: no per-day rescans or
+  repeated due_date string parsing
+- Forecast window located with a binary search, invoice amounts bucketed
+  into days with a single bincount
+- Income, expense, net and cumulative vectors for the whole horizon built
+  in single NumPy operations (O(days + invoices in window))
+- Seasonality applied as month x weekday table lookups instead of a
+  dict get per day
+- Monte Carlo bands from thousands of paths simulated in vectorized
+  chunks (per-invoice payment delays, separate income/expense
+  volatility), seeded through a numpy Generator for reproducible results
+"""
+
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+from datetime import datetime
+import hashlib
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .seasonality import SeasonalFactors
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MONTHLY_INCOME = 5000     # Used when there is no income history
+DEFAULT_MONTHLY_EXPENSES = 2000   # Used when there is no expense history
+ON_TIME_PAYMENT_PROB = 0.7        # Chance an invoice is paid on its due date
+BAND_WIDTH = 0.2                  # +/- band when no paths are simulated
+DEFAULT_MEAN_DELAY_DAYS = 14      # Mean lateness of invoices not paid on time
+MAX_OVERDUE_DAYS = 90             # Older overdue invoices are treated as uncollectable
+INCOME_VOLATILITY = 0.17          # Daily lognormal sigma of base income
+EXPENSE_VOLATILITY = 0.12         # Expenses more stable than income
+DEFAULT_PATHS = 2000
+DEFAULT_CHUNK_SIZE = 500          # Paths per vectorized batch
+BAND_PATHS = 1000                 # Paths behind forecast() confidence bands
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+
+InvoicesLike = Union['InvoiceIndex', pd.DataFrame, Iterable[Dict[str, Any]], None]
+
+
+def _to_days(values: Any) -> np.ndarray:
+    """Dates (strings, datetimes, Timestamps) to datetime64[D]; unparseable -> NaT"""
+    series = pd.Series(values, dtype=object)
+    try:
+        parsed = pd.to_datetime(series, errors='coerce', format='mixed')
+    except ValueError:
+        # Mixed UTC offsets: parse one by one (still once per index build)
+        parsed = pd.to_datetime(series.map(_naive_timestamp), errors='coerce')
+    if getattr(parsed.dt, 'tz', None) is not None:
+        parsed = parsed.dt.tz_localize(None)  # Keep wall-clock date, as datetime.date() does
+    return parsed.values.astype('datetime64[D]')
+
+
+def _naive_timestamp(value: Any) -> Optional[pd.Timestamp]:
+    try:
+        ts = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return None
+    return ts.tz_localize(None) if ts.tzinfo is not None else ts
+
+
+class InvoiceIndex:
+    """
+    Outstanding invoices sorted by due day
+
+    Built once from invoice dicts or a DataFrame; day-range lookups are a
+    binary search over the sorted due days. Each invoice carries its own
+    payment-delay distribution: paid on the due day with probability
+    `on_time_prob`, otherwise an exponential delay with mean `mean_delay`.
+    """
+
+    def __init__(self, due_days: np.ndarray, amounts: np.ndarray,
+                 on_time_prob: Optional[np.ndarray] = None,
+                 mean_delay: Optional[np.ndarray] = None):
+        order = np.argsort(due_days, kind='stable')
+        self.due_days = np.asarray(due_days, dtype=np.int64)[order]
+        self.amounts = np.asarray(amounts, dtype=float)[order]
+        n = len(self.due_days)
+        self.on_time_prob = (np.full(n, ON_TIME_PAYMENT_PROB) if on_time_prob is None
+                             else np.asarray(on_time_prob, dtype=float)[order])
+        self.mean_delay = (np.full(n, float(DEFAULT_MEAN_DELAY_DAYS)) if mean_delay is None
+                           else np.asarray(mean_delay, dtype=float)[order])
+
+    @classmethod
+    def from_records(cls, invoices: Iterable[Dict[str, Any]]) -> 'InvoiceIndex':
+        """
+        Index invoice dicts with 'due_date' (str/datetime) and 'total'
+
+        Optional per-invoice 'on_time_probability' and 'expected_delay_days'
+        override the payment-delay defaults. Invoices without a parseable
+        due date are skipped.
+        """
+        invoices = list(invoices)
+        due = [inv.get('due_date') for inv in invoices]
+        totals = np.array([inv.get('total', 0) or 0 for inv in invoices], dtype=float)
+        on_time = np.array([inv.get('on_time_probability', ON_TIME_PAYMENT_PROB) for inv in invoices], dtype=float)
+        delay = np.array([inv.get('expected_delay_days', DEFAULT_MEAN_DELAY_DAYS) for inv in invoices], dtype=float)
+        return cls._from_columns(due, totals, on_time, delay)
+
+    @classmethod
+    def from_frame(cls, invoices: pd.DataFrame) -> 'InvoiceIndex':
+        """Index an invoice DataFrame with 'due_date' and 'total' columns"""
+        if invoices.empty:
+            return cls(np.empty(0, dtype=np.int64), np.empty(0))
+        def column(name: str, default: float) -> np.ndarray:
+            if name not in invoices:
+                return np.full(len(invoices), float(default))
+            return invoices[name].fillna(default).to_numpy(dtype=float)
+
+        return cls._from_columns(invoices['due_date'].to_numpy(dtype=object), column('total', 0),
+                                 column('on_time_probability', ON_TIME_PAYMENT_PROB),
+                                 column('expected_delay_days', DEFAULT_MEAN_DELAY_DAYS))
+
+    @classmethod
+    def _from_columns(cls, due: Any, totals: np.ndarray, on_time: np.ndarray,
+                      delay: np.ndarray) -> 'InvoiceIndex':
+        if len(totals) == 0:
+            return cls(np.empty(0, dtype=np.int64), np.empty(0))
+        days = _to_days(due)
+        valid = ~np.isnat(days)
+        return cls(days[valid].astype(np.int64), totals[valid],
+                   np.clip(on_time[valid], 0.0, 1.0), np.maximum(delay[valid], 0.0))
+
+    @classmethod
+    def coerce(cls, invoices: InvoicesLike) -> 'InvoiceIndex':
+        """Return `invoices` as an index (no-op if already indexed)"""
+        if isinstance(invoices, cls):
+            return invoices
+        if invoices is None:
+            return cls(np.empty(0, dtype=np.int64), np.empty(0))
+        if isinstance(invoices, pd.DataFrame):
+            return cls.from_frame(invoices)
+        return cls.from_records(invoices)
+
+    def fingerprint(self) -> str:
+        """Content hash (used as the st.cache_data key for a prebuilt index)"""
+        digest = hashlib.sha1()
+        for array in (self.due_days, self.amounts, self.on_time_prob, self.mean_delay):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.due_days)
+
+    def simulate_payments(self, start_day: int, days: int, num_paths: int,
+                          rng: np.random.Generator) -> np.ndarray:
+        """
+        Sampled invoice receipts per path and day
+
+        Candidates are invoices due before the horizon ends, including ones
+        up to MAX_OVERDUE_DAYS overdue; payments that would have landed
+        before `start_day` are received on the first day.
+
+        Returns:
+            np.ndarray: (num_paths, days) matrix of amounts received
+        """
+        lo, hi = np.searchsorted(self.due_days, [start_day - MAX_OVERDUE_DAYS, start_day + days])
+        n = hi - lo
+        if n == 0:
+            return np.zeros((num_paths, days))
+        due = self.due_days[lo:hi] - start_day
+        late = rng.random((num_paths, n)) >= self.on_time_prob[lo:hi]
+        delay = np.ceil(rng.exponential(1.0, (num_paths, n)) * self.mean_delay[lo:hi])
+        pay_day = np.maximum(due + np.where(late, delay, 0.0), 0).astype(np.int64)
+        received = pay_day < days
+        flat = (pay_day + np.arange(num_paths)[:, None] * days)[received]
+        weights = np.broadcast_to(self.amounts[lo:hi], (num_paths, n))[received]
+        return np.bincount(flat, weights=weights, minlength=num_paths * days).reshape(num_paths, days)
+
+
+def _average_monthly(history: Optional[pd.DataFrame], default: float) -> float:
+    if history is None or history.empty:
+        return default
+    return history.groupby(history['date'].dt.to_period('M'))['amount'].sum().mean()
+
+
+class CashFlowForecaster:
+    """
+    Daily cash-flow projection for one freelancer
+
+    Historical averages, seasonality and the invoice index are computed at
+    construction; `forecast` and `simulate` only build the horizon vectors.
+    """
+
+    def __init__(self, income_history: Optional[pd.DataFrame] = None,
+                 expense_history: Optional[pd.DataFrame] = None,
+                 invoices: InvoicesLike = None,
+                 seasonality: Union[SeasonalFactors, Dict[int, float], None] = None,
+                 income_volatility: float = INCOME_VOLATILITY,
+                 expense_volatility: float = EXPENSE_VOLATILITY):
+        """
+        Args:
+            income_history: Historical income ('date', 'amount')
+            expense_history: Historical expenses ('date', 'amount')
+            invoices: Outstanding invoices (dicts, DataFrame or InvoiceIndex)
+            seasonality: Fitted SeasonalFactors, or month (1-12) -> income multiplier
+            income_volatility: Daily lognormal sigma of base income
+            expense_volatility: Daily lognormal sigma of expenses
+        """
+        self.avg_monthly_income = _average_monthly(income_history, DEFAULT_MONTHLY_INCOME)
+        self.avg_monthly_expenses = _average_monthly(expense_history, DEFAULT_MONTHLY_EXPENSES)
+        self.invoices = InvoiceIndex.coerce(invoices)
+        if not isinstance(seasonality, SeasonalFactors):
+            seasonality = seasonality or {}
+            month = np.array([seasonality.get(m, 1.0) for m in range(1, 13)], dtype=float)
+            seasonality = SeasonalFactors(month, np.ones(7), 0, 0.0)
+        self.seasonality = seasonality
+        self.income_volatility = income_volatility
+        self.expense_volatility = expense_volatility
+
+    def _horizon(self, forecast_days: int, start: Optional[datetime]) -> Tuple[pd.DatetimeIndex, int, np.ndarray]:
+        """Forecast dates, first day (days since epoch) and daily base income"""
+        if forecast_days < 1:
+            raise ValueError("forecast_days must be at least 1")
+        forecast_dates = pd.date_range(start=start or datetime.now(), periods=forecast_days, freq='D')
+        start_day = int(forecast_dates[:1].values.astype('datetime64[D]').astype(np.int64)[0])
+        return forecast_dates, start_day, (self.avg_monthly_income / 30) * self.seasonality.daily(forecast_dates)
+
+    def forecast(self, forecast_days: int = 90, start: Optional[datetime] = None,
+                 seed: Optional[int] = None, band_paths: int = BAND_PATHS) -> Dict[str, Any]:
+        """
+        Forecast cash flow for the next `forecast_days` days
+
+        The projected columns are one path sampled from the same model as
+        `simulate`; confidence_low/high are the 5th/95th percentiles of
+        `band_paths` further paths.
+
+        Args:
+            forecast_days: Days to forecast
+            start: First forecast day (defaults to now)
+            seed: Random seed (same seed -> same forecast)
+            band_paths: Paths behind the bands (0 -> +/-BAND_WIDTH of the path)
+
+        Returns:
+            dict: 'forecast' DataFrame and 'summary' totals
+        """
+        forecast_dates, start_day, base_income = self._horizon(forecast_days, start)
+        rng = np.random.default_rng(seed)
+
+        income, expenses = self._sample(forecast_days, start_day, base_income, 1, rng)
+        projected_income, projected_expenses = income[0], expenses[0]
+
+        net_daily = projected_income - projected_expenses
+        cumulative_cf = np.cumsum(net_daily)
+
+        if band_paths > 0:
+            paths = self._simulate_paths(forecast_days, start_day, base_income, band_paths,
+                                         rng, DEFAULT_CHUNK_SIZE, 0.0)
+            confidence_low, confidence_high = np.percentile(paths, [5, 95], axis=0)
+        else:
+            confidence_low, confidence_high = cumulative_cf * (1 - BAND_WIDTH), cumulative_cf * (1 + BAND_WIDTH)
+
+        forecast_df = pd.DataFrame({
+            'date': forecast_dates,
+            'projected_income': projected_income,
+            'projected_expenses': projected_expenses,
+            'net_cash_flow': net_daily,
+            'cumulative_cash_flow': cumulative_cf,
+            'confidence_high': confidence_high,
+            'confidence_low': confidence_low
+        })
+
+        return {
+            'forecast': forecast_df,
+            'summary': {
+                'avg_monthly_income': self.avg_monthly_income,
+                'avg_monthly_expenses': self.avg_monthly_expenses,
+                'avg_monthly_net': self.avg_monthly_income - self.avg_monthly_expenses,
+                'forecast_end_balance': float(cumulative_cf[-1]),
+                'total_projected_income': float(projected_income.sum()),
+                'total_projected_expenses': float(projected_expenses.sum()),
+                'forecast_accuracy': 'Medium'  # Based on historical data volume
+            }
+        }
+
+    def _sample(self, forecast_days: int, start_day: int, base_income: np.ndarray,
+                num_paths: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """(num_paths, days) sampled income (base plus invoice receipts) and expenses"""
+        # Mean-one lognormal multipliers: volatility without drifting the averages
+        income = base_income * rng.lognormal(-0.5 * self.income_volatility ** 2, self.income_volatility,
+                                             (num_paths, forecast_days))
+        income += self.invoices.simulate_payments(start_day, forecast_days, num_paths, rng)
+        expenses = (self.avg_monthly_expenses / 30) * rng.lognormal(
+            -0.5 * self.expense_volatility ** 2, self.expense_volatility, (num_paths, forecast_days))
+        return income, expenses
+
+    def _simulate_paths(self, forecast_days: int, start_day: int, base_income: np.ndarray,
+                        num_paths: int, rng: np.random.Generator, chunk_size: int,
+                        starting_balance: float) -> np.ndarray:
+        """(num_paths, days) float32 balances, simulated chunk_size paths at a time"""
+        balances = np.empty((num_paths, forecast_days), dtype=np.float32)
+        for lo in range(0, num_paths, chunk_size):
+            k = min(chunk_size, num_paths - lo)
+            net, expenses = self._sample(forecast_days, start_day, base_income, k, rng)
+            net -= expenses
+            np.cumsum(net, axis=1, out=net)
+            net += starting_balance
+            balances[lo:lo + k] = net
+        return balances
+
+    def simulate(self, forecast_days: int = 90, num_paths: int = DEFAULT_PATHS,
+                 seed: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 starting_balance: float = 0.0, threshold: float = 0.0,
+                 percentiles: Sequence[float] = BAND_PERCENTILES,
+                 start: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Monte Carlo cash-flow simulation
+
+        Each path draws daily income and expenses with their own lognormal
+        volatility and a payment day for every open invoice from that
+        invoice's delay distribution. Paths are generated `chunk_size` at a
+        time, so peak scratch memory is about chunk_size x (days + invoices)
+        floats; results are reproducible for a given (seed, chunk_size).
+
+        Args:
+            forecast_days: Days to simulate
+            num_paths: Number of simulated paths
+            seed: Random seed
+            chunk_size: Paths per vectorized batch
+            starting_balance: Cash on hand at the start
+            threshold: Balance level for the shortfall probability
+            percentiles: Band percentiles (0-100)
+            start: First forecast day (defaults to now)
+
+        Returns:
+            dict: 'bands' DataFrame (date, mean, p<q> columns,
+            prob_below_threshold per day) and 'summary'
+        """
+        if num_paths < 1 or chunk_size < 1:
+            raise ValueError("num_paths and chunk_size must be at least 1")
+
+        forecast_dates, start_day, base_income = self._horizon(forecast_days, start)
+        rng = np.random.default_rng(seed)
+        balances = self._simulate_paths(forecast_days, start_day, base_income, num_paths,
+                                        rng, chunk_size, starting_balance)
+
+        levels = np.percentile(balances, percentiles, axis=0)
+        below = balances < threshold
+        bands = pd.DataFrame({'date': forecast_dates, 'mean': balances.mean(axis=0, dtype=np.float64)})
+        for q, level in zip(percentiles, levels):
+            bands[f'p{q:g}'] = level
+        bands['prob_below_threshold'] = below.mean(axis=0)
+
+        ever_below = below.any(axis=1)
+        first_breach = np.where(ever_below, below.argmax(axis=1), -1)
+        end = balances[:, -1]
+        return {
+            'bands': bands,
+            'summary': {
+                'paths': num_paths,
+                'seed': seed,
+                'starting_balance': starting_balance,
+                'threshold': threshold,
+                'prob_below_threshold': float(ever_below.mean()),
+                'median_days_to_breach': float(np.median(first_breach[ever_below])) if ever_below.any() else None,
+                'expected_end_balance': float(end.mean(dtype=np.float64)),
+                'end_balance_percentiles': {f'p{q:g}': float(v) for q, v in zip(percentiles, levels[:, -1])},
+            }
+        }
+
+
+def benchmark_cash_flow_forecast(forecast_days: int = 365, num_invoices: int = 10_000,
+                                 baseline_days: int = 5, simulation_paths: int = DEFAULT_PATHS,
+                                 seed: int = 0) -> Dict[str, Any]:
+    """
+    Time a horizon forecast against 10k open invoices vs the per-day rescan
+
+    The rescan baseline (parse and compare every invoice for every day) is
+    timed on `baseline_days` days and reported per day.
+
+    Returns:
+        dict: Index build, forecast, simulation and per-day baseline timings
+    """
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp.now().normalize()
+    offsets = rng.integers(-30, forecast_days + 30, num_invoices)
+    invoices = [
+        {'due_date': (today + pd.Timedelta(days=int(d))).isoformat(), 'total': float(t)}
+        for d, t in zip(offsets, rng.uniform(500, 15000, num_invoices))
+    ]
+    history_dates = pd.date_range(today - pd.Timedelta(days=730), today, freq='D')
+    income = pd.DataFrame({'date': history_dates, 'amount': rng.uniform(0, 400, len(history_dates))})
+    expenses = pd.DataFrame({'date': history_dates, 'amount': rng.uniform(0, 150, len(history_dates))})
+
+    start = time.perf_counter()
+    forecaster = CashFlowForecaster(income, expenses, invoices)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    forecaster.forecast(forecast_days, seed=seed, band_paths=0)
+    forecast_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    forecaster.simulate(forecast_days, num_paths=simulation_paths, seed=seed)
+    simulate_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for day in pd.date_range(today, periods=baseline_days, freq='D'):
+        for inv in invoices:
+            due = datetime.fromisoformat(inv['due_date'])
+            if due.date() == day.date() and np.random.random() < ON_TIME_PAYMENT_PROB:
+                pass
+    per_day = (time.perf_counter() - start) / baseline_days
+
+    result = {
+        'forecast_days': forecast_days,
+        'invoices': num_invoices,
+        'index_build_ms': build * 1e3,
+        'forecast_ms': forecast_seconds * 1e3,
+        'simulation_paths': simulation_paths,
+        'simulate_ms': simulate_seconds * 1e3,
+        'rescan_per_day_ms': per_day * 1e3,
+        'rescan_estimated_ms': per_day * forecast_days * 1e3,
+    }
+    logger.info(f"Cash flow forecast benchmark: {result}")
+    return result
@@ -0,0 +1,556 @@
+"""
+Correlation Service
+Rolling correlation, hierarchical clustering and effective number of bets
+
+Best Practices Implemented:
+- Rolling window kept as running sums (sum and cross-product), so each
+  new bar costs O(symbols^2) instead of a full-window recompute, with a
+  periodic exact resync to bound floating-point drift
+- New bars pulled from the bar store's memory-mapped tail only
+- Correlation/covariance snapshots written atomically to .npy files and
+  opened with mmap_mode='r': every session reads the same copy
+- Average-linkage clustering on correlation distance, NumPy only
+  (no SciPy dependency), with cached row minima instead of a full scan
+  per merge
+- Diversification as an effective number of independent bets (entropy of
+  principal-component risk contributions) rather than weight HHI alone
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+import threading
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .risk_engine import returns_from_store
+
+if TYPE_CHECKING:
+    from ..data.bar_store import BarStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = os.environ.get('PULSETRADE_CORRELATION_CACHE', os.path.join('.cache', 'correlation'))
+DEFAULT_WINDOW = 252          # Return observations (one year of daily bars)
+DEFAULT_RESYNC_EVERY = 1000   # Incremental updates between exact recomputes
+DEFAULT_STATE_CACHE_SIZE = 32
+CLUSTER_DISTANCE = 0.5        # sqrt((1 - rho) / 2) <= 0.5  <=>  average rho >= 0.5
+
+
+class RollingCorrelation:
+    """
+    Correlation of the last `window` return rows, updated incrementally
+
+    Keeps the window in a ring buffer plus the column sums and the
+    cross-product matrix; adding k rows costs O(k * n^2).
+    """
+
+    def __init__(self, num_symbols: int, window: int = DEFAULT_WINDOW,
+                 resync_every: int = DEFAULT_RESYNC_EVERY):
+        self.window = window
+        self.resync_every = resync_every
+        self._buffer = np.zeros((window, num_symbols))
+        self._pos = 0
+        self.count = 0
+        self._sum = np.zeros(num_symbols)
+        self._cross = np.zeros((num_symbols, num_symbols))
+        self._since_resync = 0
+
+    def rows(self) -> np.ndarray:
+        """Window rows in chronological order"""
+        if self.count < self.window:
+            return self._buffer[:self.count]
+        return np.roll(self._buffer, -self._pos, axis=0)
+
+    def _resync(self) -> None:
+        rows = self._buffer[:self.count] if self.count < self.window else self._buffer
+        self._sum = rows.sum(axis=0)
+        self._cross = rows.T @ rows
+        self._since_resync = 0
+
+    def extend(self, rows: np.ndarray) -> None:
+        """Add return rows (k, symbols), evicting the oldest beyond the window"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, self._buffer.shape[1])
+        if len(rows) >= self.window:
+            self._buffer[:] = rows[-self.window:]
+            self._pos, self.count = 0, self.window
+            self._resync()
+            return
+
+        k = len(rows)
+        slots = (self._pos + np.arange(k)) % self.window
+        excess = self.count + k - self.window
+        if excess > 0:
+            # The last `excess` slots written wrap onto the oldest rows;
+            # add new and remove evicted outer products in one matmul
+            evicted = self._buffer[slots[k - excess:]]
+            self._sum += rows.sum(axis=0) - evicted.sum(axis=0)
+            self._cross += np.vstack([rows, evicted]).T @ np.vstack([rows, -evicted])
+        else:
+            self._sum += rows.sum(axis=0)
+            self._cross += rows.T @ rows
+        self._buffer[slots] = rows
+        self._pos = (self._pos + k) % self.window
+        self.count = min(self.window, self.count + k)
+
+        self._since_resync += k
+        if self._since_resync >= self.resync_every:
+            self._resync()
+
+    def _centered(self) -> np.ndarray:
+        """Sum of centered cross-products (a fresh array)"""
+        mean = self._sum / max(self.count, 1)
+        return np.subtract(self._cross, np.outer(mean, self._sum))
+
+    def covariance(self) -> np.ndarray:
+        if self.count < 2:
+            return np.zeros_like(self._cross)
+        centered = self._centered()
+        centered /= self.count - 1
+        return centered
+
+    def correlation(self) -> np.ndarray:
+        # Scaling cancels (m - 1), so normalize the centered sums in place
+        return covariance_to_correlation(self._centered(), copy=False)
+
+
+def covariance_to_correlation(cov: np.ndarray, copy: bool = True) -> np.ndarray:
+    """Correlation from covariance; zero-variance symbols get zero correlation"""
+    variance = np.diag(cov).copy()
+    inv_sd = np.zeros_like(variance)
+    np.divide(1.0, np.sqrt(variance, where=variance > 0, out=np.zeros_like(variance)),
+              out=inv_sd, where=variance > 0)
+    corr = np.array(cov, dtype=np.float64) if copy else cov
+    corr *= inv_sd[:, None]
+    corr *= inv_sd[None, :]
+    np.clip(corr, -1, 1, out=corr)
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def correlation_distance(corr: np.ndarray) -> np.ndarray:
+    """Metric distance sqrt((1 - rho) / 2) in [0, 1]"""
+    return np.sqrt(np.clip((1 - corr) / 2, 0, 1))
+
+
+def average_linkage(corr: np.ndarray) -> np.ndarray:
+    """
+    Average-linkage hierarchical clustering on correlation distance
+
+    Returns:
+        ndarray: (n - 1, 4) linkage in SciPy's layout: merged cluster ids,
+        distance and size; cluster n + i is created by row i
+    """
+    n = len(corr)
+    if n < 2:
+        return np.empty((0, 4))
+
+    dist = correlation_distance(corr).astype(np.float64)
+    np.fill_diagonal(dist, np.inf)
+    size = np.ones(n)
+    ids = np.arange(n)
+    nearest = dist.argmin(axis=1)
+    nearest_dist = dist[np.arange(n), nearest]
+
+    linkage = np.empty((n - 1, 4))
+    for step in range(n - 1):
+        i = int(nearest_dist.argmin())
+        j = int(nearest[i])
+        a, b = min(ids[i], ids[j]), max(ids[i], ids[j])
+        linkage[step] = (a, b, nearest_dist[i], size[i] + size[j])
+
+        # Lance-Williams update for average linkage; slot i becomes the merged cluster
+        merged = (size[i] * dist[i] + size[j] * dist[j]) / (size[i] + size[j])
+        merged[i] = np.inf
+        dist[i] = merged
+        dist[:, i] = merged
+        dist[j] = np.inf
+        dist[:, j] = np.inf
+        size[i] += size[j]
+        ids[i] = n + step
+        nearest_dist[j] = np.inf
+
+        # Rows that pointed at i or j must rescan; others can only get closer to i
+        stale = np.flatnonzero((nearest == i) | (nearest == j))
+        closer = merged < nearest_dist
+        nearest[closer] = i
+        nearest_dist[closer] = merged[closer]
+        for row in stale:
+            if np.isfinite(nearest_dist[row]) or row == i:
+                nearest[row] = dist[row].argmin()
+                nearest_dist[row] = dist[row, nearest[row]]
+        if np.isfinite(merged).any():
+            nearest[i] = merged.argmin()
+            nearest_dist[i] = merged[nearest[i]]
+        else:
+            nearest_dist[i] = np.inf
+    return linkage
+
+
+def cut_linkage(linkage: np.ndarray, num_clusters: Optional[int] = None,
+                threshold: Optional[float] = None) -> np.ndarray:
+    """
+    Flat cluster labels (0..k-1) from a linkage, by count or distance threshold
+
+    Average linkage is monotone, so the merges below `threshold` are a prefix.
+    """
+    n = len(linkage) + 1
+    if num_clusters is not None:
+        merges = n - max(1, min(num_clusters, n))
+    else:
+        merges = int(np.searchsorted(linkage[:, 2], threshold, side='right'))
+
+    parent = np.arange(2 * n - 1)
+    for step in range(merges):
+        parent[linkage[step, :2].astype(np.int64)] = n + step
+
+    roots = parent[:n]
+    while True:
+        nxt = parent[roots]
+        if np.array_equal(nxt, roots):
+            break
+        roots = nxt
+    return np.unique(roots, return_inverse=True)[1]
+
+
+def effective_number_of_bets(weights: np.ndarray, cov: np.ndarray) -> float:
+    """
+    Effective number of uncorrelated bets (Meucci, principal-component version)
+
+    exp(entropy) of each principal component's share of portfolio variance:
+    1 for a single bet, n for n equal-risk independent bets.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+    contributions = (eigenvectors.T @ weights) ** 2 * np.maximum(eigenvalues, 0)
+    total = contributions.sum()
+    if total <= 0:
+        return float(np.count_nonzero(weights) or 1)
+    p = contributions[contributions > 0] / total
+    return float(np.exp(-(p * np.log(p)).sum()))
+
+
+@dataclass
+class CorrelationSnapshot:
+    """Correlation and covariance for a universe as of one bar (arrays may be memmaps)"""
+    symbols: Tuple[str, ...]
+    correlation: np.ndarray
+    covariance: np.ndarray
+    as_of: Optional[int]          # UTC ns of the newest bar included
+    observations: int
+
+    def sub(self, symbols: Sequence[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """(covered symbols, correlation, covariance) restricted to `symbols`"""
+        index = {s: i for i, s in enumerate(self.symbols)}
+        covered = [s for s in symbols if s in index]
+        rows = np.array([index[s] for s in covered], dtype=np.int64)
+        return covered, self.correlation[np.ix_(rows, rows)], self.covariance[np.ix_(rows, rows)]
+
+
+class _UniverseState:
+    """In-memory rolling state for one universe"""
+
+    __slots__ = ('rolling', 'as_of', 'last_close')
+
+    def __init__(self, rolling: RollingCorrelation, as_of: Optional[int], last_close: np.ndarray):
+        self.rolling = rolling
+        self.as_of = as_of
+        self.last_close = last_close
+
+
+class CorrelationService:
+    """
+    Rolling correlation matrices over bar-store universes
+
+    `snapshot(symbols)` returns the shared memory-mapped copy when it is
+    current, otherwise pulls the new bars, updates the rolling state and
+    republishes the snapshot.
+    """
+
+    def __init__(self, interval: str = '1d', window: int = DEFAULT_WINDOW,
+                 store: Optional['BarStore'] = None, root: Optional[str] = None,
+                 resync_every: int = DEFAULT_RESYNC_EVERY,
+                 state_cache_size: int = DEFAULT_STATE_CACHE_SIZE):
+        """
+        Args:
+            interval: Bar interval
+            window: Return observations per matrix
+            store: Bar store (default: process-wide store)
+            root: Snapshot directory (default: PULSETRADE_CORRELATION_CACHE or .cache/correlation)
+            resync_every: Incremental updates between exact recomputes
+            state_cache_size: Universes whose rolling state is kept in memory (LRU)
+        """
+        self.interval = interval
+        self.window = window
+        self._store = store
+        self.root = root or DEFAULT_ROOT
+        self.resync_every = resync_every
+        self.state_cache_size = state_cache_size
+        self._states: 'OrderedDict[Tuple[str, ...], _UniverseState]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.snapshot_hits = 0
+        self.incremental_updates = 0
+        self.full_builds = 0
+
+    @property
+    def store(self) -> 'BarStore':
+        if self._store is None:
+            # Imported lazily: the data package pulls in the live-data providers
+            from ..data.bar_store import get_bar_store
+            self._store = get_bar_store()
+        return self._store
+
+    # ------------------------------------------------------------------
+    # Snapshot files
+    # ------------------------------------------------------------------
+
+    def _path(self, universe: Tuple[str, ...]) -> str:
+        digest = hashlib.sha1('\n'.join(universe).encode()).hexdigest()[:16]
+        return os.path.join(self.root, self.interval, f'w{self.window}', digest)
+
+    def _read_snapshot(self, universe: Tuple[str, ...]) -> Optional[CorrelationSnapshot]:
+        path = self._path(universe)
+        try:
+            with open(path + '.json') as f:
+                meta = json.load(f)
+            matrices = np.load(path + '.npy', mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if tuple(meta.get('symbols', ())) != universe:
+            return None
+        return CorrelationSnapshot(universe, matrices[0], matrices[1], meta['as_of'], meta['observations'])
+
+    def _write_snapshot(self, snapshot: CorrelationSnapshot) -> None:
+        path = self._path(snapshot.symbols)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename: readers keep their old mapping, new readers see the new file
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, np.stack([snapshot.correlation, snapshot.covariance]))
+        os.replace(tmp, path + '.npy')
+        with open(tmp, 'w') as f:
+            json.dump({'symbols': list(snapshot.symbols), 'as_of': snapshot.as_of,
+                       'observations': snapshot.observations}, f)
+        os.replace(tmp, path + '.json')
+
+    # ------------------------------------------------------------------
+    # Building and updating
+    # ------------------------------------------------------------------
+
+    def _latest_common(self, universe: Tuple[str, ...]) -> Optional[int]:
+        """Newest timestamp every symbol could share (min of per-symbol last bars)"""
+        latest = None
+        for symbol in universe:
+            arrays = self.store.load_arrays(symbol, self.interval, columns=('timestamp',))
+            if arrays is None:
+                return None
+            last = int(arrays['timestamp'][-1])
+            latest = last if latest is None else min(latest, last)
+        return latest
+
+    def _build(self, universe: Tuple[str, ...]) -> _UniverseState:
+        matrix = returns_from_store(universe, self.interval, self.window, self.store, benchmark=None)
+        if matrix.symbols != universe:
+            raise ValueError(f"No stored {self.interval} bars for {sorted(set(universe) - set(matrix.symbols))}")
+
+        rolling = RollingCorrelation(len(universe), self.window, self.resync_every)
+        rolling.extend(matrix.returns)
+        as_of = int(matrix.timestamps[-1].value) if len(matrix.timestamps) else None
+        self.full_builds += 1
+        return _UniverseState(rolling, as_of, self._closes_at(universe, as_of))
+
+    def _closes_at(self, universe: Tuple[str, ...], ts: Optional[int]) -> np.ndarray:
+        closes = np.full(len(universe), np.nan)
+        if ts is None:
+            return closes
+        for k, symbol in enumerate(universe):
+            arrays = self.store.load_arrays(symbol, self.interval, columns=('timestamp', 'close'))
+            i = int(np.searchsorted(arrays['timestamp'], ts))
+            if i < len(arrays['timestamp']) and arrays['timestamp'][i] == ts:
+                closes[k] = arrays['close'][i]
+        return closes
+
+    def _update(self, universe: Tuple[str, ...], state: _UniverseState) -> bool:
+        """Append bars newer than state.as_of on every symbol; True if any were added"""
+        tails = []
+        for symbol in universe:
+            arrays = self.store.load_arrays(symbol, self.interval, columns=('timestamp', 'close'))
+            ts = arrays['timestamp']
+            start = int(np.searchsorted(ts, state.as_of, side='right'))
+            tails.append((ts[start:], arrays['close'][start:]))
+
+        common = tails[0][0]
+        for ts, _ in tails[1:]:
+            common = np.intersect1d(common, ts, assume_unique=True)
+        if not len(common):
+            return False
+
+        close = np.column_stack([c[np.searchsorted(ts, common)] for ts, c in tails])
+        close = np.vstack([state.last_close, close])
+        state.rolling.extend(close[1:] / close[:-1] - 1)
+        state.as_of = int(common[-1])
+        state.last_close = close[-1]
+        self.incremental_updates += 1
+        return True
+
+    def snapshot(self, symbols: Optional[Sequence[str]] = None) -> CorrelationSnapshot:
+        """
+        Current correlation snapshot for a universe
+
+        Args:
+            symbols: Universe (default: every symbol stored for the interval);
+                order does not matter, the snapshot is in sorted order
+
+        Returns:
+            CorrelationSnapshot: Memory-mapped when served from the shared cache
+        """
+        universe = tuple(sorted(set(symbols if symbols is not None else self.store.symbols(self.interval))))
+        latest = self._latest_common(universe)
+
+        cached = self._read_snapshot(universe)
+        if cached is not None and latest is not None and cached.as_of is not None and cached.as_of >= latest:
+            self.snapshot_hits += 1
+            return cached
+
+        with self._lock:
+            state = self._states.get(universe)
+            if state is None or state.as_of is None:
+                state = self._build(universe)
+            else:
+                self._update(universe, state)
+            self._states[universe] = state
+            self._states.move_to_end(universe)
+            while len(self._states) > self.state_cache_size:
+                self._states.popitem(last=False)
+
+        cov = state.rolling.covariance()
+        snapshot = CorrelationSnapshot(universe, covariance_to_correlation(cov), cov,
+                                       state.as_of, state.rolling.count)
+        self._write_snapshot(snapshot)
+        return self._read_snapshot(universe) or snapshot
+
+    # ------------------------------------------------------------------
+    # Clustering and diversification
+    # ------------------------------------------------------------------
+
+    def clusters(self, symbols: Optional[Sequence[str]] = None,
+                 threshold: float = CLUSTER_DISTANCE,
+                 num_clusters: Optional[int] = None) -> Dict[str, int]:
+        """Symbol -> cluster label (average linkage on correlation distance)"""
+        snapshot = self.snapshot(symbols)
+        if len(snapshot.symbols) < 2:
+            return {s: 0 for s in snapshot.symbols}
+        labels = cut_linkage(average_linkage(np.asarray(snapshot.correlation)), num_clusters, threshold)
+        return dict(zip(snapshot.symbols, labels.tolist()))
+
+    def diversification(self, allocation: Dict[str, float],
+                        threshold: float = CLUSTER_DISTANCE) -> Optional[Dict[str, Any]]:
+        """
+        Correlation-aware diversification of a symbol -> market value allocation
+
+        Returns:
+            dict: effective_bets, covered positions, and correlated clusters
+            with their share of the covered value (largest first); None when
+            fewer than two positions have stored bars
+        """
+        held = {s: v for s, v in allocation.items() if v > 0}
+        stored = [s for s in held if self.store.row_count(s, self.interval) > 1]
+        if len(stored) < 2:
+            return None
+
+        snapshot = self.snapshot(stored)
+        if snapshot.observations < 2:
+            return None
+        symbols, corr, cov = snapshot.sub(snapshot.symbols)
+        values = np.array([held[s] for s in symbols])
+        weights = values / values.sum()
+
+        labels = cut_linkage(average_linkage(corr), threshold=threshold)
+        cluster_weight = np.bincount(labels, weights=weights)
+        order = np.argsort(-cluster_weight, kind='stable')
+        clusters = [
+            {
+                'symbols': [s for s, label in zip(symbols, labels) if label == c],
+                'weight_pct': round(float(cluster_weight[c]) * 100, 1),
+            }
+            for c in order
+        ]
+
+        return {
+            'effective_bets': round(effective_number_of_bets(weights, cov), 2),
+            'num_positions': len(symbols),
+            'coverage_pct': round(float(values.sum() / sum(held.values())) * 100, 1),
+            'clusters': clusters,
+            'largest_cluster_pct': clusters[0]['weight_pct'],
+            'as_of': pd.Timestamp(snapshot.as_of, tz='UTC') if snapshot.as_of is not None else None,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'universes_in_memory': len(self._states),
+            'snapshot_hits': self.snapshot_hits,
+            'incremental_updates': self.incremental_updates,
+            'full_builds': self.full_builds,
+        }
+
+
+_correlation_service: Optional[CorrelationService] = None
+_correlation_service_lock = threading.Lock()
+
+
+def get_correlation_service() -> CorrelationService:
+    """Get the process-wide daily-bar correlation service"""
+    global _correlation_service
+    with _correlation_service_lock:
+        if _correlation_service is None:
+            _correlation_service = CorrelationService()
+        return _correlation_service
+
+
+def benchmark_correlation(num_symbols: int = 500, window: int = DEFAULT_WINDOW,
+                          new_bars: int = 20, seed: int = 0) -> Dict[str, Any]:
+    """
+    Time incremental updates against full recomputes, and clustering
+
+    Returns:
+        dict: Seconds per stage and max deviation from a direct recompute
+    """
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, (window + new_bars, 10))
+    loadings = rng.normal(0, 1, (10, num_symbols))
+    returns = factors @ loadings / 10 + rng.normal(0, 0.01, (window + new_bars, num_symbols))
+
+    rolling = RollingCorrelation(num_symbols, window)
+    rolling.extend(returns[:window])
+
+    start = time.perf_counter()
+    for row in returns[window:]:
+        rolling.extend(row[None])
+        rolling.correlation()
+    incremental = (time.perf_counter() - start) / new_bars
+
+    start = time.perf_counter()
+    direct = np.corrcoef(returns[-window:], rowvar=False)
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    labels = cut_linkage(average_linkage(direct), threshold=CLUSTER_DISTANCE)
+    clustering = time.perf_counter() - start
+
+    result = {
+        'symbols': num_symbols,
+        'window': window,
+        'incremental_update_seconds': incremental,
+        'full_recompute_seconds': full,
+        'clustering_seconds': clustering,
+        'clusters': int(labels.max()) + 1,
+        'max_abs_error': float(np.abs(rolling.correlation() - direct).max()),
+    }
+    logger.info(f"Correlation benchmark: {result}")
+    return result
@@ -0,0 +1,515 @@
+"""
+Batch Financial Health Scoring
+Nightly scoring of every user's financial and holistic health into a local store
+
+Layout (one directory per run, one part per scored chunk):
+
+    <root>/<run_id>/part-00000/<column>.bin   raw little-endian column data
+    <root>/<run_id>/meta.json                 parts, dtypes, label tables
+    <root>/LATEST                             {"run_id": ...} of the last complete run
+
+Best Practices Implemented:
+- Columnar inputs scored with the same thresholds as
+  CashFlowEngine.get_financial_health_score and
+  UnifiedInsights.get_holistic_financial_health, via np.select (no Python
+  loop over users)
+- Chunked streaming mode (DataFrame, CSV path or any iterable of frames):
+  peak memory is one chunk, each chunk lands as its own part
+- Runs become visible atomically: LATEST is replaced only after every
+  part and meta.json are on disk, so the dashboard never reads a
+  half-written run
+- Dashboard reads are memory-mapped with a binary-search user lookup
+  instead of recomputing scores on every page load
+- No extra dependencies (NumPy only, same approach as the bar store)
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+from datetime import datetime
+import json
+import os
+import shutil
+import threading
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = os.environ.get('PULSETRADE_HEALTH_STORE', os.path.join('.cache', 'health_scores'))
+DEFAULT_CHUNK_SIZE = 250_000
+
+# Input column -> default when absent (as the scalar scorers' .get(..., 0))
+INPUT_COLUMNS = {
+    'balance': 0.0,
+    'monthly_income': 0.0,
+    'monthly_expenses': 0.0,
+    'debt': 0.0,
+    'emergency_fund': 0.0,
+    'income_diversity_score': 0.0,
+    'portfolio_health_score': 0.0,
+    'calm': 0.0,
+    'stress': 0.0,
+}
+
+COMPONENTS = ['runway', 'cash_flow', 'debt', 'emergency_fund', 'income_diversity']
+GRADE_THRESHOLDS = [90, 80, 70, 60]
+GRADES = ['A+', 'A', 'B', 'C', 'D']
+STATUSES = ['Excellent', 'Very Good', 'Good', 'Fair', 'Needs Improvement']
+COLORS = ['green', 'green', 'yellow', 'orange', 'red']
+BUSINESS_WEIGHT, TRADING_WEIGHT, EMOTION_WEIGHT = 0.40, 0.30, 0.30
+
+# Output label column -> label table (stored as uint8 codes)
+LABELS = {
+    'financial_grade': GRADES,
+    'financial_status': STATUSES,
+    'holistic_grade': GRADES,
+    'holistic_status': STATUSES,
+    'holistic_color': COLORS,
+}
+
+
+def _grade_codes(score: np.ndarray) -> np.ndarray:
+    """Index into GRADES/STATUSES/COLORS for each total score"""
+    return np.select([score >= t for t in GRADE_THRESHOLDS], range(len(GRADE_THRESHOLDS)),
+                     default=len(GRADE_THRESHOLDS)).astype(np.uint8)
+
+
+def _column(frame: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in frame:
+        return np.full(len(frame), INPUT_COLUMNS[name])
+    return frame[name].fillna(INPUT_COLUMNS[name]).to_numpy(dtype=np.float64)
+
+
+def score_health_codes(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Component scores, totals and label codes as raw arrays
+
+    Args:
+        frame: One row per user with any of the INPUT_COLUMNS
+
+    Returns:
+        dict: Column name -> array (labels as uint8 codes into LABELS)
+    """
+    balance = _column(frame, 'balance')
+    income = _column(frame, 'monthly_income')
+    expenses = _column(frame, 'monthly_expenses')
+    debt = _column(frame, 'debt')
+    emergency_fund = _column(frame, 'emergency_fund')
+    diversity = _column(frame, 'income_diversity_score')
+    has_expenses = expenses > 0
+
+    # 1. Runway (30 points max)
+    runway_months = np.full(len(frame), 12.0)
+    np.divide(balance, expenses, out=runway_months, where=has_expenses)
+    runway = np.select([runway_months >= 12, runway_months >= 6, runway_months >= 3],
+                       [30.0, 20.0, 10.0], default=5.0)
+
+    # 2. Cash flow (25 points max)
+    net = income - expenses
+    cash_flow = np.select([net > expenses * 0.3, net > 0, net > -expenses * 0.2],
+                          [25.0, 15.0, 5.0], default=0.0)
+
+    # 3. Debt burden (20 points max)
+    debt_score = np.select([debt == 0, debt < income * 3, debt < income * 6],
+                           [20.0, 15.0, 10.0], default=5.0)
+
+    # 4. Emergency fund (15 points max)
+    emergency_months = np.zeros(len(frame))
+    np.divide(emergency_fund, expenses, out=emergency_months, where=has_expenses)
+    emergency = np.select([emergency_months >= 6, emergency_months >= 3],
+                          [15.0, 10.0], default=emergency_months * 2)
+
+    # 5. Income diversity (10 points max, lower concentration is better)
+    income_diversity = np.maximum(0.0, 10 - diversity / 10)
+
+    financial = runway + cash_flow + debt_score + emergency + income_diversity
+    emotion = (_column(frame, 'calm') + (100 - _column(frame, 'stress'))) / 2
+    holistic = (financial * BUSINESS_WEIGHT + _column(frame, 'portfolio_health_score') * TRADING_WEIGHT
+                + emotion * EMOTION_WEIGHT)
+    financial_codes = _grade_codes(financial)
+    holistic_codes = _grade_codes(holistic)
+
+    return {
+        'runway': runway,
+        'cash_flow': cash_flow,
+        'debt': debt_score,
+        'emergency_fund': emergency,
+        'income_diversity': income_diversity,
+        'financial_score': financial,
+        'financial_grade': financial_codes,
+        'financial_status': financial_codes,
+        'emotion_score': emotion,
+        'holistic_score': holistic,
+        'holistic_grade': holistic_codes,
+        'holistic_status': holistic_codes,
+        'holistic_color': holistic_codes,
+    }
+
+
+def _decode(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    out = dict(columns)
+    for name, labels in LABELS.items():
+        if name in out:
+            out[name] = np.asarray(labels, dtype=object)[out[name]]
+    return out
+
+
+def score_health(frame: pd.DataFrame, user_col: str = 'user_id') -> pd.DataFrame:
+    """
+    Financial and holistic health for every user in one vectorized pass
+
+    Args:
+        frame: One row per user: `user_col` plus any of balance,
+            monthly_income, monthly_expenses, debt, emergency_fund,
+            income_diversity_score, portfolio_health_score, calm, stress
+        user_col: Column identifying the user
+
+    Returns:
+        DataFrame: Indexed by `user_col`; component points, financial and
+        holistic scores with grade/status labels
+    """
+    scores = pd.DataFrame(_decode(score_health_codes(frame)))
+    scores.index = pd.Index(frame[user_col].to_numpy(), name=user_col)
+    return scores
+
+
+def _user_array(values: np.ndarray) -> np.ndarray:
+    """User ids as a memory-mappable array (int64 or fixed-width unicode)"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return values.astype('<i8')
+    return values.astype(str)
+
+
+class HealthScoreStore:
+    """
+    Scored runs on disk, read by the dashboard
+
+    Use `writer()` (or `run_batch_scoring`) to produce a run and
+    `lookup(user_id)` / `load()` to read the latest complete one.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Store directory (default: PULSETRADE_HEALTH_STORE or .cache/health_scores)
+        """
+        self.root = root or DEFAULT_ROOT
+        self._runs: Dict[str, Dict[str, Any]] = {}
+        self._latest: Optional[tuple] = None   # ((inode, mtime_ns) of LATEST, run_id)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def writer(self, run_id: Optional[str] = None) -> '_RunWriter':
+        """Start a new run (invisible to readers until commit())"""
+        return _RunWriter(self, run_id or datetime.now().strftime('%Y%m%dT%H%M%S%f'))
+
+    def _publish(self, run_id: str) -> None:
+        tmp = os.path.join(self.root, f'LATEST.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'run_id': run_id}, f)
+        os.replace(tmp, os.path.join(self.root, 'LATEST'))
+
+    def runs(self) -> List[str]:
+        """Complete runs, sorted by run id (oldest first for the default timestamp ids)"""
+        try:
+            names = sorted(os.listdir(self.root))
+        except OSError:
+            return []
+        return [n for n in names if os.path.exists(os.path.join(self.root, n, 'meta.json'))]
+
+    def prune(self, keep: int = 7) -> int:
+        """Delete all but the newest `keep` complete runs (never the latest); returns runs removed"""
+        latest = self.latest_run()
+        stale = [r for r in self.runs()[:-keep] if r != latest] if keep > 0 else []
+        for run_id in stale:
+            shutil.rmtree(os.path.join(self.root, run_id), ignore_errors=True)
+            self._runs.pop(run_id, None)
+        return len(stale)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def latest_run(self) -> Optional[str]:
+        """Run id of the last published run (re-read only when LATEST changes)"""
+        path = os.path.join(self.root, 'LATEST')
+        try:
+            stat = os.stat(path)
+            version = (stat.st_ino, stat.st_mtime_ns)   # os.replace gives a new inode
+            if self._latest is not None and self._latest[0] == version:
+                return self._latest[1]
+            with open(path) as f:
+                run_id = json.load(f)['run_id']
+        except (OSError, ValueError, KeyError):
+            return None
+        self._latest = (version, run_id)
+        return run_id
+
+    def _open(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None:
+                return run
+            path = os.path.join(self.root, run_id)
+            try:
+                with open(os.path.join(path, 'meta.json')) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                return None
+            parts = []
+            for i, part in enumerate(meta['parts']):
+                part_path = os.path.join(path, f'part-{i:05d}')
+                dtypes = dict(meta['columns'], user_id=part['user_dtype'])
+                parts.append({
+                    name: (np.memmap(os.path.join(part_path, f'{name}.bin'), dtype=np.dtype(dtype),
+                                     mode='r', shape=(part['rows'],)) if part['rows'] else
+                           np.empty(0, dtype=np.dtype(dtype)))
+                    for name, dtype in dtypes.items()
+                })
+            run = {'meta': meta, 'parts': parts}
+            self._runs[run_id] = run
+            return run
+
+    def load(self, run_id: Optional[str] = None) -> pd.DataFrame:
+        """Every user's scores for a run (default: latest), indexed by user"""
+        run_id = run_id or self.latest_run()
+        run = self._open(run_id) if run_id else None
+        if run is None or not run['parts']:
+            return pd.DataFrame()
+        columns = {name: np.concatenate([part[name] for part in run['parts']])
+                   for name in run['parts'][0]}
+        users = columns.pop('user_id')
+        frame = pd.DataFrame(_decode(columns))
+        frame.index = pd.Index(users, name=run['meta']['user_col'])
+        return frame
+
+    def lookup(self, user_id: Any, run_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        One user's stored scores, shaped like get_financial_health_score
+
+        Returns:
+            dict or None: total_score, grade, status, components,
+            recommendations, plus a 'holistic' sub-dict and the run_id
+        """
+        run_id = run_id or self.latest_run()
+        run = self._open(run_id) if run_id else None
+        if run is None:
+            return None
+        for part, info in zip(run['parts'], run['meta']['parts']):
+            users = part['user_id']
+            key = np.asarray(user_id, dtype=users.dtype) if users.dtype.kind in 'iu' else str(user_id)
+            i = int(np.searchsorted(users, key))
+            if i < len(users) and users[i] == key:
+                return self._row(run_id, part, i)
+        return None
+
+    @staticmethod
+    def _row(run_id: str, part: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+        from .cashflow_engine import CashFlowEngine
+
+        components = {name: float(part[name][i]) for name in COMPONENTS}
+        return {
+            'run_id': run_id,
+            'total_score': float(part['financial_score'][i]),
+            'grade': GRADES[part['financial_grade'][i]],
+            'status': STATUSES[part['financial_status'][i]],
+            'components': components,
+            'max_possible': 100,
+            'recommendations': CashFlowEngine._get_health_recommendations(components),
+            'holistic': {
+                'total_score': float(part['holistic_score'][i]),
+                'grade': GRADES[part['holistic_grade'][i]],
+                'status': STATUSES[part['holistic_status'][i]],
+                'color': COLORS[part['holistic_color'][i]],
+                'emotion_score': float(part['emotion_score'][i]),
+            },
+        }
+
+
+class _RunWriter:
+    """Writes one run part by part; commit() publishes it"""
+
+    def __init__(self, store: HealthScoreStore, run_id: str):
+        self.store = store
+        self.run_id = run_id
+        self.path = os.path.join(store.root, run_id)
+        self.parts: List[Dict[str, Any]] = []
+        self.columns: Dict[str, str] = {}
+        self.user_col = 'user_id'
+        os.makedirs(self.path, exist_ok=True)
+
+    def write(self, users: np.ndarray, columns: Dict[str, np.ndarray], user_col: str = 'user_id') -> int:
+        """Write one scored chunk as a part (sorted by user for lookups); returns rows written"""
+        self.user_col = user_col
+        users = _user_array(users)
+        order = np.argsort(users, kind='stable')
+        part_path = os.path.join(self.path, f'part-{len(self.parts):05d}')
+        os.makedirs(part_path, exist_ok=True)
+        for name, values in dict(columns, user_id=users).items():
+            values = np.ascontiguousarray(values[order])
+            values.tofile(os.path.join(part_path, f'{name}.bin'))
+            if name != 'user_id':
+                self.columns[name] = values.dtype.str
+        self.parts.append({'rows': len(users), 'user_dtype': users.dtype.str})
+        return len(users)
+
+    def commit(self) -> str:
+        """Write meta.json, then point LATEST at this run"""
+        meta = {'run_id': self.run_id, 'created': datetime.now().isoformat(),
+                'user_col': self.user_col, 'rows': sum(p['rows'] for p in self.parts),
+                'columns': self.columns, 'labels': LABELS, 'parts': self.parts}
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
+        self.store._publish(self.run_id)
+        return self.run_id
+
+
+def _iter_frames(source: Union[pd.DataFrame, str, Iterable[pd.DataFrame]],
+                 chunk_size: int) -> Iterable[pd.DataFrame]:
+    if isinstance(source, pd.DataFrame):
+        for lo in range(0, len(source), chunk_size):
+            yield source.iloc[lo:lo + chunk_size]
+    elif isinstance(source, str):
+        yield from pd.read_csv(source, chunksize=chunk_size)
+    else:
+        yield from source
+
+
+def run_batch_scoring(source: Union[pd.DataFrame, str, Iterable[pd.DataFrame]],
+                      store: Optional[HealthScoreStore] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      user_col: str = 'user_id',
+                      run_id: Optional[str] = None,
+                      keep_runs: int = 7) -> Dict[str, Any]:
+    """
+    Nightly job: score every user and publish the run to the store
+
+    Args:
+        source: Input DataFrame, CSV path (streamed with read_csv
+            chunksize) or any iterable of DataFrames
+        store: Target store (default: process-wide store)
+        chunk_size: Rows per chunk for DataFrame/CSV sources
+        user_col: Column identifying the user
+        run_id: Run name (default: current timestamp)
+        keep_runs: Older complete runs to keep after publishing
+
+    Returns:
+        dict: run_id, users scored, parts, elapsed seconds
+    """
+    store = store or get_health_score_store()
+    start = time.perf_counter()
+    writer = store.writer(run_id)
+    rows = 0
+    for chunk in _iter_frames(source, chunk_size):
+        if len(chunk):
+            rows += writer.write(chunk[user_col].to_numpy(), score_health_codes(chunk), user_col)
+    run_id = writer.commit()
+    pruned = store.prune(keep_runs)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Health scoring run {run_id}: {rows} users in {len(writer.parts)} parts, {elapsed:.2f}s")
+    return {'run_id': run_id, 'users': rows, 'parts': len(writer.parts),
+            'seconds': elapsed, 'pruned_runs': pruned}
+
+
+_health_score_store: Optional[HealthScoreStore] = None
+_health_score_store_lock = threading.Lock()
+
+
+def get_health_score_store() -> HealthScoreStore:
+    """Get the process-wide health score store"""
+    global _health_score_store
+    with _health_score_store_lock:
+        if _health_score_store is None:
+            _health_score_store = HealthScoreStore()
+        return _health_score_store
+
+
+def generate_health_inputs(num_users: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic columnar scoring inputs, one row per user"""
+    rng = np.random.default_rng(seed)
+    expenses = rng.lognormal(np.log(4000), 0.5, num_users)
+    return pd.DataFrame({
+        'user_id': np.arange(num_users),
+        'balance': expenses * rng.gamma(2.0, 3.0, num_users),
+        'monthly_income': expenses * rng.normal(1.2, 0.3, num_users),
+        'monthly_expenses': expenses,
+        'debt': np.where(rng.random(num_users) < 0.4, 0.0, rng.lognormal(np.log(15000), 1.0, num_users)),
+        'emergency_fund': expenses * rng.gamma(1.5, 2.0, num_users),
+        'income_diversity_score': rng.uniform(0, 100, num_users),
+        'portfolio_health_score': rng.uniform(30, 95, num_users),
+        'calm': rng.uniform(0, 100, num_users),
+        'stress': rng.uniform(0, 100, num_users),
+    })
+
+
+def benchmark_health_scoring(num_users: int = 1_000_000, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             baseline_users: int = 2_000, lookups: int = 1_000,
+                             root: Optional[str] = None, seed: int = 0) -> Dict[str, Any]:
+    """
+    End to end: CSV -> chunked scoring -> store -> dashboard lookups
+
+    The scalar baseline calls get_financial_health_score and
+    get_holistic_financial_health per user on `baseline_users` users.
+
+    Returns:
+        dict: Timings for input write, scoring run, lookups and baseline
+    """
+    import tempfile
+    from .cashflow_engine import CashFlowEngine
+    from .unified_insights import UnifiedInsights
+
+    inputs = generate_health_inputs(num_users, seed)
+    workdir = tempfile.mkdtemp(prefix='health_bench_')
+    try:
+        csv_path = os.path.join(workdir, 'inputs.csv')
+        start = time.perf_counter()
+        inputs.to_csv(csv_path, index=False)
+        csv_seconds = time.perf_counter() - start
+
+        store = HealthScoreStore(root or os.path.join(workdir, 'store'))
+        run = run_batch_scoring(csv_path, store, chunk_size=chunk_size)
+
+        rng = np.random.default_rng(seed)
+        users = rng.integers(0, num_users, lookups)
+        start = time.perf_counter()
+        for user in users:
+            store.lookup(int(user))
+        lookup_seconds = time.perf_counter() - start
+
+        # Unwrap the streamlit cache: time the scoring, not the cache
+        scalar_score = getattr(CashFlowEngine.get_financial_health_score, '__wrapped__',
+                               CashFlowEngine.get_financial_health_score)
+        sample = inputs.iloc[:baseline_users].to_dict('records')
+        start = time.perf_counter()
+        for row in sample:
+            financial = scalar_score(row['balance'], row['monthly_income'], row['monthly_expenses'],
+                                     row['debt'], row['emergency_fund'], row['income_diversity_score'])
+            UnifiedInsights.get_holistic_financial_health(
+                {'financial_health_score': financial['total_score']},
+                {'portfolio_health_score': row['portfolio_health_score']},
+                {'calm': row['calm'], 'stress': row['stress']})
+        per_user = (time.perf_counter() - start) / max(len(sample), 1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        'users': num_users,
+        'chunk_size': chunk_size,
+        'parts': run['parts'],
+        'csv_write_seconds': csv_seconds,
+        'scoring_run_seconds': run['seconds'],
+        'users_per_sec': num_users / run['seconds'] if run['seconds'] > 0 else float('inf'),
+        'lookup_us': lookup_seconds / lookups * 1e6,
+        'scalar_per_user_us': per_user * 1e6,
+        'scalar_estimated_seconds': per_user * num_users,
+    }
+    logger.info(f"Health scoring benchmark: {result}")
+    return result
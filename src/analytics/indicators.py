@@ -0,0 +1,442 @@
+"""
+Technical Indicator Engine
+Incremental SMA, EMA, RSI, MACD, Bollinger Bands, ATR and VWAP
+
+Each indicator keeps O(1) state per bar, so appending k bars costs O(k)
+regardless of history length. Results are cached per
+(symbol, interval, data source, indicator spec) and only newly appended
+bars are processed on each call.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import threading
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_ROWS = 200_000
+
+
+class _Indicator:
+    """Base class: update() consumes new bars and returns their outputs"""
+    columns: Tuple[str, ...] = ()
+
+    def update(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+               volume: np.ndarray, timestamps: np.ndarray) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+
+class SMA(_Indicator):
+    """Simple moving average (running sum over a window)"""
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self.columns = (f'sma_{period}',)
+        self._window = np.empty(0)
+
+    def update(self, high, low, close, volume, timestamps):
+        values = np.concatenate([self._window, close])
+        csum = np.concatenate([[0.0], np.cumsum(values)])
+        n, k = self.period, len(close)
+        offset = len(self._window)
+
+        out = np.full(k, np.nan)
+        ends = np.arange(offset + 1, offset + k + 1)
+        valid = ends >= n
+        out[valid] = (csum[ends[valid]] - csum[ends[valid] - n]) / n
+
+        self._window = values[-(n - 1):] if n > 1 else np.empty(0)
+        return {self.columns[0]: out}
+
+
+class EMA(_Indicator):
+    """Exponential moving average, seeded with the SMA of the first `period` bars"""
+
+    def __init__(self, period: int = 20, column: Optional[str] = None):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.columns = (column or f'ema_{period}',)
+        self._value: Optional[float] = None
+        self._seed: List[float] = []
+
+    def step(self, x: float) -> float:
+        if self._value is None:
+            self._seed.append(x)
+            if len(self._seed) < self.period:
+                return np.nan
+            self._value = sum(self._seed) / self.period
+            self._seed = []
+            return self._value
+        self._value += self.alpha * (x - self._value)
+        return self._value
+
+    def update(self, high, low, close, volume, timestamps):
+        return {self.columns[0]: np.fromiter((self.step(x) for x in close), float, len(close))}
+
+
+class RSI(_Indicator):
+    """Relative Strength Index with Wilder smoothing"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.columns = (f'rsi_{period}',)
+        self._prev: Optional[float] = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._count = 0
+
+    def update(self, high, low, close, volume, timestamps):
+        out = np.full(len(close), np.nan)
+        n = self.period
+
+        for i, x in enumerate(close):
+            if self._prev is None:
+                self._prev = x
+                continue
+
+            delta = x - self._prev
+            self._prev = x
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            self._count += 1
+
+            if self._count <= n:
+                self._avg_gain += gain / n
+                self._avg_loss += loss / n
+                if self._count < n:
+                    continue
+            else:
+                self._avg_gain = (self._avg_gain * (n - 1) + gain) / n
+                self._avg_loss = (self._avg_loss * (n - 1) + loss) / n
+
+            if self._avg_loss == 0:
+                out[i] = 100.0 if self._avg_gain > 0 else 50.0
+            else:
+                out[i] = 100 - 100 / (1 + self._avg_gain / self._avg_loss)
+
+        return {self.columns[0]: out}
+
+
+class MACD(_Indicator):
+    """MACD line, signal line and histogram"""
+
+    columns = ('macd', 'macd_signal', 'macd_hist')
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._fast = EMA(fast)
+        self._slow = EMA(slow)
+        self._signal = EMA(signal)
+
+    def update(self, high, low, close, volume, timestamps):
+        k = len(close)
+        macd = np.full(k, np.nan)
+        signal = np.full(k, np.nan)
+
+        for i, x in enumerate(close):
+            fast, slow = self._fast.step(x), self._slow.step(x)
+            if not np.isnan(slow):
+                macd[i] = fast - slow
+                signal[i] = self._signal.step(macd[i])
+
+        return {'macd': macd, 'macd_signal': signal, 'macd_hist': macd - signal}
+
+
+class BollingerBands(_Indicator):
+    """Bollinger Bands from a running sum and sum of squares"""
+
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        self.period = period
+        self.num_std = num_std
+        self.columns = ('bb_mid', 'bb_upper', 'bb_lower')
+        self._window = np.empty(0)
+
+    def update(self, high, low, close, volume, timestamps):
+        values = np.concatenate([self._window, close])
+        csum = np.concatenate([[0.0], np.cumsum(values)])
+        csq = np.concatenate([[0.0], np.cumsum(values * values)])
+        n, k = self.period, len(close)
+        offset = len(self._window)
+
+        mid = np.full(k, np.nan)
+        std = np.full(k, np.nan)
+        ends = np.arange(offset + 1, offset + k + 1)
+        valid = ends >= n
+        e = ends[valid]
+        mean = (csum[e] - csum[e - n]) / n
+        var = np.maximum((csq[e] - csq[e - n]) / n - mean * mean, 0.0)
+        mid[valid] = mean
+        std[valid] = np.sqrt(var)
+
+        self._window = values[-(n - 1):] if n > 1 else np.empty(0)
+        return {
+            'bb_mid': mid,
+            'bb_upper': mid + self.num_std * std,
+            'bb_lower': mid - self.num_std * std,
+        }
+
+
+class ATR(_Indicator):
+    """Average True Range with Wilder smoothing"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.columns = (f'atr_{period}',)
+        self._prev_close: Optional[float] = None
+        self._value: Optional[float] = None
+        self._seed: List[float] = []
+
+    def update(self, high, low, close, volume, timestamps):
+        prev = np.concatenate([[np.nan if self._prev_close is None else self._prev_close], close[:-1]])
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+        out = np.full(len(close), np.nan)
+        n = self.period
+
+        for i, value in enumerate(tr):
+            if self._value is None:
+                self._seed.append(value)
+                if len(self._seed) == n:
+                    self._value = sum(self._seed) / n
+                    self._seed = []
+                    out[i] = self._value
+            else:
+                self._value = (self._value * (n - 1) + value) / n
+                out[i] = self._value
+
+        if len(close):
+            self._prev_close = float(close[-1])
+        return {self.columns[0]: out}
+
+
+class VWAP(_Indicator):
+    """Volume-weighted average price, reset at each UTC session date"""
+
+    columns = ('vwap',)
+
+    def __init__(self):
+        self._day: Optional[int] = None
+        self._pv = 0.0
+        self._vol = 0.0
+
+    def update(self, high, low, close, volume, timestamps):
+        typical = (high + low + close) / 3
+        days = timestamps // 86_400_000_000_000
+        pv = typical * volume
+
+        # Cumulative sums that restart whenever the session day changes
+        new_session = np.concatenate([[self._day is None or days[0] != self._day], days[1:] != days[:-1]]) \
+            if len(days) else np.empty(0, dtype=bool)
+        session_id = np.cumsum(new_session)
+        cpv = np.cumsum(pv)
+        cvol = np.cumsum(volume)
+
+        starts = np.flatnonzero(new_session)
+        base_pv = np.zeros(len(starts) + 1)
+        base_vol = np.zeros(len(starts) + 1)
+        base_pv[0], base_vol[0] = -self._pv, -self._vol  # Continue the carried-over session
+        base_pv[1:] = np.concatenate([[0.0], cpv])[starts]
+        base_vol[1:] = np.concatenate([[0.0], cvol])[starts]
+
+        session_pv = cpv - base_pv[session_id]
+        session_vol = cvol - base_vol[session_id]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = np.where(session_vol > 0, session_pv / session_vol, np.nan)
+
+        if len(days):
+            self._day = int(days[-1])
+            self._pv = float(session_pv[-1])
+            self._vol = float(session_vol[-1])
+        return {'vwap': out}
+
+
+def _parse_spec(spec: str) -> _Indicator:
+    """Build an indicator from a spec such as 'sma:20', 'macd:12,26,9', 'bbands:20,2' or 'vwap'"""
+    name, _, args = spec.partition(':')
+    params = [float(a) for a in args.split(',')] if args else []
+    ints = [int(p) for p in params]
+
+    builders = {
+        'sma': lambda: SMA(*ints),
+        'ema': lambda: EMA(*ints),
+        'rsi': lambda: RSI(*ints),
+        'macd': lambda: MACD(*ints),
+        'bbands': lambda: BollingerBands(int(params[0]), params[1]) if len(params) > 1 else BollingerBands(*ints),
+        'atr': lambda: ATR(*ints),
+        'vwap': lambda: VWAP(),
+    }
+    if name not in builders:
+        raise ValueError(f"Unknown indicator: {spec}")
+    return builders[name]()
+
+
+class _CachedSeries:
+    """Indicator state plus its outputs and input closes, aligned to the bars processed so far"""
+
+    def __init__(self, indicator: _Indicator, max_rows: int, capacity: int = 1024):
+        self.indicator = indicator
+        self.max_rows = max_rows
+        self.rows = 0
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._close = np.empty(capacity)
+        self._outputs = {column: np.empty(capacity) for column in indicator.columns}
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[:self.rows]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._close[:self.rows]
+
+    @property
+    def outputs(self) -> Dict[str, np.ndarray]:
+        return {column: values[:self.rows] for column, values in self._outputs.items()}
+
+    def append(self, timestamps: np.ndarray, close: np.ndarray, outputs: Dict[str, np.ndarray]) -> None:
+        """Append in place, growing geometrically and keeping at most max_rows"""
+        k = len(timestamps)
+        if k > self.max_rows:
+            timestamps = timestamps[-self.max_rows:]
+            close = close[-self.max_rows:]
+            outputs = {column: values[-self.max_rows:] for column, values in outputs.items()}
+            k = self.max_rows
+
+        needed = self.rows + k
+        if needed > len(self._timestamps):
+            keep_from = max(0, needed - self.max_rows)
+            capacity = max(needed - keep_from, min(2 * len(self._timestamps), self.max_rows))
+            kept = self.rows - keep_from
+
+            grown = np.empty(capacity, dtype=np.int64)
+            grown[:kept] = self._timestamps[keep_from:self.rows]
+            self._timestamps = grown
+            grown = np.empty(capacity)
+            grown[:kept] = self._close[keep_from:self.rows]
+            self._close = grown
+            for column, values in self._outputs.items():
+                grown = np.empty(capacity)
+                grown[:kept] = values[keep_from:self.rows]
+                self._outputs[column] = grown
+            self.rows = kept
+
+        self._timestamps[self.rows:self.rows + k] = timestamps
+        self._close[self.rows:self.rows + k] = close
+        for column, values in outputs.items():
+            self._outputs[column][self.rows:self.rows + k] = values
+        self.rows += k
+
+
+class IndicatorEngine:
+    """
+    Cache of incremental indicators keyed by (symbol, interval, source, spec)
+
+    compute() checks the incoming frame against what was already processed:
+    every bar of the frame up to the last processed timestamp must match the
+    cached bars one for one, with the same close. Those rows are served from
+    the cache and only later bars are fed to the indicators. Any other frame
+    (earlier start, missing or extra bars, revised closes) resets the entry.
+    """
+
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS):
+        self.max_rows = max_rows
+        self._entries: Dict[Tuple[str, str, str, str], _CachedSeries] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, key: Tuple[str, str, str, str], timestamps: np.ndarray,
+               close: np.ndarray) -> Tuple[_CachedSeries, int]:
+        """Return the cache entry and the index of the first unprocessed bar"""
+        entry = self._entries.get(key)
+
+        if entry is not None and len(entry.timestamps) and len(timestamps):
+            cached = entry.timestamps
+            lo = int(np.searchsorted(cached, timestamps[0], side='left'))
+            overlap = min(len(cached) - lo, len(timestamps))
+            continues = (
+                lo < len(cached)
+                and cached[lo] == timestamps[0]
+                and np.array_equal(cached[lo:lo + overlap], timestamps[:overlap])
+                and np.array_equal(entry.close[lo:lo + overlap], close[:overlap], equal_nan=True)
+            )
+            if continues:
+                return entry, overlap
+
+        entry = _CachedSeries(_parse_spec(key[3]), self.max_rows)
+        self._entries[key] = entry
+        return entry, 0
+
+    def compute(self, symbol: str, interval: str, bars: pd.DataFrame,
+                specs: Sequence[str] = ('sma:20', 'sma:50'),
+                source: str = 'live') -> pd.DataFrame:
+        """
+        Indicator values for every row of `bars`
+
+        Args:
+            symbol: Stock ticker symbol
+            interval: Bar interval of `bars` (part of the cache key)
+            bars: DataFrame with timestamp, high, low, close, volume columns (not modified)
+            specs: Indicator specs, e.g. ['sma:20', 'ema:12', 'rsi:14', 'macd:12,26,9',
+                   'bbands:20,2', 'atr:14', 'vwap']
+            source: Where the bars come from (e.g. 'live', 'synthetic'); part of the
+                    cache key so different feeds never share indicator state
+
+        Returns:
+            DataFrame: One column per indicator output, indexed like `bars`
+        """
+        ts = pd.to_datetime(bars['timestamp'])
+        if ts.dt.tz is not None:
+            ts = ts.dt.tz_convert('UTC').dt.tz_localize(None)
+        timestamps = ts.astype('datetime64[ns]').to_numpy().view('i8')
+
+        high = bars['high'].to_numpy(dtype=float)
+        low = bars['low'].to_numpy(dtype=float)
+        close = bars['close'].to_numpy(dtype=float)
+        volume = bars['volume'].to_numpy(dtype=float) if 'volume' in bars else np.zeros(len(bars))
+
+        result = {}
+        with self._lock:
+            for spec in specs:
+                entry, start = self._entry((symbol, interval, source, spec), timestamps, close)
+
+                if start < len(timestamps):
+                    outputs = entry.indicator.update(
+                        high[start:], low[start:], close[start:], volume[start:], timestamps[start:]
+                    )
+                    entry.append(timestamps[start:], close[start:], outputs)
+
+                # Align cached outputs to the requested rows by timestamp; rows
+                # older than the cache's retained window come back as NaN
+                cached = entry.timestamps
+                pos = np.minimum(np.searchsorted(cached, timestamps, side='left'), max(len(cached) - 1, 0))
+                found = cached[pos] == timestamps
+                for column, values in entry.outputs.items():
+                    result[column] = np.where(found, values[pos], np.nan)
+
+        return pd.DataFrame(result, index=bars.index)
+
+    def latest(self, symbol: str, interval: str, spec: str, source: str = 'live') -> Dict[str, float]:
+        """Most recent cached values for an indicator (empty if never computed)"""
+        with self._lock:
+            entry = self._entries.get((symbol, interval, source, spec))
+            if entry is None or not len(entry.timestamps):
+                return {}
+            return {column: float(values[-1]) for column, values in entry.outputs.items()}
+
+    def clear(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == symbol]:
+                    del self._entries[key]
+
+
+_engine: Optional[IndicatorEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_indicator_engine() -> IndicatorEngine:
+    """Get the process-wide indicator engine shared by all sessions"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = IndicatorEngine()
+        return _engine
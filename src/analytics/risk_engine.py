@@ -0,0 +1,396 @@
+"""
+Risk Engine
+Portfolio risk from historical returns instead of cross-sectional P&L
+
+Best Practices Implemented:
+- Returns matrix (time x symbols) built from the on-disk bar store,
+  aligned on common timestamps, with the benchmark (^GSPC) alongside
+- Historical and parametric VaR / CVaR, rolling max drawdown and beta,
+  vectorized across symbols and across many portfolios at once
+- Sample or Ledoit-Wolf shrinkage covariance, cached per
+  (universe, window) so portfolios on the same universe share it
+- Normal quantiles from the standard library (no SciPy dependency)
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from statistics import NormalDist
+import threading
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from ..data.bar_store import BarStore
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_SYMBOL = '^GSPC'
+DEFAULT_WINDOW = 252          # Return observations (one year of daily bars)
+PERIODS_PER_YEAR = 252
+DEFAULT_COV_CACHE_SIZE = 64
+
+
+@dataclass
+class ReturnsMatrix:
+    """Aligned simple returns, shape (time, symbols), plus optional benchmark returns"""
+    symbols: Tuple[str, ...]
+    timestamps: pd.DatetimeIndex
+    returns: np.ndarray
+    market: Optional[np.ndarray] = None
+    interval: str = '1d'
+    _fingerprint: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def window(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the returns, computed once per matrix"""
+        if self._fingerprint is None:
+            digest = hashlib.sha1(np.ascontiguousarray(self.returns, dtype=np.float64).tobytes())
+            digest.update(repr(self.returns.shape).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @property
+    def cache_key(self) -> Tuple:
+        """(universe, window, content) identity used for the covariance cache"""
+        end = self.timestamps[-1].value if len(self.timestamps) else None
+        return (self.symbols, self.interval, self.window, end, self.fingerprint)
+
+    def weights(self, allocation: Union[Dict[str, float], Sequence[float], np.ndarray]) -> np.ndarray:
+        """
+        Weight vector (or matrix, one row per portfolio) in this matrix's symbol order
+
+        Dict allocations are normalized to sum to 1; symbols missing from
+        the universe are dropped.
+        """
+        if isinstance(allocation, dict):
+            index = {s: i for i, s in enumerate(self.symbols)}
+            w = np.zeros(len(self.symbols))
+            for symbol, value in allocation.items():
+                if symbol in index:
+                    w[index[symbol]] += value
+            total = w.sum()
+            return w / total if total else w
+        return np.asarray(allocation, dtype=np.float64)
+
+
+def _simple_returns(close: np.ndarray) -> np.ndarray:
+    return close[1:] / close[:-1] - 1
+
+
+def returns_from_prices(prices: pd.DataFrame, benchmark: Optional[str] = BENCHMARK_SYMBOL,
+                        interval: str = '1d') -> ReturnsMatrix:
+    """
+    Build a ReturnsMatrix from a wide close-price frame (index: time, columns: symbols)
+
+    Rows with any missing price are dropped. A `benchmark` column, if
+    present, becomes the market series rather than a universe member.
+    """
+    prices = prices.dropna()
+    market = None
+    if benchmark is not None and benchmark in prices.columns:
+        market = _simple_returns(prices[benchmark].to_numpy(dtype=np.float64))
+        prices = prices.drop(columns=[benchmark])
+
+    return ReturnsMatrix(
+        symbols=tuple(str(c) for c in prices.columns),
+        timestamps=pd.DatetimeIndex(prices.index[1:]),
+        returns=_simple_returns(prices.to_numpy(dtype=np.float64)),
+        market=market,
+        interval=interval
+    )
+
+
+def returns_from_store(symbols: Sequence[str], interval: str = '1d',
+                       window: int = DEFAULT_WINDOW,
+                       store: Optional['BarStore'] = None,
+                       benchmark: Optional[str] = BENCHMARK_SYMBOL) -> ReturnsMatrix:
+    """
+    Build a ReturnsMatrix from stored bars
+
+    Closes are read from the memory-mapped store columns and aligned on
+    the timestamps every symbol (and the benchmark, if stored) has.
+
+    Args:
+        symbols: Universe
+        interval: Bar interval
+        window: Number of return observations to keep (most recent)
+        store: Bar store (default: process-wide store)
+        benchmark: Market symbol for beta; skipped if not stored
+
+    Returns:
+        ReturnsMatrix: Symbols without stored bars are left out
+    """
+    if store is None:
+        # Imported lazily: the data package pulls in the live-data providers
+        from ..data.bar_store import get_bar_store
+        store = get_bar_store()
+    symbols = list(dict.fromkeys(symbols))
+
+    columns = {}
+    for symbol in symbols + ([benchmark] if benchmark and benchmark not in symbols else []):
+        arrays = store.load_arrays(symbol, interval, columns=('timestamp', 'close'))
+        if arrays is None:
+            if symbol != benchmark:
+                logger.warning(f"No stored {interval} bars for {symbol}; excluded from risk universe")
+            continue
+        columns[symbol] = arrays
+
+    universe = [s for s in symbols if s in columns]
+    if not universe:
+        return ReturnsMatrix((), pd.DatetimeIndex([], tz='UTC'), np.empty((0, 0)), None, interval)
+
+    common = columns[universe[0]]['timestamp']
+    for arrays in columns.values():
+        common = np.intersect1d(common, arrays['timestamp'], assume_unique=True)
+    common = common[-(window + 1):]
+
+    def aligned_close(symbol: str) -> np.ndarray:
+        ts = columns[symbol]['timestamp']
+        return np.asarray(columns[symbol]['close'])[np.searchsorted(ts, common)]
+
+    close = np.column_stack([aligned_close(s) for s in universe]) if len(common) else np.empty((0, len(universe)))
+    market = _simple_returns(aligned_close(benchmark)) if benchmark in columns and len(common) else None
+
+    return ReturnsMatrix(
+        symbols=tuple(universe),
+        timestamps=pd.DatetimeIndex(common[1:].view('datetime64[ns]'), tz='UTC'),
+        returns=_simple_returns(close) if len(common) > 1 else np.empty((0, len(universe))),
+        market=market,
+        interval=interval
+    )
+
+
+def ledoit_wolf(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf shrinkage covariance toward a scaled identity
+
+    Returns:
+        (covariance, shrinkage intensity in [0, 1])
+    """
+    t, n = returns.shape
+    x = returns - returns.mean(axis=0)
+    sample = x.T @ x / t
+    mu = np.trace(sample) / n
+
+    x2 = x ** 2
+    phi = np.sum(x2.T @ x2) / t - np.sum(sample ** 2)
+    gamma = np.sum((sample - mu * np.eye(n)) ** 2)
+
+    beta = min(phi / t, gamma)
+    shrinkage = 0.0 if gamma == 0 else beta / gamma
+    return (1 - shrinkage) * sample + shrinkage * mu * np.eye(n), shrinkage
+
+
+def drawdown_series(returns: np.ndarray) -> np.ndarray:
+    """Drawdown from the running peak for each column of returns (<= 0)"""
+    wealth = np.cumprod(1 + returns, axis=0)
+    peak = np.maximum.accumulate(np.maximum(wealth, 1.0), axis=0)
+    return wealth / peak - 1
+
+
+def rolling_max_drawdown(returns: np.ndarray, window: int) -> np.ndarray:
+    """
+    Worst peak-to-trough drawdown inside each trailing `window` of returns
+
+    Args:
+        returns: Shape (T,) or (T, P)
+
+    Returns:
+        ndarray: Shape (T - window + 1,) or (T - window + 1, P), values <= 0
+    """
+    r = returns.reshape(len(returns), -1)
+    if len(r) < window:
+        return np.empty((0,) + returns.shape[1:])
+
+    # Wealth inside each window, starting from 1 at the window start
+    windows = np.lib.stride_tricks.sliding_window_view(r, window, axis=0)  # (W, P, window)
+    wealth = np.cumprod(1 + windows, axis=2)
+    peak = np.maximum.accumulate(np.maximum(wealth, 1.0), axis=2)
+    worst = (wealth / peak - 1).min(axis=2)
+    return worst if returns.ndim > 1 else worst[:, 0]
+
+
+class RiskEngine:
+    """
+    Historical-returns risk metrics for one or many portfolios
+
+    Covariance matrices are cached per ReturnsMatrix.cache_key and
+    shrinkage setting, so every portfolio over the same returns
+    reuses one estimate.
+    """
+
+    def __init__(self, confidence: float = 0.95, shrinkage: Union[None, str, float] = 'ledoit_wolf',
+                 periods_per_year: int = PERIODS_PER_YEAR,
+                 cache_size: int = DEFAULT_COV_CACHE_SIZE):
+        """
+        Args:
+            confidence: VaR/CVaR confidence level
+            shrinkage: None (sample), 'ledoit_wolf', or a fixed intensity in [0, 1]
+            periods_per_year: Annualization factor for the returns interval
+            cache_size: Covariance matrices kept (LRU)
+        """
+        self.confidence = confidence
+        self.shrinkage = shrinkage
+        self.periods_per_year = periods_per_year
+        self.cache_size = cache_size
+        self._cov_cache: 'OrderedDict[Tuple, Tuple[np.ndarray, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.cov_hits = 0
+        self.cov_misses = 0
+
+    def covariance(self, matrix: ReturnsMatrix,
+                   shrinkage: Union[None, str, float] = 'default') -> Tuple[np.ndarray, float]:
+        """
+        Covariance of the universe's returns (cached)
+
+        Returns:
+            (covariance matrix in symbol order, shrinkage intensity used)
+        """
+        shrinkage = self.shrinkage if shrinkage == 'default' else shrinkage
+        key = (matrix.cache_key, shrinkage)
+
+        with self._lock:
+            if key in self._cov_cache:
+                self._cov_cache.move_to_end(key)
+                self.cov_hits += 1
+                return self._cov_cache[key]
+
+        r = matrix.returns
+        if shrinkage == 'ledoit_wolf':
+            result = ledoit_wolf(r)
+        else:
+            sample = np.cov(r, rowvar=False, ddof=1).reshape(r.shape[1], r.shape[1])
+            intensity = float(shrinkage or 0.0)
+            target = np.trace(sample) / len(sample) * np.eye(len(sample))
+            result = ((1 - intensity) * sample + intensity * target, intensity)
+
+        with self._lock:
+            self.cov_misses += 1
+            self._cov_cache[key] = result
+            while len(self._cov_cache) > self.cache_size:
+                self._cov_cache.popitem(last=False)
+        return result
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cov_cache.clear()
+
+    def _tail(self, portfolio_returns: np.ndarray) -> Dict[str, np.ndarray]:
+        """Historical VaR/CVaR per column (positive numbers are losses)"""
+        alpha = 1 - self.confidence
+        q = np.quantile(portfolio_returns, alpha, axis=0)
+        tail = np.where(portfolio_returns <= q, portfolio_returns, np.nan)
+        return {'var': -q, 'cvar': -np.nanmean(tail, axis=0)}
+
+    def _parametric(self, weights: np.ndarray, matrix: ReturnsMatrix) -> Dict[str, np.ndarray]:
+        """Normal VaR/CVaR per portfolio using the cached covariance"""
+        alpha = 1 - self.confidence
+        z = NormalDist().inv_cdf(alpha)
+        cov, _ = self.covariance(matrix)
+        mu = weights @ matrix.returns.mean(axis=0)
+        sigma = np.sqrt(np.einsum('pi,ij,pj->p', weights, cov, weights))
+        return {
+            'var': -(mu + z * sigma),
+            'cvar': -(mu - sigma * NormalDist().pdf(z) / alpha),
+            'sigma': sigma,
+        }
+
+    def beta(self, series: np.ndarray, market: Optional[np.ndarray]) -> np.ndarray:
+        """Beta of each column of `series` against the market returns"""
+        cols = series.reshape(len(series), -1)
+        if market is None or len(market) < 2:
+            return np.full(cols.shape[1], np.nan)
+        m = market - market.mean()
+        var_m = m @ m
+        if var_m == 0:
+            return np.full(cols.shape[1], np.nan)
+        return (cols - cols.mean(axis=0)).T @ m / var_m
+
+    def analyze_many(self, weights: np.ndarray, matrix: ReturnsMatrix,
+                     drawdown_window: Optional[int] = None) -> pd.DataFrame:
+        """
+        Risk metrics for many portfolios over one universe
+
+        Args:
+            weights: Shape (portfolios, symbols) in matrix.symbols order
+            matrix: Returns matrix
+            drawdown_window: Trailing window for the rolling max drawdown
+                             (default: whole history)
+
+        Returns:
+            DataFrame: One row per portfolio; VaR/CVaR/drawdown as return
+            fractions (positive VaR/CVaR = loss)
+        """
+        weights = np.atleast_2d(weights)
+        port = matrix.returns @ weights.T                      # (T, P)
+
+        hist = self._tail(port)
+        param = self._parametric(weights, matrix)
+        window = drawdown_window or len(port)
+        rolling = rolling_max_drawdown(port, window) if len(port) >= window else np.empty((0, len(weights)))
+        downside = np.where(port < 0, port, np.nan)
+
+        with np.errstate(invalid='ignore'):
+            downside_std = np.nanstd(downside, axis=0, ddof=1)
+
+        return pd.DataFrame({
+            'var_historical': hist['var'],
+            'cvar_historical': hist['cvar'],
+            'var_parametric': param['var'],
+            'cvar_parametric': param['cvar'],
+            'volatility_annual': param['sigma'] * np.sqrt(self.periods_per_year),
+            'max_drawdown': drawdown_series(port).min(axis=0),
+            'rolling_max_drawdown': rolling[-1] if len(rolling) else np.full(len(weights), np.nan),
+            'beta': self.beta(port, matrix.market),
+            'downside_risk': downside_std * np.sqrt(self.periods_per_year),
+        })
+
+    def analyze(self, allocation: Union[Dict[str, float], Sequence[float]],
+                matrix: ReturnsMatrix, portfolio_value: float = 1.0,
+                drawdown_window: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Risk metrics for one portfolio
+
+        Args:
+            allocation: symbol -> weight or market value, or a weight vector
+            matrix: Returns matrix
+            portfolio_value: Scales VaR/CVaR to currency amounts
+            drawdown_window: See analyze_many
+
+        Returns:
+            dict: Metrics from analyze_many plus *_amount fields in currency
+        """
+        row = self.analyze_many(matrix.weights(allocation)[None, :], matrix, drawdown_window).iloc[0]
+        result = {k: float(v) for k, v in row.items()}
+        for key in ('var_historical', 'cvar_historical', 'var_parametric', 'cvar_parametric'):
+            result[f'{key}_amount'] = result[key] * portfolio_value
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'cached_covariances': len(self._cov_cache),
+                'cov_hits': self.cov_hits,
+                'cov_misses': self.cov_misses,
+            }
+
+
+_risk_engine: Optional[RiskEngine] = None
+_risk_engine_lock = threading.Lock()
+
+
+def get_risk_engine() -> RiskEngine:
+    """Get the process-wide risk engine (shared covariance cache)"""
+    global _risk_engine
+    with _risk_engine_lock:
+        if _risk_engine is None:
+            _risk_engine = RiskEngine()
+        return _risk_engine
@@ -0,0 +1,189 @@
+"""
+Scenario Grid
+Stress-test runway and balances over the Cartesian product of shocks
+
+Best Practices Implemented:
+- Income shocks x expense shocks x client-loss events x horizons
+  evaluated in one broadcast pass: a single (I, E, L, months) balance
+  tensor and one cumulative sum, no per-scenario Python loop
+- Runway for every cell from the same first-negative-month search used
+  by the seasonal runway, so grid cells agree with calculate_runway
+- Optional fitted seasonality applied to income month by month
+- Long-format DataFrame output that pivots straight into a heatmap
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .seasonality import RUNWAY_HORIZON_MONTHS, SeasonalFactors, runway_from_path
+
+logger = logging.getLogger(__name__)
+
+GRID_COLUMNS = ['income_change_pct', 'expense_change_pct', 'client_loss_pct', 'horizon_months']
+
+
+def client_loss_shares(clients: List[Dict[str, Any]], max_clients: int = 3) -> List[float]:
+    """
+    Client-loss events from client revenue: losing the top 1..max_clients clients
+
+    Args:
+        clients: Client dicts with 'total_paid' (as in analyze_income_diversity)
+        max_clients: Largest number of top clients lost at once
+
+    Returns:
+        list: Income lost in percent, starting with 0 (no loss)
+    """
+    revenue = np.sort(np.array([c.get('total_paid', 0) or 0 for c in clients], dtype=float))[::-1]
+    total = revenue.sum()
+    if total <= 0:
+        return [0.0]
+    return [0.0] + (np.cumsum(revenue[:max_clients]) / total * 100).tolist()
+
+
+def scenario_grid(current_balance: float,
+                  monthly_income: float,
+                  monthly_expenses: float,
+                  income_shocks: Sequence[float] = (0,),
+                  expense_shocks: Sequence[float] = (0,),
+                  client_losses: Sequence[float] = (0,),
+                  horizons: Sequence[int] = (6, 12),
+                  client_loss_month: int = 0,
+                  seasonality: Optional[SeasonalFactors] = None,
+                  runway_horizon: int = RUNWAY_HORIZON_MONTHS) -> pd.DataFrame:
+    """
+    Evaluate every combination of shocks in one vectorized pass
+
+    Args:
+        current_balance: Current cash balance
+        monthly_income: Current monthly income
+        monthly_expenses: Current monthly expenses
+        income_shocks: Income changes in percent (e.g. -30, -10, 0, 10)
+        expense_shocks: Expense changes in percent
+        client_losses: Share of (shocked) income lost to departing clients, in percent
+        horizons: Months at which to report the balance
+        client_loss_month: Months from now until the client loss takes effect
+        seasonality: Fitted factors applied to income month by month
+        runway_horizon: Months searched for the runway (beyond -> inf)
+
+    Returns:
+        pd.DataFrame: One row per (income, expense, client loss, horizon)
+        cell with net_monthly, end_balance, runway_months and survives
+    """
+    income_pct = np.asarray(income_shocks, dtype=float)
+    expense_pct = np.asarray(expense_shocks, dtype=float)
+    loss_pct = np.asarray(client_losses, dtype=float)
+    horizon = np.asarray(horizons, dtype=int)
+    if horizon.size == 0 or horizon.min() < 1:
+        raise ValueError("horizons must be non-empty and at least 1 month")
+    months = max(int(horizon.max()), runway_horizon)
+
+    factors = seasonality.months_ahead(months) if seasonality is not None else np.ones(months)
+    retained = np.where(np.arange(months) >= client_loss_month,
+                        1 - loss_pct[:, None] / 100, 1.0)                      # (L, T)
+    income = monthly_income * (1 + income_pct / 100)                           # (I,)
+    expenses = monthly_expenses * (1 + expense_pct / 100)                       # (E,)
+
+    # (I, 1, L, T) income minus (1, E, 1, 1) expenses -> (I, E, L, T) net, then balances in place
+    path = (income[:, None, None, None] * retained[None, None] * factors) - expenses[None, :, None, None]
+    np.cumsum(path, axis=-1, out=path)
+    path += current_balance
+
+    runway = runway_from_path(current_balance, path)                            # (I, E, L)
+    end_balance = path[..., horizon - 1]                                        # (I, E, L, H)
+    net_monthly = (income[:, None, None] * (1 - loss_pct / 100)) - expenses[None, :, None]
+
+    shape = end_balance.shape
+    i, e, l, h = np.indices(shape).reshape(4, -1)
+    runway_cells = np.broadcast_to(runway[..., None], shape).ravel()
+    return pd.DataFrame({
+        'income_change_pct': income_pct[i],
+        'expense_change_pct': expense_pct[e],
+        'client_loss_pct': loss_pct[l],
+        'horizon_months': horizon[h],
+        'monthly_income': (income[:, None] * (1 - loss_pct / 100))[i, l],
+        'monthly_expenses': expenses[e],
+        'net_monthly': np.broadcast_to(net_monthly[..., None], shape).ravel(),
+        'end_balance': end_balance.ravel(),
+        'runway_months': runway_cells,
+        'survives': runway_cells >= horizon[h],
+    })
+
+
+def scenario_heatmap(grid: pd.DataFrame, value: str = 'runway_months',
+                     rows: str = 'expense_change_pct', columns: str = 'income_change_pct',
+                     cap: Optional[float] = None, **fixed: Any) -> pd.DataFrame:
+    """
+    Pivot a scenario grid into a heatmap matrix
+
+    Args:
+        grid: Output of scenario_grid
+        value: Cell value column
+        rows: Column for the heatmap rows
+        columns: Column for the heatmap columns
+        cap: Clip values (e.g. infinite runway) to this maximum
+        **fixed: Values for the remaining grid dimensions, e.g.
+            client_loss_pct=0, horizon_months=12 (default: first value)
+
+    Returns:
+        pd.DataFrame: rows x columns matrix, ready for px.imshow / go.Heatmap
+    """
+    mask = np.ones(len(grid), dtype=bool)
+    for dim in GRID_COLUMNS:
+        if dim in (rows, columns):
+            continue
+        level = fixed.get(dim, grid[dim].iloc[0])
+        mask &= grid[dim].to_numpy() == level
+    matrix = grid[mask].pivot(index=rows, columns=columns, values=value)
+    if cap is not None:
+        matrix = matrix.clip(upper=cap)
+    return matrix
+
+
+def benchmark_scenario_grid(income_steps: int = 20, expense_steps: int = 20, loss_steps: int = 5,
+                            horizon_steps: int = 5) -> Dict[str, Any]:
+    """
+    Time a 10k-cell seasonal stress grid against the per-scenario loop
+
+    The baseline runs scenario_analysis with the same seasonality over the
+    income x expense x client-loss combinations (it reports 6 and 12
+    months only, so it covers fewer cells than the grid).
+
+    Returns:
+        dict: Cells and milliseconds for the grid and the scalar baseline
+    """
+    from .cashflow_engine import CashFlowEngine
+
+    income_shocks = np.linspace(-50, 20, income_steps)
+    expense_shocks = np.linspace(-20, 50, expense_steps)
+    losses = np.linspace(0, 60, loss_steps)
+    horizons = np.linspace(3, 36, horizon_steps).astype(int)
+    month = 1 + 0.3 * np.cos(np.arange(12) / 12 * 2 * np.pi)
+    seasonality = SeasonalFactors(month / month.mean(), np.ones(7), 0, 0.0)
+
+    start = time.perf_counter()
+    grid = scenario_grid(50_000, 8_000, 7_000, income_shocks, expense_shocks, losses, horizons,
+                         seasonality=seasonality)
+    grid_seconds = time.perf_counter() - start
+
+    scenarios = [
+        {'name': f'{a:.0f}/{b:.0f}/{c:.0f}',
+         'income_change_pct': ((1 + a / 100) * (1 - c / 100) - 1) * 100,
+         'expense_change_pct': b}
+        for a in income_shocks for b in expense_shocks for c in losses
+    ]
+    start = time.perf_counter()
+    CashFlowEngine.scenario_analysis(50_000, 8_000, 7_000, scenarios, seasonality=seasonality)
+    loop_seconds = time.perf_counter() - start
+
+    result = {
+        'cells': len(grid),
+        'baseline_scenarios': len(scenarios),
+        'grid_ms': grid_seconds * 1e3,
+        'scenario_loop_ms': loop_seconds * 1e3,
+    }
+    logger.info(f"Scenario grid benchmark: {result}")
+    return result
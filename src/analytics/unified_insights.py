@@ -8,6 +8,8 @@ from datetime import datetime
 import pandas as pd
 import streamlit as st
 
+from .health_scoring import HealthScoreStore, get_health_score_store
+
 class UnifiedInsights:
     """Provides integrated insights across business, trading, and emotional intelligence"""
     
@@ -15,7 +17,8 @@ class UnifiedInsights:
     @st.cache_data(ttl=300)
     def get_total_net_worth(business_data: Dict[str, float],
                            trading_data: Dict[str, float],
-                           personal_data: Dict[str, float] = None) -> Dict[str, Any]:
+                           personal_data: Dict[str, float] = None,
+                           performance: Dict[str, Dict[str, float]] = None) -> Dict[str, Any]:
         """
         Calculate total net worth across all accounts
         
@@ -23,6 +26,9 @@ class UnifiedInsights:
             business_data: Business accounts {'checking': X, 'tax_pot': Y, 'receivables': Z}
             trading_data: Trading accounts {'portfolio': X, 'cash': Y}
             personal_data: Personal accounts (optional)
+            performance: Period returns keyed 'business', 'trading', 'personal'
+                and 'total', e.g. PerformanceIndex.period_returns(start, end)
+                on an index with those account columns (optional)
             
         Returns:
             dict: Total net worth breakdown
@@ -43,23 +49,30 @@ class UnifiedInsights:
         # Total
         total_net_worth = total_business + total_trading + total_personal
         
+        # Time- and money-weighted returns (deposits are not performance)
+        performance = performance or {}
+        
         return {
             'total_net_worth': total_net_worth,
+            'performance': performance.get('total'),
             'business_assets': {
                 'total': total_business,
                 'liquid': business_liquid,
                 'receivables': business_receivables,
-                'percentage': (total_business / total_net_worth * 100) if total_net_worth > 0 else 0
+                'percentage': (total_business / total_net_worth * 100) if total_net_worth > 0 else 0,
+                'performance': performance.get('business')
             },
             'trading_assets': {
                 'total': total_trading,
                 'portfolio': portfolio_value,
                 'cash': trading_cash,
-                'percentage': (total_trading / total_net_worth * 100) if total_net_worth > 0 else 0
+                'percentage': (total_trading / total_net_worth * 100) if total_net_worth > 0 else 0,
+                'performance': performance.get('trading')
             },
             'personal_assets': {
                 'total': total_personal,
-                'percentage': (total_personal / total_net_worth * 100) if total_net_worth > 0 else 0
+                'percentage': (total_personal / total_net_worth * 100) if total_net_worth > 0 else 0,
+                'performance': performance.get('personal')
             },
             'allocation': {
                 'business': (total_business / total_net_worth * 100) if total_net_worth > 0 else 0,
@@ -151,6 +164,23 @@ class UnifiedInsights:
             }
         }
     
+    @staticmethod
+    def get_stored_financial_health(user_id: Any,
+                                    store: Optional[HealthScoreStore] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read a user's scores from the latest nightly batch run
+        
+        Args:
+            user_id: User key used by run_batch_scoring
+            store: Score store (default: process-wide store)
+            
+        Returns:
+            dict or None: Financial score (get_financial_health_score
+            format) with a 'holistic' sub-dict; None if the user is not in
+            the latest run, so callers can fall back to live scoring
+        """
+        return (store or get_health_score_store()).lookup(user_id)
+    
     @staticmethod
     def get_emotion_impact_on_finances(emotion_history: pd.DataFrame,
                                       financial_decisions: List[Dict[str, Any]]) -> Dict[str, Any]:
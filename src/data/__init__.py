@@ -10,10 +10,64 @@ from .live_data import (
     generate_synthetic_fallback
 )
 
+from .fetch_scheduler import (
+    FetchScheduler,
+    TokenBucket,
+    get_fetch_scheduler
+)
+
+from .quote_cache import (
+    QuoteCache,
+    get_quote_cache
+)
+
+from .bar_store import (
+    BarStore,
+    get_bar_store
+)
+
+from .synthetic_bars import (
+    SyntheticBarEngine,
+    SyntheticBars,
+    generate_synthetic_bars
+)
+
+from .tick_engine import (
+    Tick,
+    QuoteBus,
+    Subscription,
+    TickEngine,
+    SimulatedTickSource,
+    get_tick_engine
+)
+
+from .replay import (
+    BarReplaySource,
+    ReplaySession
+)
+
 __all__ = [
     'LiveMarketData',
     'get_market_data_hybrid',
     'get_portfolio_live_prices',
-    'generate_synthetic_fallback'
+    'generate_synthetic_fallback',
+    'FetchScheduler',
+    'TokenBucket',
+    'get_fetch_scheduler',
+    'QuoteCache',
+    'get_quote_cache',
+    'BarStore',
+    'get_bar_store',
+    'SyntheticBarEngine',
+    'SyntheticBars',
+    'generate_synthetic_bars',
+    'Tick',
+    'QuoteBus',
+    'Subscription',
+    'TickEngine',
+    'SimulatedTickSource',
+    'get_tick_engine',
+    'BarReplaySource',
+    'ReplaySession'
 ]
 
@@ -0,0 +1,452 @@
+"""
+Bar Store Module
+Persistent on-disk OHLCV storage partitioned by interval and symbol
+
+Layout (one directory per partition, one raw column file per field):
+
+    <root>/<interval>/<symbol>/timestamp.bin   int64 UTC nanoseconds
+    <root>/<interval>/<symbol>/open.bin        float64
+    ...
+    <root>/<interval>/<symbol>/meta.json       {"rows": N, "tz": "America/New_York"}
+
+Best Practices Implemented:
+- Tail-only writes: refreshes add the missing bars and rewrite only the
+  last stored bar (it may have been stored while still forming)
+- Zero-copy reads via read-only np.memmap views
+- Crash safety: meta.json is the source of truth for the row count and is
+  replaced atomically after the column data is written
+- No extra dependencies (NumPy only)
+"""
+
+from typing import Dict, Iterable, List, Optional
+from datetime import timedelta
+import json
+import os
+import re
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = os.environ.get('PULSETRADE_BAR_STORE', os.path.join('.cache', 'bars'))
+
+# Column name -> on-disk dtype
+COLUMNS = {
+    'timestamp': np.dtype('<i8'),
+    'open': np.dtype('<f8'),
+    'high': np.dtype('<f8'),
+    'low': np.dtype('<f8'),
+    'close': np.dtype('<f8'),
+    'volume': np.dtype('<f8'),
+}
+
+# yfinance period strings -> lookback window (None means everything stored)
+PERIOD_WINDOWS = {
+    '1d': timedelta(days=1),
+    '5d': timedelta(days=5),
+    '1mo': timedelta(days=30),
+    '3mo': timedelta(days=91),
+    '6mo': timedelta(days=182),
+    '1y': timedelta(days=365),
+    '2y': timedelta(days=730),
+    '5y': timedelta(days=1826),
+    '10y': timedelta(days=3652),
+    'max': None,
+}
+
+_INTERVAL_RE = re.compile(r'^(\d+)(m|h|d|wk|mo)$')
+_INTERVAL_UNITS = {
+    'm': timedelta(minutes=1),
+    'h': timedelta(hours=1),
+    'd': timedelta(days=1),
+    'wk': timedelta(weeks=1),
+    'mo': timedelta(days=30),
+}
+
+
+def interval_to_timedelta(interval: str) -> timedelta:
+    """Convert a yfinance interval string (e.g. '15m', '1d', '1wk') to a timedelta"""
+    match = _INTERVAL_RE.match(interval)
+    if not match:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return int(match.group(1)) * _INTERVAL_UNITS[match.group(2)]
+
+
+def period_to_timedelta(period: str) -> Optional[timedelta]:
+    """Convert a yfinance period string to a lookback window (None for 'max')"""
+    if period == 'ytd':
+        now = pd.Timestamp.now(tz='UTC')
+        return now - now.normalize().replace(month=1, day=1)
+    return PERIOD_WINDOWS.get(period)
+
+
+class BarStore:
+    """
+    Columnar OHLCV store on the local filesystem
+
+    Thread-safe within a process; one writer per partition at a time.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or DEFAULT_ROOT
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Paths and metadata
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _safe_name(name: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.^=-]', '_', name)
+
+    def partition_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, self._safe_name(interval), self._safe_name(symbol))
+
+    def _lock(self, path: str) -> threading.Lock:
+        with self._locks_guard:
+            if path not in self._locks:
+                self._locks[path] = threading.Lock()
+            return self._locks[path]
+
+    @staticmethod
+    def _read_meta(path: str) -> Dict:
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'rows': 0, 'tz': None}
+
+    @staticmethod
+    def _write_meta(path: str, meta: Dict) -> None:
+        tmp = os.path.join(path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, 'meta.json'))
+
+    def row_count(self, symbol: str, interval: str) -> int:
+        return int(self._read_meta(self.partition_path(symbol, interval)).get('rows', 0))
+
+    def symbols(self, interval: str) -> List[str]:
+        """Symbols with stored bars for an interval"""
+        base = os.path.join(self.root, self._safe_name(interval))
+        if not os.path.isdir(base):
+            return []
+        return sorted(
+            name for name in os.listdir(base)
+            if os.path.exists(os.path.join(base, name, 'meta.json'))
+        )
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def load_arrays(self, symbol: str, interval: str,
+                    columns: Iterable[str] = tuple(COLUMNS)) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Map stored columns into memory without copying
+
+        Returns:
+            dict: Column -> read-only np.memmap of length rows, None if nothing stored
+        """
+        path = self.partition_path(symbol, interval)
+        rows = int(self._read_meta(path).get('rows', 0))
+        if rows == 0:
+            return None
+
+        arrays = {}
+        for column in columns:
+            arrays[column] = np.memmap(
+                os.path.join(path, f'{column}.bin'),
+                dtype=COLUMNS[column],
+                mode='r',
+                shape=(rows,)
+            )
+        return arrays
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[pd.Timestamp]:
+        """Timestamp of the newest stored bar (UTC), None if nothing stored"""
+        arrays = self.load_arrays(symbol, interval, columns=('timestamp',))
+        if arrays is None:
+            return None
+        return pd.Timestamp(int(arrays['timestamp'][-1]), tz='UTC')
+
+    def load(self, symbol: str, interval: str,
+             start: Optional[pd.Timestamp] = None,
+             end: Optional[pd.Timestamp] = None,
+             period: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Load stored bars as a DataFrame backed by the memory-mapped columns
+
+        Args:
+            symbol: Stock ticker symbol
+            interval: Bar interval (e.g. '15m', '1d')
+            start: Inclusive lower bound
+            end: Exclusive upper bound
+            period: yfinance period string, measured back from the newest stored
+                    bar so the result is the same with or without network
+
+        Returns:
+            DataFrame: timestamp, open, high, low, close, volume; None if nothing stored
+        """
+        path = self.partition_path(symbol, interval)
+        meta = self._read_meta(path)
+        arrays = self.load_arrays(symbol, interval)
+        if arrays is None:
+            return None
+
+        timestamps = arrays['timestamp']
+
+        if period is not None and start is None:
+            window = period_to_timedelta(period)
+            if window is not None:
+                start = pd.Timestamp(int(timestamps[-1]), tz='UTC') - window
+
+        lo = 0 if start is None else int(np.searchsorted(timestamps, _to_utc_ns(start), side='left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, _to_utc_ns(end), side='left'))
+
+        data = {'timestamp': pd.DatetimeIndex(timestamps[lo:hi].view('datetime64[ns]'), tz='UTC')}
+        if meta.get('tz'):
+            data['timestamp'] = data['timestamp'].tz_convert(meta['tz'])
+        for column in COLUMNS:
+            if column != 'timestamp':
+                data[column] = arrays[column][lo:hi]
+
+        return pd.DataFrame(data, copy=False)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, symbol: str, interval: str, bars: pd.DataFrame) -> int:
+        """
+        Upsert the tail: replace the last stored bar, append newer ones
+
+        A bar with the same timestamp as the last stored bar overwrites it
+        in place, so a bar that was still forming when first stored picks
+        up its later close/high/low/volume. Older bars are ignored.
+
+        Args:
+            symbol: Stock ticker symbol
+            interval: Bar interval
+            bars: DataFrame with a timestamp column (or DatetimeIndex) and OHLCV columns
+
+        Returns:
+            int: Number of rows written (the replaced last bar plus appended rows)
+        """
+        if bars is None or bars.empty:
+            return 0
+
+        frame = _normalize_bars(bars)
+        path = self.partition_path(symbol, interval)
+
+        with self._lock(path):
+            os.makedirs(path, exist_ok=True)
+            meta = self._read_meta(path)
+            rows = int(meta.get('rows', 0))
+
+            timestamps = frame['timestamp'].to_numpy()
+            start = rows
+            if rows:
+                last = np.memmap(os.path.join(path, 'timestamp.bin'), dtype=COLUMNS['timestamp'],
+                                 mode='r', shape=(rows,))[-1]
+                keep = timestamps >= last
+                frame = frame[keep]
+                timestamps = timestamps[keep]
+                if len(timestamps) and timestamps[0] == last:
+                    start = rows - 1
+
+            if frame.empty:
+                return 0
+
+            for column, dtype in COLUMNS.items():
+                column_path = os.path.join(path, f'{column}.bin')
+                # Drop any bytes from an interrupted append that meta.json never recorded
+                if os.path.exists(column_path):
+                    os.truncate(column_path, rows * dtype.itemsize)
+                values = timestamps if column == 'timestamp' else frame[column].to_numpy()
+                with open(column_path, 'r+b' if os.path.exists(column_path) else 'wb') as f:
+                    f.seek(start * dtype.itemsize)
+                    f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+            meta['rows'] = start + len(frame)
+            if frame.attrs.get('tz'):
+                meta['tz'] = frame.attrs['tz']
+            self._write_meta(path, meta)
+
+        return len(frame)
+
+    def delete(self, symbol: str, interval: str) -> None:
+        """Remove a partition"""
+        path = self.partition_path(symbol, interval)
+        with self._lock(path):
+            if os.path.isdir(path):
+                for name in os.listdir(path):
+                    os.remove(os.path.join(path, name))
+                os.rmdir(path)
+
+
+class BarBuffer:
+    """
+    In-memory, append-in-place bar frame for one (symbol, interval)
+
+    Columns live in preallocated NumPy arrays that grow geometrically, so
+    appending k new bars costs O(k). Frames handed out are views of the rows
+    present at the time; later appends write past them and regrowth or
+    trimming allocates fresh arrays, so earlier views keep their rows. The
+    one exception is the last bar: while it is still forming, a refresh
+    rewrites it in place, and views that include it see the new values.
+    """
+
+    def __init__(self, capacity: int = 4096, max_rows: int = 200_000):
+        self.max_rows = max_rows
+        self.rows = 0
+        self.tz: Optional[str] = None
+        self.refreshed_at: Optional[float] = None   # time.monotonic() of the last tail fetch
+        self.lock = threading.Lock()
+        self._arrays = {column: np.empty(capacity, dtype=dtype) for column, dtype in COLUMNS.items()}
+
+    @property
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        if self.rows == 0:
+            return None
+        return pd.Timestamp(int(self._arrays['timestamp'][self.rows - 1]), tz='UTC')
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.rows + extra
+        capacity = len(self._arrays['timestamp'])
+        if needed <= capacity:
+            return
+
+        keep_from = max(0, needed - self.max_rows)
+        new_capacity = max(needed - keep_from, min(capacity * 2, self.max_rows))
+        kept = self.rows - keep_from
+
+        for column, dtype in COLUMNS.items():
+            grown = np.empty(max(new_capacity, 1), dtype=dtype)
+            grown[:kept] = self._arrays[column][keep_from:self.rows]
+            self._arrays[column] = grown
+        self.rows = kept
+
+    def extend(self, bars: pd.DataFrame) -> int:
+        """
+        Upsert the tail: replace the last buffered bar, append newer ones
+
+        A bar with the same timestamp as the last buffered bar overwrites
+        it, so the forming bar tracks each refresh. Older bars are ignored.
+
+        Returns:
+            int: Number of rows written (the replaced last bar plus appended rows)
+        """
+        if bars is None or bars.empty:
+            return 0
+
+        frame = _normalize_bars(bars)
+        replaced = 0
+        if self.rows:
+            last = self._arrays['timestamp'][self.rows - 1]
+            frame = frame[frame['timestamp'].to_numpy() >= last]
+            if len(frame) and frame['timestamp'].iloc[0] == last:
+                for column in COLUMNS:
+                    self._arrays[column][self.rows - 1] = frame[column].iloc[0]
+                frame = frame.iloc[1:]
+                replaced = 1
+        if frame.empty:
+            return replaced
+
+        new_rows = len(frame)
+        if new_rows > self.max_rows:
+            frame = frame.iloc[-self.max_rows:]
+            new_rows = self.max_rows
+
+        self._reserve(new_rows)
+        for column in COLUMNS:
+            self._arrays[column][self.rows:self.rows + new_rows] = frame[column].to_numpy()
+        self.rows += new_rows
+
+        if frame.attrs.get('tz'):
+            self.tz = frame.attrs['tz']
+
+        return replaced + new_rows
+
+    def frame(self, period: Optional[str] = None) -> pd.DataFrame:
+        """Buffered bars as a DataFrame of views, optionally limited to a trailing period"""
+        timestamps = self._arrays['timestamp'][:self.rows]
+        lo = 0
+
+        if period is not None and self.rows:
+            window = period_to_timedelta(period)
+            if window is not None:
+                start = pd.Timestamp(int(timestamps[-1]), tz='UTC') - window
+                lo = int(np.searchsorted(timestamps, start.value, side='left'))
+
+        index = pd.DatetimeIndex(timestamps[lo:].view('datetime64[ns]'), tz='UTC')
+        data = {'timestamp': index.tz_convert(self.tz) if self.tz else index}
+        for column in COLUMNS:
+            if column != 'timestamp':
+                data[column] = self._arrays[column][lo:self.rows]
+
+        return pd.DataFrame(data, copy=False)
+
+
+_bar_buffers: Dict[tuple, BarBuffer] = {}
+_bar_buffers_lock = threading.Lock()
+
+
+def get_bar_buffer(symbol: str, interval: str) -> BarBuffer:
+    """Get the process-wide incremental buffer for a (symbol, interval)"""
+    with _bar_buffers_lock:
+        key = (symbol, interval)
+        if key not in _bar_buffers:
+            _bar_buffers[key] = BarBuffer()
+        return _bar_buffers[key]
+
+
+def _to_utc_ns(ts) -> int:
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return int(ts.tz_convert('UTC').value)
+
+
+def _timestamp_series(bars: pd.DataFrame) -> pd.Series:
+    if 'timestamp' in bars.columns:
+        return pd.to_datetime(bars['timestamp'])
+    return pd.Series(pd.to_datetime(bars.index), index=bars.index)
+
+
+def _normalize_bars(bars: pd.DataFrame) -> pd.DataFrame:
+    """Lower-case columns, UTC int64 nanosecond timestamps, sorted and deduplicated"""
+    frame = bars.copy()
+    frame.columns = [str(col).lower() for col in frame.columns]
+
+    ts = _timestamp_series(frame)
+    ts = ts.dt.tz_localize('UTC') if ts.dt.tz is None else ts.dt.tz_convert('UTC')
+    ts = ts.dt.tz_localize(None).astype('datetime64[ns]')
+
+    out = pd.DataFrame({'timestamp': ts.to_numpy().view('i8')})
+    for column in COLUMNS:
+        if column != 'timestamp':
+            out[column] = frame[column].to_numpy(dtype='f8') if column in frame.columns else np.nan
+
+    out = out.dropna(subset=['close'])
+    out = out.drop_duplicates(subset='timestamp', keep='last').sort_values('timestamp')
+    out = out.reset_index(drop=True)
+    out.attrs['tz'] = str(tz) if (tz := _timestamp_series(frame).dt.tz) is not None else None
+    return out
+
+
+_bar_store: Optional[BarStore] = None
+_bar_store_lock = threading.Lock()
+
+
+def get_bar_store() -> BarStore:
+    """Get the process-wide bar store (root from PULSETRADE_BAR_STORE, default .cache/bars)"""
+    global _bar_store
+    with _bar_store_lock:
+        if _bar_store is None:
+            _bar_store = BarStore()
+        return _bar_store
@@ -0,0 +1,228 @@
+"""
+Fetch Scheduler Module
+Runs market data requests on a bounded thread pool with per-provider rate limits
+
+Best Practices Implemented:
+- Bounded concurrency so the Streamlit script thread never blocks on serial I/O
+- Token-bucket rate limiting per provider (burst allowance + steady refill)
+- Request collapsing: simultaneous requests for the same key share one call
+- Thread-safe statistics for monitoring
+"""
+
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default limits per provider: (requests per second, burst capacity)
+DEFAULT_RATE_LIMITS = {
+    'yfinance': (2.0, 5.0),
+}
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Each request consumes one token; callers block until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens without waiting. Returns False if not enough are available."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, waiting for the bucket to refill if needed
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            bool: True if the tokens were taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            time.sleep(wait)
+
+
+class FetchScheduler:
+    """
+    Schedules provider requests on a bounded thread pool
+
+    - Each provider has its own TokenBucket; workers wait for a token
+      before calling the provider
+    - Requests are keyed; a request whose key is already in flight returns
+      the existing future instead of issuing a second call
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 rate_limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='pulse-fetch'
+        )
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._in_flight: Dict[Tuple[str, Hashable], Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {'submitted': 0, 'collapsed': 0, 'completed': 0, 'failed': 0}
+
+        for provider, (rate, capacity) in (rate_limits or DEFAULT_RATE_LIMITS).items():
+            self.register_provider(provider, rate, capacity)
+
+    def register_provider(self, provider: str, rate: float, capacity: float) -> None:
+        """Register (or replace) the rate limit for a provider"""
+        with self._lock:
+            self._buckets[provider] = TokenBucket(rate, capacity)
+
+    def _bucket(self, provider: str) -> TokenBucket:
+        with self._lock:
+            if provider not in self._buckets:
+                rate, capacity = DEFAULT_RATE_LIMITS.get(provider, (1.0, 1.0))
+                self._buckets[provider] = TokenBucket(rate, capacity)
+            return self._buckets[provider]
+
+    def _run(self, provider: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        self._bucket(provider).acquire()
+        return fn(*args, **kwargs)
+
+    def _on_done(self, flight_key: Tuple[str, Hashable], future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(flight_key) is future:
+                del self._in_flight[flight_key]
+            if future.exception() is not None:
+                self.stats['failed'] += 1
+            else:
+                self.stats['completed'] += 1
+
+    def submit(self, provider: str, key: Hashable, fn: Callable[..., Any],
+               *args: Any, **kwargs: Any) -> Future:
+        """
+        Schedule fn(*args, **kwargs) against a provider's rate limit
+
+        Args:
+            provider: Provider name used to select the rate limiter (e.g., 'yfinance')
+            key: Request identity; concurrent submits with the same key share one call
+            fn: Callable performing the request
+
+        Returns:
+            Future: Resolves to the return value of fn
+        """
+        flight_key = (provider, key)
+
+        with self._lock:
+            existing = self._in_flight.get(flight_key)
+            if existing is not None:
+                self.stats['collapsed'] += 1
+                return existing
+
+            future = self._executor.submit(self._run, provider, fn, args, kwargs)
+            self._in_flight[flight_key] = future
+            self.stats['submitted'] += 1
+
+        future.add_done_callback(lambda f: self._on_done(flight_key, f))
+        return future
+
+    def fetch(self, provider: str, key: Hashable, fn: Callable[..., Any],
+              *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Submit a request and wait for its result"""
+        return self.submit(provider, key, fn, *args, **kwargs).result(timeout=timeout)
+
+    def fetch_many(self, provider: str, requests: Dict[Hashable, Tuple[Callable[..., Any], tuple]],
+                   timeout: Optional[float] = None) -> Tuple[Dict[Hashable, Any], Dict[Hashable, str]]:
+        """
+        Run many requests concurrently and collect their results
+
+        Args:
+            provider: Provider name
+            requests: Key -> (fn, args) mapping
+            timeout: Maximum seconds to wait for each result
+
+        Returns:
+            tuple: (results, failures) keyed like `requests`; a failing request
+                   is reported in failures and never fails the others
+        """
+        futures = {
+            key: self.submit(provider, key, fn, *args)
+            for key, (fn, args) in requests.items()
+        }
+
+        results = {}
+        failures = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result(timeout=timeout)
+            except Exception as e:
+                logger.warning(f"{provider} request {key!r} failed: {e}")
+                failures[key] = str(e) or type(e).__name__
+
+        return results, failures
+
+    def in_flight(self) -> int:
+        """Number of requests currently queued or running"""
+        with self._lock:
+            return len(self._in_flight)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and release the worker threads"""
+        self._executor.shutdown(wait=wait)
+
+
+_scheduler: Optional[FetchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_fetch_scheduler() -> FetchScheduler:
+    """
+    Get the process-wide fetch scheduler
+
+    All Streamlit sessions share one pool and one set of rate limiters,
+    so limits hold across reruns and browser tabs.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FetchScheduler()
+        return _scheduler
@@ -0,0 +1,269 @@
+"""
+Quote Cache Module
+Process-wide, thread-safe cache shared by every Streamlit session
+
+Best Practices Implemented:
+- TTL freshness with a longer stale window (stale-while-revalidate)
+- LRU eviction bounded by entry count and approximate memory
+- Hit/miss/eviction counters for monitoring
+- Background refresh through the fetch scheduler (one refresh per key)
+"""
+
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future
+import sys
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60               # Seconds an entry is fresh
+DEFAULT_STALE_TTL = 900        # Seconds an expired entry may still be served
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes"""
+    memory_usage = getattr(value, 'memory_usage', None)
+    if callable(memory_usage):
+        # pandas DataFrame / Series
+        try:
+            usage = memory_usage(index=True, deep=False)
+            return int(usage.sum() if hasattr(usage, 'sum') else usage)
+        except Exception:
+            pass
+
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items()
+        )
+
+    return sys.getsizeof(value)
+
+
+class QuoteCache:
+    """
+    Thread-safe TTL + LRU cache
+
+    Entries are fresh for `ttl` seconds and may be served as stale for up
+    to `stale_ttl` seconds while a background refresh replaces them.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL,
+                 stale_ttl: float = DEFAULT_STALE_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # key -> (value, stored_at, size_bytes)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing = set()
+        self._lock = threading.RLock()
+        self.stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'refreshes': 0,
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, allow_stale=True, record=False) is not None
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, allow_stale=True, record=False)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.stats['evictions'] += 1
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least-recently-used entries past the bounds"""
+        size = _estimate_size(value)
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+
+            self._entries[key] = (value, time.monotonic(), size)
+            self._bytes += size
+            self._evict()
+
+    def lookup(self, key: Hashable, record: bool = True) -> Tuple[Optional[Any], str]:
+        """
+        Look up a key and report its freshness
+
+        Returns:
+            tuple: (value, status) where status is 'fresh', 'stale' or 'miss'.
+                   Entries older than stale_ttl are dropped and count as a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if record:
+                    self.stats['misses'] += 1
+                return None, 'miss'
+
+            value, stored_at, size = entry
+            age = time.monotonic() - stored_at
+
+            if age > self.stale_ttl:
+                del self._entries[key]
+                self._bytes -= size
+                if record:
+                    self.stats['misses'] += 1
+                return None, 'miss'
+
+            self._entries.move_to_end(key)
+
+            if age <= self.ttl:
+                if record:
+                    self.stats['hits'] += 1
+                return value, 'fresh'
+
+            if record:
+                self.stats['stale_hits'] += 1
+            return value, 'stale'
+
+    def get(self, key: Hashable, allow_stale: bool = False, record: bool = True) -> Optional[Any]:
+        """Get a value, or None if missing (or stale and allow_stale is False)"""
+        value, status = self.lookup(key, record=record)
+        if status == 'fresh' or (status == 'stale' and allow_stale):
+            return value
+        return None
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Optional[Any]:
+        new_value = loader()
+        if new_value is not None:
+            self.set(key, new_value)
+        return new_value
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any],
+                    submit: Optional[Callable[[Callable[[], Any]], Future]] = None) -> Optional[Any]:
+        """
+        Get a value, loading it when missing or expired
+
+        A stale entry is returned immediately and reloaded in the background
+        (one refresh per key at a time). Loads run through `submit` when it
+        is given, e.g. lambda job: scheduler.submit(provider, key, job), so
+        they share the caller's thread pool and rate limits; otherwise a miss
+        is loaded inline and stale entries are reloaded inline too.
+
+        Args:
+            key: Cache key
+            loader: Callable returning the new value (None means "not available")
+            submit: Optional hook that schedules a zero-argument job and returns a Future
+
+        Returns:
+            The cached or freshly loaded value, None if nothing is available
+        """
+        value, status = self.lookup(key)
+
+        if status == 'fresh':
+            return value
+
+        if status == 'stale' and submit is not None:
+            self._schedule_refresh(key, loader, submit)
+            return value
+
+        if submit is None:
+            new_value = self._load(key, loader)
+        else:
+            new_value = submit(lambda: self._load(key, loader)).result()
+
+        return new_value if new_value is not None else value
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Any],
+                          submit: Callable[[Callable[[], Any]], Future]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.stats['refreshes'] += 1
+
+        def job() -> Optional[Any]:
+            try:
+                return self._load(key, loader)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {key!r}: {e}")
+                return None
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        try:
+            submit(job)
+        except Exception as e:
+            logger.warning(f"Could not schedule refresh for {key!r}: {e}")
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove a single entry"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus current size, suitable for the health dashboard"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['stale_hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hit_rate': (self.stats['hits'] + self.stats['stale_hits']) / lookups if lookups else 0.0,
+            }
+
+
+_quote_cache: Optional[QuoteCache] = None
+_quote_cache_lock = threading.Lock()
+
+
+def get_quote_cache() -> QuoteCache:
+    """
+    Get the process-wide quote cache
+
+    Shared by every LiveMarketData instance and Streamlit session, so
+    creating a new LiveMarketData per call no longer discards cached quotes.
+    """
+    global _quote_cache
+    with _quote_cache_lock:
+        if _quote_cache is None:
+            _quote_cache = QuoteCache()
+        return _quote_cache
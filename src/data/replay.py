@@ -0,0 +1,275 @@
+"""
+Bar Replay Module
+Replays stored OHLCV history through the live quote path (QuoteBus)
+
+Best Practices Implemented:
+- Streams the bar store in time-ordered chunks (generators over memmap
+  slices), never loading full histories into memory
+- Vectorized k-way merge of symbols per chunk
+- Speed control: 1x, 10x, ... or as fast as possible
+- Throughput reporting (bars/sec) for comparing pipeline changes
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from dataclasses import dataclass
+import threading
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .bar_store import BarStore, get_bar_store, interval_to_timedelta, _to_utc_ns
+from .quote_cache import QuoteCache
+from .tick_engine import QuoteBus, Tick, TickEngine, tick_to_quote
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 5000
+DEFAULT_MAX_WAIT = 2.0  # Longest real-time pause for a gap wider than one bar (overnight, weekend)
+
+
+@dataclass
+class BarChunk:
+    """Bars from several symbols merged in timestamp order"""
+    symbols: np.ndarray      # Symbol of each row (object array)
+    timestamps: np.ndarray   # int64 UTC nanoseconds, non-decreasing
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+def iter_merged_chunks(store: BarStore, symbols: Sequence[str], interval: str,
+                       start: Optional[pd.Timestamp] = None,
+                       end: Optional[pd.Timestamp] = None,
+                       chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[BarChunk]:
+    """
+    Yield bars for many symbols in global timestamp order, one chunk at a time
+
+    Each chunk covers a time window chosen so that no symbol contributes
+    more than `chunk_rows` rows; rows inside the window are merged with a
+    single stable argsort.
+    """
+    columns = {}
+    cursors = {}
+    stops = {}
+
+    for symbol in dict.fromkeys(symbols):
+        arrays = store.load_arrays(symbol, interval)
+        if arrays is None:
+            continue
+        ts = arrays['timestamp']
+        columns[symbol] = arrays
+        cursors[symbol] = 0 if start is None else int(np.searchsorted(ts, _to_utc_ns(start), side='left'))
+        stops[symbol] = len(ts) if end is None else int(np.searchsorted(ts, _to_utc_ns(end), side='left'))
+
+    while True:
+        active = [s for s in columns if cursors[s] < stops[s]]
+        if not active:
+            return
+
+        # Window upper bound: the earliest "chunk_rows-th" timestamp across symbols
+        bound = min(
+            columns[s]['timestamp'][min(cursors[s] + chunk_rows, stops[s]) - 1]
+            for s in active
+        )
+
+        parts = []
+        for s in active:
+            ts = columns[s]['timestamp']
+            lo = cursors[s]
+            hi = min(int(np.searchsorted(ts, bound, side='right')), stops[s])
+            if hi > lo:
+                parts.append((s, lo, hi))
+            cursors[s] = hi
+
+        timestamps = np.concatenate([columns[s]['timestamp'][lo:hi] for s, lo, hi in parts])
+        order = np.argsort(timestamps, kind='stable')
+
+        def merged(column: str) -> np.ndarray:
+            return np.concatenate([columns[s][column][lo:hi] for s, lo, hi in parts])[order]
+
+        yield BarChunk(
+            symbols=np.concatenate([np.full(hi - lo, s, dtype=object) for s, lo, hi in parts])[order],
+            timestamps=timestamps[order],
+            open=merged('open'),
+            high=merged('high'),
+            low=merged('low'),
+            close=merged('close'),
+            volume=merged('volume'),
+        )
+
+
+class BarReplaySource:
+    """
+    Tick source that replays stored bars (plug into TickEngine with rate=None)
+
+    Each next_batch() returns all bars sharing the next timestamp, as ticks.
+    With `speed` set, the call waits (bar gap / speed) seconds of real time.
+    Gaps wider than the bar interval (overnight, weekends, halts) are
+    capped at `max_wait`; speed=None replays as fast as possible.
+    """
+
+    def __init__(self, symbols: Sequence[str], interval: str,
+                 store: Optional[BarStore] = None,
+                 speed: Optional[float] = 1.0,
+                 start: Optional[pd.Timestamp] = None,
+                 end: Optional[pd.Timestamp] = None,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 max_wait: float = DEFAULT_MAX_WAIT):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive (or None for as fast as possible)")
+
+        self.store = store or get_bar_store()
+        self.speed = speed
+        self.max_wait = max_wait
+        self._bar_ns = int(interval_to_timedelta(interval).total_seconds() * 1e9)
+        self._chunks = iter_merged_chunks(self.store, symbols, interval, start, end, chunk_rows)
+        self._chunk: Optional[BarChunk] = None
+        self._bounds: np.ndarray = np.empty(0, dtype=np.int64)
+        self._group = 0
+        self._prev_close: Dict[str, float] = {}
+        self._last_ts: Optional[int] = None
+        self._stop = threading.Event()
+
+        self.bars = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.sim_time: Optional[pd.Timestamp] = None
+
+    def _next_chunk(self) -> bool:
+        for chunk in self._chunks:
+            if len(chunk):
+                self._chunk = chunk
+                # Group boundaries: indices where the timestamp changes
+                change = np.flatnonzero(np.diff(chunk.timestamps)) + 1
+                self._bounds = np.concatenate([[0], change, [len(chunk)]])
+                self._group = 0
+                return True
+        self._chunk = None
+        return False
+
+    def next_batch(self) -> List[Tick]:
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+
+        if self._chunk is None or self._group >= len(self._bounds) - 1:
+            if not self._next_chunk():
+                if self.finished_at is None:
+                    self.finished_at = time.monotonic()
+                return []
+
+        chunk = self._chunk
+        lo, hi = int(self._bounds[self._group]), int(self._bounds[self._group + 1])
+        self._group += 1
+
+        ts = int(chunk.timestamps[lo])
+        if self.speed is not None and self._last_ts is not None:
+            gap = ts - self._last_ts
+            delay = gap / 1e9 / self.speed
+            if gap > self._bar_ns:
+                delay = min(delay, self.max_wait)
+            if delay > 0:
+                self._stop.wait(delay)
+        self._last_ts = ts
+
+        stamp = pd.Timestamp(ts, tz='UTC')
+        self.sim_time = stamp
+        bar_time = stamp.to_pydatetime()
+
+        ticks = []
+        for i in range(lo, hi):
+            symbol = chunk.symbols[i]
+            price = float(chunk.close[i])
+            prev = self._prev_close.get(symbol, float(chunk.open[i]))
+            change = price - prev
+            ticks.append(Tick(
+                symbol=symbol,
+                price=price,
+                change=change,
+                change_pct=(change / prev * 100) if prev else 0.0,
+                volume=float(chunk.volume[i]),
+                timestamp=bar_time
+            ))
+            self._prev_close[symbol] = price
+
+        self.bars += len(ticks)
+        return ticks
+
+    def stop(self) -> None:
+        """Interrupt any pending speed wait"""
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Bars replayed and achieved throughput"""
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return {
+            'bars': self.bars,
+            'elapsed_seconds': elapsed,
+            'bars_per_sec': self.bars / elapsed if elapsed > 0 else 0.0,
+            'sim_time': self.sim_time,
+            'finished': self.finished_at is not None,
+        }
+
+
+class ReplaySession:
+    """
+    Replays stored bars onto a QuoteBus through a TickEngine
+
+    Subscribers (dashboard sessions, alert checks) receive replayed bars
+    exactly like live ticks. Optionally every tick also refreshes the
+    shared quote cache, so LiveMarketData.get_live_price sees replayed prices.
+    """
+
+    def __init__(self, symbols: Sequence[str], interval: str = '15m',
+                 speed: Optional[float] = 1.0,
+                 bus: Optional[QuoteBus] = None,
+                 store: Optional[BarStore] = None,
+                 quote_cache: Optional[QuoteCache] = None,
+                 start: Optional[pd.Timestamp] = None,
+                 end: Optional[pd.Timestamp] = None,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.source = BarReplaySource(
+            symbols, interval, store=store, speed=speed,
+            start=start, end=end, chunk_rows=chunk_rows
+        )
+        self.engine = TickEngine(self.source, bus=bus, rate=None)
+        self.bus = self.engine.bus
+        self._done = threading.Event()
+        self.engine.on_finish(self._done.set)
+
+        if quote_cache is not None:
+            self.bus.add_listener(
+                lambda ticks: [quote_cache.set(t.symbol, tick_to_quote(t)) for t in ticks]
+            )
+
+    def start(self) -> 'ReplaySession':
+        """Replay in the background"""
+        self.engine.start()
+        return self
+
+    def stop(self) -> None:
+        self.source.stop()
+        self.engine.stop()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the replay to finish. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def run(self) -> Dict[str, Any]:
+        """Replay synchronously on the calling thread and return throughput stats"""
+        while self.engine.step():
+            pass
+        self._done.set()
+        return self.get_stats()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.source.get_stats(), 'bus': self.bus.get_metrics()}
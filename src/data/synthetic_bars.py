@@ -0,0 +1,217 @@
+"""
+Synthetic Bar Engine
+Vectorized, seeded OHLCV generation for many symbols at once
+
+Best Practices Implemented:
+- One NumPy pass for N symbols x T bars (no per-symbol Python loops)
+- Correlated returns through a one-factor market model
+- Valid OHLC bars: high >= max(open, close), low <= min(open, close)
+- Reproducible output from a seed
+- Lazy chunked mode and float32 output for very large universes
+"""
+
+from typing import Iterator, List, Optional, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Base prices for known stocks (realistic ranges)
+BASE_PRICES = {
+    'AAPL': 178.0,
+    'GOOGL': 142.0,
+    'MSFT': 385.0,
+    'TSLA': 238.0,
+    'NVDA': 502.0,
+    'AMZN': 145.0,
+    'META': 312.0
+}
+
+DEFAULT_CHUNK_SYMBOLS = 1024
+
+
+@dataclass
+class SyntheticBars:
+    """OHLCV arrays of shape (symbols, bars) sharing one timestamp axis"""
+    symbols: List[str]
+    timestamps: pd.DatetimeIndex
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """Bars for one symbol in the standard timestamp/open/high/low/close/volume layout"""
+        i = self.symbols.index(symbol)
+        return pd.DataFrame({
+            'timestamp': self.timestamps,
+            'open': self.open[i],
+            'high': self.high[i],
+            'low': self.low[i],
+            'close': self.close[i],
+            'volume': self.volume[i]
+        })
+
+    def to_long(self) -> pd.DataFrame:
+        """All symbols as one long-format DataFrame (symbol, timestamp, OHLCV)"""
+        n, t = self.shape
+        return pd.DataFrame({
+            'symbol': np.repeat(np.asarray(self.symbols, dtype=object), t),
+            'timestamp': np.tile(self.timestamps.to_numpy(), n),
+            'open': self.open.ravel(),
+            'high': self.high.ravel(),
+            'low': self.low.ravel(),
+            'close': self.close.ravel(),
+            'volume': self.volume.ravel()
+        })
+
+
+class SyntheticBarEngine:
+    """
+    Generates correlated random-walk bars for a symbol universe
+
+    Each bar's log return is
+        r = sigma * (sqrt(c) * market + sqrt(1 - c) * idiosyncratic)
+    where the market factor is shared by every symbol, so any two symbols'
+    returns have correlation c (`correlation`). Output for a given
+    (seed, chunk_symbols) is fully reproducible.
+    """
+
+    def __init__(self, seed: Optional[int] = None,
+                 volatility: float = 0.004,
+                 correlation: float = 0.4,
+                 freq: str = '15min',
+                 dtype=np.float64,
+                 chunk_symbols: int = DEFAULT_CHUNK_SYMBOLS):
+        if not 0 <= correlation <= 1:
+            raise ValueError("correlation must be between 0 and 1")
+
+        self.seed = seed
+        self.volatility = volatility
+        self.correlation = correlation
+        self.freq = freq
+        self.dtype = np.dtype(dtype)
+        self.chunk_symbols = chunk_symbols
+
+    def _timestamps(self, periods: int, end: Optional[datetime]) -> pd.DatetimeIndex:
+        end = pd.Timestamp(end) if end is not None else pd.Timestamp(datetime.now()).floor(self.freq)
+        return pd.date_range(end=end, periods=periods, freq=self.freq)
+
+    def _streams(self, num_chunks: int):
+        """Independent generators: one for the market factor, one per symbol chunk"""
+        seq = np.random.SeedSequence(self.seed)
+        market_seq, *chunk_seqs = seq.spawn(num_chunks + 1)
+        return np.random.default_rng(market_seq), [np.random.default_rng(s) for s in chunk_seqs]
+
+    def _generate_block(self, rng: np.random.Generator, symbols: Sequence[str],
+                        market: np.ndarray, timestamps: pd.DatetimeIndex) -> SyntheticBars:
+        n, t = len(symbols), len(market)
+        dtype = self.dtype
+
+        # Base prices: known symbols keep realistic levels, others drawn from the seed
+        base = rng.uniform(50, 500, n).astype(dtype)
+        for i, symbol in enumerate(symbols):
+            if symbol in BASE_PRICES:
+                base[i] = BASE_PRICES[symbol]
+
+        c = self.correlation
+        idio = rng.standard_normal((n, t), dtype=dtype)
+        returns = self.volatility * (np.sqrt(c) * market[None, :] + np.sqrt(1 - c) * idio)
+
+        close = base[:, None] * np.exp(np.cumsum(returns, axis=1, dtype=dtype))
+
+        # Open gaps slightly from the previous close
+        open_ = np.empty_like(close)
+        open_[:, 0] = base
+        open_[:, 1:] = close[:, :-1]
+        open_ *= 1 + rng.normal(0, self.volatility * 0.25, (n, t)).astype(dtype)
+
+        # Wicks extend beyond the body so high/low always bound open and close
+        wick = np.abs(rng.normal(0, self.volatility * 0.5, (2, n, t))).astype(dtype)
+        high = np.maximum(open_, close) * (1 + wick[0])
+        low = np.minimum(open_, close) * (1 - wick[1])
+
+        volume = rng.lognormal(mean=np.log(2_500_000), sigma=0.4, size=(n, t)).astype(dtype)
+
+        return SyntheticBars(
+            symbols=list(symbols),
+            timestamps=timestamps,
+            open=open_,
+            high=high,
+            low=low,
+            close=close,
+            volume=volume
+        )
+
+    def iter_chunks(self, symbols: Sequence[str], periods: int,
+                    end: Optional[datetime] = None) -> Iterator[SyntheticBars]:
+        """
+        Lazily generate bars `chunk_symbols` symbols at a time
+
+        Peak memory is bounded by one chunk regardless of universe size.
+        """
+        symbols = list(symbols)
+        num_chunks = max(1, -(-len(symbols) // self.chunk_symbols))
+        market_rng, chunk_rngs = self._streams(num_chunks)
+
+        timestamps = self._timestamps(periods, end)
+        market = market_rng.standard_normal(periods, dtype=self.dtype)
+
+        for k, rng in enumerate(chunk_rngs):
+            chunk = symbols[k * self.chunk_symbols:(k + 1) * self.chunk_symbols]
+            if chunk:
+                yield self._generate_block(rng, chunk, market, timestamps)
+
+    def generate(self, symbols: Sequence[str], periods: int,
+                 end: Optional[datetime] = None) -> SyntheticBars:
+        """
+        Generate bars for every symbol as (N, T) arrays
+
+        Args:
+            symbols: Ticker symbols
+            periods: Number of bars per symbol
+            end: Timestamp of the last bar (default: now, floored to freq)
+
+        Returns:
+            SyntheticBars: Identical to concatenating iter_chunks() output
+        """
+        chunks = list(self.iter_chunks(symbols, periods, end))
+        if len(chunks) == 1:
+            return chunks[0]
+
+        return SyntheticBars(
+            symbols=[s for c in chunks for s in c.symbols],
+            timestamps=chunks[0].timestamps,
+            **{
+                field: np.concatenate([getattr(c, field) for c in chunks])
+                for field in ('open', 'high', 'low', 'close', 'volume')
+            }
+        )
+
+    def generate_frame(self, symbol: str, periods: int,
+                       end: Optional[datetime] = None) -> pd.DataFrame:
+        """Bars for a single symbol as a DataFrame"""
+        return self.generate([symbol], periods, end).frame(symbol)
+
+
+def generate_synthetic_bars(symbol: str, days: int = 30, seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    Generate 15-minute synthetic bars for one symbol
+
+    Args:
+        symbol: Stock ticker symbol
+        days: Number of days of 15-minute bars
+        seed: Optional seed for reproducible output
+
+    Returns:
+        DataFrame: timestamp, open, high, low, close, volume (attrs: source, interval)
+    """
+    frame = SyntheticBarEngine(seed=seed).generate_frame(symbol, days * 24 * 4)
+    frame.attrs.update(source='synthetic', interval='15m')
+    return frame
@@ -0,0 +1,415 @@
+"""
+Tick Engine Module
+Streams simulated or replayed quotes through an in-process pub/sub bus
+
+Best Practices Implemented:
+- One producer thread per process; every Streamlit session subscribes
+  instead of regenerating data on each rerun
+- Backpressure per subscriber: conflate to the latest tick per symbol,
+  or drop the oldest ticks from a bounded queue
+- Per-subscriber lag and drop metrics
+- Idle subscriptions (closed browser tabs) are expired automatically
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+import itertools
+import threading
+import time
+import logging
+
+import numpy as np
+
+from .synthetic_bars import BASE_PRICES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOLS = ['AAPL', 'GOOGL', 'MSFT', 'TSLA', 'NVDA', 'AMZN', 'META']
+DEFAULT_TICK_RATE = 2.0        # Ticks per second per symbol
+DEFAULT_IDLE_TIMEOUT = 300     # Seconds without a poll before a subscription expires
+
+CONFLATE = 'conflate'
+DROP_OLDEST = 'drop_oldest'
+
+
+@dataclass
+class Tick:
+    """A single quote update"""
+    symbol: str
+    price: float
+    change: float
+    change_pct: float
+    volume: float
+    timestamp: datetime
+    seq: int = 0
+    published_at: float = 0.0  # time.monotonic() when published, used for lag
+
+
+class Subscription:
+    """
+    A subscriber's view of the bus
+
+    Ticks are buffered until poll() is called. With the 'conflate' policy
+    only the newest pending tick per symbol is kept; with 'drop_oldest' the
+    queue holds at most `maxsize` ticks and the oldest are discarded.
+    """
+
+    def __init__(self, bus: 'QuoteBus', symbols: Iterable[str],
+                 policy: str = CONFLATE, maxsize: int = 1000):
+        if policy not in (CONFLATE, DROP_OLDEST):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+
+        self.bus = bus
+        self.symbols: Set[str] = set(symbols)
+        self.policy = policy
+        self.maxsize = maxsize
+        self.closed = False
+        self.last_poll = time.monotonic()
+
+        self._pending = OrderedDict() if policy == CONFLATE else deque(maxlen=maxsize)
+        self._latest: Dict[str, Tick] = {}
+        self._lock = threading.Lock()
+        self.metrics = {
+            'received': 0,
+            'delivered': 0,
+            'dropped': 0,
+            'conflated': 0,
+            'last_lag': 0.0,
+            'max_lag': 0.0,
+            'avg_lag': 0.0,
+        }
+
+    def _offer(self, tick: Tick) -> None:
+        """Called by the bus on the producer thread"""
+        with self._lock:
+            self.metrics['received'] += 1
+
+            if self.policy == CONFLATE:
+                if tick.symbol in self._pending:
+                    self.metrics['conflated'] += 1
+                    del self._pending[tick.symbol]
+                self._pending[tick.symbol] = tick
+                if len(self._pending) > self.maxsize:
+                    self._pending.popitem(last=False)
+                    self.metrics['dropped'] += 1
+            else:
+                if len(self._pending) == self.maxsize:
+                    self.metrics['dropped'] += 1
+                self._pending.append(tick)
+
+    def poll(self, max_items: Optional[int] = None) -> List[Tick]:
+        """
+        Take pending ticks without blocking
+
+        Args:
+            max_items: Maximum ticks to return (None returns everything pending)
+
+        Returns:
+            list: Ticks in arrival order
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            self.last_poll = now
+
+            if self.policy == CONFLATE:
+                items = list(self._pending.values())
+                if max_items is not None:
+                    items = items[:max_items]
+                for tick in items:
+                    del self._pending[tick.symbol]
+            else:
+                count = len(self._pending) if max_items is None else min(max_items, len(self._pending))
+                items = [self._pending.popleft() for _ in range(count)]
+
+            if items:
+                lags = [now - tick.published_at for tick in items]
+                delivered = self.metrics['delivered']
+                self.metrics['delivered'] = delivered + len(items)
+                self.metrics['last_lag'] = lags[-1]
+                self.metrics['max_lag'] = max(self.metrics['max_lag'], max(lags))
+                self.metrics['avg_lag'] = (
+                    self.metrics['avg_lag'] * delivered + sum(lags)
+                ) / self.metrics['delivered']
+
+                for tick in items:
+                    self._latest[tick.symbol] = tick
+
+        return items
+
+    def latest(self) -> Dict[str, Tick]:
+        """Newest tick seen per symbol (drains pending ticks first)"""
+        self.poll()
+        with self._lock:
+            return dict(self._latest)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.metrics,
+                'pending': len(self._pending),
+                'policy': self.policy,
+                'symbols': len(self.symbols),
+                'idle_seconds': time.monotonic() - self.last_poll,
+            }
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class QuoteBus:
+    """In-process pub/sub bus fanning out ticks by symbol"""
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._by_symbol: Dict[str, Set[Subscription]] = {}
+        self._subscriptions: Set[Subscription] = set()
+        self._listeners: List[Callable[[Sequence[Tick]], None]] = []
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, symbols: Iterable[str], policy: str = CONFLATE,
+                  maxsize: int = 1000) -> Subscription:
+        """Subscribe to a set of symbols"""
+        subscription = Subscription(self, symbols, policy=policy, maxsize=maxsize)
+
+        with self._lock:
+            self._subscriptions.add(subscription)
+            for symbol in subscription.symbols:
+                self._by_symbol.setdefault(symbol, set()).add(subscription)
+
+        return subscription
+
+    def add_listener(self, callback: Callable[[Sequence[Tick]], None]) -> None:
+        """Call `callback(ticks)` synchronously for every published batch (e.g. a cache sink)"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._remove(subscription)
+
+    def _remove(self, subscription: Subscription) -> None:
+        subscription.closed = True
+        self._subscriptions.discard(subscription)
+        for symbol in subscription.symbols:
+            subscribers = self._by_symbol.get(symbol)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_symbol[symbol]
+
+    def publish(self, ticks: Sequence[Tick]) -> None:
+        """Deliver a batch of ticks to every subscriber of each tick's symbol"""
+        now = time.monotonic()
+
+        with self._lock:
+            targets = {symbol: tuple(subs) for symbol, subs in self._by_symbol.items()}
+            listeners = tuple(self._listeners)
+
+        for tick in ticks:
+            tick.published_at = now
+            for subscription in targets.get(tick.symbol, ()):
+                subscription._offer(tick)
+
+        for listener in listeners:
+            try:
+                listener(ticks)
+            except Exception as e:
+                logger.warning(f"Quote bus listener failed: {e}")
+
+        self.published += len(ticks)
+
+    def expire_idle(self) -> int:
+        """Drop subscriptions that have not polled within idle_timeout"""
+        cutoff = time.monotonic() - self.idle_timeout
+
+        with self._lock:
+            idle = [s for s in self._subscriptions if s.last_poll < cutoff]
+            for subscription in idle:
+                self._remove(subscription)
+
+        return len(idle)
+
+    def symbols(self) -> Set[str]:
+        with self._lock:
+            return set(self._by_symbol)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        return {
+            'published': self.published,
+            'subscribers': len(subscriptions),
+            'per_subscriber': [s.get_metrics() for s in subscriptions],
+        }
+
+
+def tick_to_quote(tick: Tick) -> Dict[str, Any]:
+    """Convert a tick to the quote dict shape returned by LiveMarketData.get_live_price"""
+    return {
+        'symbol': tick.symbol,
+        'price': tick.price,
+        'change': tick.change,
+        'change_pct': tick.change_pct,
+        'volume': tick.volume,
+        'market_cap': 0,
+        'high': tick.price,
+        'low': tick.price,
+        'open': tick.price - tick.change,
+        'prev_close': tick.price - tick.change
+    }
+
+
+class SimulatedTickSource:
+    """
+    Random-walk quotes for a symbol set, one vectorized step per batch
+
+    Prices follow a geometric random walk from BASE_PRICES (unknown symbols
+    start from a seeded random level).
+    """
+
+    def __init__(self, symbols: Sequence[str], seed: Optional[int] = None,
+                 volatility: float = 0.0008):
+        self.rng = np.random.default_rng(seed)
+        self.volatility = volatility
+        self.symbols: List[str] = []
+        self.prices = np.empty(0)
+        self.prev_close = np.empty(0)
+        self._lock = threading.Lock()
+        self.add_symbols(symbols)
+
+    def add_symbols(self, symbols: Iterable[str]) -> None:
+        with self._lock:
+            new = [s for s in dict.fromkeys(symbols) if s not in self.symbols]
+            if not new:
+                return
+            base = self.rng.uniform(50, 500, len(new))
+            for i, symbol in enumerate(new):
+                base[i] = BASE_PRICES.get(symbol, base[i])
+            self.symbols.extend(new)
+            self.prices = np.concatenate([self.prices, base])
+            self.prev_close = np.concatenate([self.prev_close, base])
+
+    def next_batch(self) -> List[Tick]:
+        with self._lock:
+            n = len(self.symbols)
+            self.prices = self.prices * np.exp(self.rng.normal(0, self.volatility, n))
+            change = self.prices - self.prev_close
+            change_pct = change / self.prev_close * 100
+            volume = self.rng.poisson(500, n) * 100
+            symbols = list(self.symbols)
+            prices = self.prices.copy()
+
+        now = datetime.now()
+        return [
+            Tick(symbol=symbols[i], price=float(prices[i]), change=float(change[i]),
+                 change_pct=float(change_pct[i]), volume=float(volume[i]), timestamp=now)
+            for i in range(n)
+        ]
+
+
+class TickEngine:
+    """
+    Publishes batches from a tick source to a QuoteBus at a fixed rate
+
+    `source` is any object with next_batch() -> List[Tick]; an empty batch
+    (or StopIteration) ends the stream. rate=None publishes as fast as
+    subscribers are fed.
+    """
+
+    def __init__(self, source: Any, bus: Optional[QuoteBus] = None,
+                 rate: Optional[float] = DEFAULT_TICK_RATE):
+        self.source = source
+        self.bus = bus or QuoteBus()
+        self.rate = rate
+        self.batches = 0
+        self._seq = itertools.count(1)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._on_finish: List[Callable[[], None]] = []
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def on_finish(self, callback: Callable[[], None]) -> None:
+        """Register a callback run when the stream ends or the engine stops"""
+        self._on_finish.append(callback)
+
+    def step(self) -> int:
+        """Publish one batch synchronously. Returns the number of ticks published."""
+        try:
+            batch = self.source.next_batch()
+        except StopIteration:
+            batch = []
+
+        for tick in batch:
+            tick.seq = next(self._seq)
+
+        if batch:
+            self.bus.publish(batch)
+            self.batches += 1
+        return len(batch)
+
+    def _run(self) -> None:
+        interval = 1.0 / self.rate if self.rate else 0.0
+        next_at = time.monotonic()
+
+        try:
+            while not self._stop.is_set():
+                if self.step() == 0:
+                    break
+
+                if self.batches % 100 == 0:
+                    self.bus.expire_idle()
+
+                if interval:
+                    next_at += interval
+                    delay = next_at - time.monotonic()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                    else:
+                        next_at = time.monotonic()  # Fell behind; don't burst to catch up
+        except Exception as e:
+            logger.warning(f"Tick engine stopped on error: {e}")
+        finally:
+            for callback in self._on_finish:
+                callback()
+
+    def start(self) -> 'TickEngine':
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='pulse-ticks', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_tick_engine: Optional[TickEngine] = None
+_tick_engine_lock = threading.Lock()
+
+
+def get_tick_engine(symbols: Optional[Sequence[str]] = None) -> TickEngine:
+    """
+    Get the process-wide simulated tick engine, starting it on first use
+
+    Args:
+        symbols: Symbols that must be streamed (added to the simulation if new)
+
+    Returns:
+        TickEngine: Running engine; subscribe through engine.bus
+    """
+    global _tick_engine
+    with _tick_engine_lock:
+        if _tick_engine is None:
+            _tick_engine = TickEngine(SimulatedTickSource(DEFAULT_SYMBOLS))
+        if symbols:
+            _tick_engine.source.add_symbols(symbols)
+        return _tick_engine.start()
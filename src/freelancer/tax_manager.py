@@ -30,10 +30,21 @@ class TaxManager:
     SE_TAX_RATE = 0.153  # 15.3% (Social Security + Medicare)
     SE_DEDUCTION = 0.9235  # Only pay SE tax on 92.35% of net earnings
     
+    # 2024 long-term capital gains brackets (single), stacked on ordinary income
+    LONG_TERM_BRACKETS_SINGLE = [
+        (47025, 0.0),    # 0% up to $47,025
+        (518900, 0.15),  # 15% up to $518,900
+        (float('inf'), 0.20)  # 20% above
+    ]
+    
+    # Net capital loss deductible against ordinary income per year
+    CAPITAL_LOSS_LIMIT = 3000
+    
     @staticmethod
     def estimate_taxes(gross_income: float, deductible_expenses: float,
                       state_tax_rate: float = 0.05,
-                      filing_status: str = 'single') -> Dict[str, Any]:
+                      filing_status: str = 'single',
+                      capital_gains: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """
         Calculate comprehensive tax estimates
         
@@ -42,6 +53,8 @@ class TaxManager:
             deductible_expenses: Business expenses
             state_tax_rate: State income tax rate (default 5%)
             filing_status: 'single', 'married_joint', 'married_separate', 'head_of_household'
+            capital_gains: Realized 'short_term' and 'long_term' gains, e.g.
+                from TaxLotLedger.capital_gains(year)
             
         Returns:
             dict: Tax estimates broken down by type
@@ -56,23 +69,34 @@ class TaxManager:
         # Half of SE tax is deductible
         se_tax_deduction = se_tax / 2
         
+        # Net capital gains (no SE tax): short-term is ordinary income,
+        # long-term is taxed at preferential rates
+        short_term, long_term = TaxManager._net_capital_gains(capital_gains or {})
+        
         # Calculate AGI
-        agi = net_income - se_tax_deduction
+        agi = net_income - se_tax_deduction + short_term + long_term
         
         # Apply standard deduction
         taxable_income = max(0, agi - TaxManager.STANDARD_DEDUCTION)
+        ordinary_income = max(0, taxable_income - long_term)
         
         # Calculate federal income tax (progressive)
         federal_tax = TaxManager._calculate_progressive_tax(
-            taxable_income, 
+            ordinary_income, 
             TaxManager.TAX_BRACKETS_SINGLE
         )
         
+        # Long-term gains fill the capital gains brackets above ordinary income
+        capital_gains_tax = (
+            TaxManager._calculate_progressive_tax(taxable_income, TaxManager.LONG_TERM_BRACKETS_SINGLE)
+            - TaxManager._calculate_progressive_tax(ordinary_income, TaxManager.LONG_TERM_BRACKETS_SINGLE)
+        )
+        
         # Calculate state tax (simplified flat rate)
         state_tax = taxable_income * state_tax_rate
         
         # Total tax
-        total_tax = federal_tax + state_tax + se_tax
+        total_tax = federal_tax + state_tax + se_tax + capital_gains_tax
         
         # Effective tax rate
         effective_rate = (total_tax / gross_income * 100) if gross_income > 0 else 0
@@ -92,6 +116,9 @@ class TaxManager:
             'federal_tax': federal_tax,
             'state_tax': state_tax,
             'self_employment_tax': se_tax,
+            'short_term_gains': short_term,
+            'long_term_gains': long_term,
+            'capital_gains_tax': capital_gains_tax,
             'total_estimated_tax': total_tax,
             'effective_tax_rate': effective_rate,
             'quarterly_payment': quarterly,
@@ -101,10 +128,32 @@ class TaxManager:
             'breakdown': {
                 'federal_pct': (federal_tax / total_tax * 100) if total_tax > 0 else 0,
                 'state_pct': (state_tax / total_tax * 100) if total_tax > 0 else 0,
-                'se_pct': (se_tax / total_tax * 100) if total_tax > 0 else 0
+                'se_pct': (se_tax / total_tax * 100) if total_tax > 0 else 0,
+                'capital_gains_pct': (capital_gains_tax / total_tax * 100) if total_tax > 0 else 0
             }
         }
     
+    @staticmethod
+    def _net_capital_gains(capital_gains: Dict[str, float]) -> tuple:
+        """
+        Net short- and long-term gains against each other
+        
+        Returns:
+            tuple: (short-term amount added to ordinary income, which may be a
+            loss capped at CAPITAL_LOSS_LIMIT; long-term gain taxed at
+            capital gains rates)
+        """
+        short_term = capital_gains.get('short_term', 0.0)
+        long_term = capital_gains.get('long_term', 0.0)
+        net = short_term + long_term
+        
+        if net <= 0:
+            return max(net, -TaxManager.CAPITAL_LOSS_LIMIT), 0.0
+        
+        # A loss in one bucket offsets gains in the other
+        ordinary = max(0.0, min(short_term, net))
+        return ordinary, net - ordinary
+    
     @staticmethod
     def _calculate_progressive_tax(income: float, brackets: List[tuple]) -> float:
         """Calculate tax using progressive brackets"""
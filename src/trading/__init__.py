@@ -3,8 +3,17 @@ PulseTrade Trading Module
 Investment and portfolio management (reorganized from analytics)
 """
 
-from .portfolio_manager import PortfolioManager
+from .portfolio_manager import PortfolioManager, PortfolioHolding
+from .portfolio_book import PortfolioBook
+from .valuation import PortfolioValuationEngine, ValuationDiff
+from .monte_carlo import MonteCarloSimulator, MonteCarloResult
+from .rebalancer import Rebalancer, RebalancePlan, mean_variance_weights, risk_parity_weights
+from .tax_lots import TaxLotLedger
+from .backtester import (
+    Backtester, BacktestResult, BarPanel, CostModel, EmotionGate, Strategy,
+    SignalStrategy, MovingAverageCrossover, run_vectorized, parameter_sweep
+)
 from .market_data import get_market_data_hybrid, get_portfolio_live_prices
 
-__all__ = ['PortfolioManager', 'get_market_data_hybrid', 'get_portfolio_live_prices']
+__all__ = ['PortfolioManager', 'PortfolioHolding', 'PortfolioBook', 'PortfolioValuationEngine', 'ValuationDiff', 'MonteCarloSimulator', 'MonteCarloResult', 'Rebalancer', 'RebalancePlan', 'mean_variance_weights', 'risk_parity_weights', 'TaxLotLedger', 'Backtester', 'BacktestResult', 'BarPanel', 'CostModel', 'EmotionGate', 'Strategy', 'SignalStrategy', 'MovingAverageCrossover', 'run_vectorized', 'parameter_sweep', 'get_market_data_hybrid', 'get_portfolio_live_prices']
 
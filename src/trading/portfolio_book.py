@@ -0,0 +1,277 @@
+"""
+Portfolio Book Module
+Columnar, NumPy-backed portfolio representation
+
+Best Practices Implemented:
+- One array per field (symbol, shares, avg_price, current_price, account)
+  instead of a list of objects
+- Metrics, allocation and top/bottom-N in single vectorized passes
+- O(N) top/bottom-N selection with argpartition (no full sort)
+- Per-symbol and per-account aggregation through integer codes + bincount
+- Loads from and exports to the PortfolioHolding dataclass form
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from .portfolio_manager import PortfolioHolding
+
+DEFAULT_ACCOUNT = 'default'
+
+
+class PortfolioBook:
+    """
+    Portfolio lots stored as parallel NumPy arrays
+
+    Each row is one lot (a PortfolioHolding). The same symbol may appear in
+    several rows, e.g. across accounts; use by_symbol() to combine them.
+    """
+
+    def __init__(self, symbols: Sequence[str], shares: Sequence[float],
+                 avg_price: Sequence[float], current_price: Sequence[float],
+                 accounts: Optional[Sequence[str]] = None):
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.shares = np.asarray(shares, dtype=np.float64)
+        self.avg_price = np.asarray(avg_price, dtype=np.float64)
+        self.current_price = np.asarray(current_price, dtype=np.float64)
+        self.accounts = (np.full(len(self.symbols), DEFAULT_ACCOUNT, dtype=object)
+                         if accounts is None else np.asarray(accounts, dtype=object))
+
+        n = len(self.symbols)
+        if not all(len(a) == n for a in (self.shares, self.avg_price, self.current_price, self.accounts)):
+            raise ValueError("All PortfolioBook columns must have the same length")
+
+        self._codes: Optional[np.ndarray] = None
+        self._unique_symbols: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------------------
+    # Construction / export
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_holdings(cls, holdings: Iterable[PortfolioHolding],
+                      accounts: Optional[Sequence[str]] = None) -> 'PortfolioBook':
+        """Build a book from PortfolioHolding objects"""
+        holdings = list(holdings)
+        return cls(
+            symbols=[h.symbol for h in holdings],
+            shares=[h.shares for h in holdings],
+            avg_price=[h.avg_price for h in holdings],
+            current_price=[h.current_price for h in holdings],
+            accounts=accounts
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'PortfolioBook':
+        """Build a book from a DataFrame with symbol/shares/avg_price/current_price (and optional account) columns"""
+        return cls(
+            symbols=df['symbol'].to_numpy(),
+            shares=df['shares'].to_numpy(),
+            avg_price=df['avg_price'].to_numpy(),
+            current_price=df['current_price'].to_numpy(),
+            accounts=df['account'].to_numpy() if 'account' in df else None
+        )
+
+    def to_holdings(self) -> List[PortfolioHolding]:
+        """Export as PortfolioHolding objects"""
+        return [
+            PortfolioHolding(symbol=s, shares=float(q), avg_price=float(a), current_price=float(p))
+            for s, q, a, p in zip(self.symbols, self.shares, self.avg_price, self.current_price)
+        ]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Export lots with derived values as a DataFrame"""
+        return pd.DataFrame({
+            'symbol': self.symbols,
+            'account': self.accounts,
+            'shares': self.shares,
+            'avg_price': self.avg_price,
+            'current_price': self.current_price,
+            'market_value': self.market_value,
+            'cost_basis': self.cost_basis,
+            'gain_loss': self.gain_loss,
+            'gain_loss_pct': self.gain_loss_pct
+        })
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    # ------------------------------------------------------------------
+    # Derived columns
+    # ------------------------------------------------------------------
+
+    @property
+    def market_value(self) -> np.ndarray:
+        return self.shares * self.current_price
+
+    @property
+    def cost_basis(self) -> np.ndarray:
+        return self.shares * self.avg_price
+
+    @property
+    def gain_loss(self) -> np.ndarray:
+        return self.market_value - self.cost_basis
+
+    @property
+    def gain_loss_pct(self) -> np.ndarray:
+        cost = self.cost_basis
+        out = np.zeros(len(cost))
+        np.divide(self.market_value - cost, cost, out=out, where=cost != 0)
+        return out * 100
+
+    def _symbol_codes(self):
+        """Integer code per row and the sorted unique symbols (cached)"""
+        if self._codes is None:
+            self._unique_symbols, self._codes = np.unique(self.symbols.astype(str), return_inverse=True)
+        return self._unique_symbols, self._codes
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def update_prices(self, prices: Dict[str, float]) -> int:
+        """
+        Set current prices for every lot of the given symbols
+
+        Args:
+            prices: symbol -> latest price
+
+        Returns:
+            int: Number of lots updated
+        """
+        unique, codes = self._symbol_codes()
+        table = np.full(len(unique), np.nan)
+        for symbol, price in prices.items():
+            i = np.searchsorted(unique, symbol)
+            if i < len(unique) and unique[i] == symbol:
+                table[i] = price
+
+        new = table[codes]
+        mask = ~np.isnan(new)
+        self.current_price[mask] = new[mask]
+        return int(mask.sum())
+
+    # ------------------------------------------------------------------
+    # Analytics
+    # ------------------------------------------------------------------
+
+    def metrics(self) -> Dict[str, Any]:
+        """Same metrics as PortfolioManager.calculate_portfolio_metrics"""
+        num_holdings = len(self)
+        if num_holdings == 0:
+            return {
+                'total_value': 0,
+                'total_cost': 0,
+                'total_gain_loss': 0,
+                'total_gain_loss_pct': 0,
+                'diversity_score': 0,
+                'num_holdings': 0,
+                'largest_position_pct': 0
+            }
+
+        market_value = self.market_value
+        total_value = float(market_value.sum())
+        total_cost = float(self.cost_basis.sum())
+        total_gain_loss = total_value - total_cost
+        total_gain_loss_pct = (total_gain_loss / total_cost * 100) if total_cost > 0 else 0
+
+        if total_value > 0:
+            largest_position_pct = float(market_value.max() / total_value * 100)
+            holdings_score = min(num_holdings / 10 * 50, 50)
+            concentration_score = max(0, (30 - largest_position_pct) / 30 * 50)
+            diversity_score = holdings_score + concentration_score
+        else:
+            largest_position_pct = 0
+            diversity_score = 0
+
+        return {
+            'total_value': total_value,
+            'total_cost': total_cost,
+            'total_gain_loss': total_gain_loss,
+            'total_gain_loss_pct': total_gain_loss_pct,
+            'diversity_score': diversity_score,
+            'num_holdings': num_holdings,
+            'largest_position_pct': largest_position_pct
+        }
+
+    def allocation(self) -> pd.DataFrame:
+        """Allocation by lot: symbol, market_value, allocation_pct"""
+        market_value = self.market_value
+        total_value = market_value.sum()
+        pct = market_value / total_value * 100 if total_value > 0 else np.zeros(len(self))
+        return pd.DataFrame({
+            'symbol': self.symbols,
+            'market_value': market_value,
+            'allocation_pct': pct
+        })
+
+    def _select(self, n: int, largest: bool) -> np.ndarray:
+        """
+        Indices of the n best (or worst) lots by gain %, in rank order
+
+        Ties keep book order, matching a stable full sort.
+        """
+        key = self.gain_loss_pct
+        key = -key if largest else key
+        size = len(key)
+        if n <= 0 or size == 0:
+            return np.empty(0, dtype=np.intp)
+        if n >= size:
+            return np.argsort(key, kind='stable')
+
+        kth = np.partition(key, n - 1)[n - 1]
+        winners = np.flatnonzero(key < kth)
+        ties = np.flatnonzero(key == kth)[:n - len(winners)]
+        chosen = np.concatenate([winners, ties])
+        return chosen[np.argsort(key[chosen], kind='stable')]
+
+    def _performers(self, idx: np.ndarray) -> List[Dict[str, Any]]:
+        pct, gain, value = self.gain_loss_pct[idx], self.gain_loss[idx], self.market_value[idx]
+        return [{
+            'symbol': self.symbols[i],
+            'gain_loss_pct': float(pct[k]),
+            'gain_loss': float(gain[k]),
+            'market_value': float(value[k])
+        } for k, i in enumerate(idx)]
+
+    def top_performers(self, n: int = 3) -> List[Dict[str, Any]]:
+        """Best lots by gain %"""
+        return self._performers(self._select(n, largest=True))
+
+    def bottom_performers(self, n: int = 3) -> List[Dict[str, Any]]:
+        """Worst lots by gain %"""
+        return self._performers(self._select(n, largest=False))
+
+    def by_symbol(self) -> 'PortfolioBook':
+        """Combine lots of the same symbol (share-weighted average price)"""
+        unique, codes = self._symbol_codes()
+        k = len(unique)
+        shares = np.bincount(codes, weights=self.shares, minlength=k)
+        cost = np.bincount(codes, weights=self.cost_basis, minlength=k)
+        value = np.bincount(codes, weights=self.market_value, minlength=k)
+
+        avg_price = np.zeros(k)
+        current_price = np.zeros(k)
+        np.divide(cost, shares, out=avg_price, where=shares != 0)
+        np.divide(value, shares, out=current_price, where=shares != 0)
+
+        return PortfolioBook(unique.astype(object), shares, avg_price, current_price)
+
+    def account_metrics(self) -> pd.DataFrame:
+        """Value, cost and gain/loss per account"""
+        accounts, codes = np.unique(self.accounts.astype(str), return_inverse=True)
+        k = len(accounts)
+        value = np.bincount(codes, weights=self.market_value, minlength=k)
+        cost = np.bincount(codes, weights=self.cost_basis, minlength=k)
+        gain_pct = np.zeros(k)
+        np.divide(value - cost, cost, out=gain_pct, where=cost > 0)
+
+        return pd.DataFrame({
+            'account': accounts,
+            'num_holdings': np.bincount(codes, minlength=k),
+            'total_value': value,
+            'total_cost': cost,
+            'total_gain_loss': value - cost,
+            'total_gain_loss_pct': gain_pct * 100
+        })
@@ -3,11 +3,18 @@ Portfolio Management Module
 Handles investment portfolio tracking, analysis, and insights
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union, TYPE_CHECKING
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+import logging
+
+if TYPE_CHECKING:
+    from .portfolio_book import PortfolioBook
+    from .monte_carlo import MonteCarloResult
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class PortfolioHolding:
@@ -36,8 +43,24 @@ class PortfolioHolding:
         return (self.gain_loss / self.cost_basis) * 100
 
 
+Holdings = Union[List[PortfolioHolding], 'PortfolioBook']
+
+
+def _as_book(holdings: Holdings) -> 'PortfolioBook':
+    """Accept either a holdings list or a PortfolioBook"""
+    from .portfolio_book import PortfolioBook
+    if isinstance(holdings, PortfolioBook):
+        return holdings
+    return PortfolioBook.from_holdings(holdings)
+
+
 class PortfolioManager:
-    """Manages investment portfolio with analytics and insights"""
+    """
+    Manages investment portfolio with analytics and insights
+
+    Every method accepts a list of PortfolioHolding objects or a
+    PortfolioBook; computations run on the book's NumPy columns.
+    """
     
     @staticmethod
     def create_holding(symbol: str, shares: float, avg_price: float, 
@@ -51,179 +74,143 @@ class PortfolioManager:
         )
     
     @staticmethod
-    def calculate_portfolio_metrics(holdings: List[PortfolioHolding]) -> Dict[str, Any]:
+    def calculate_portfolio_metrics(holdings: Holdings) -> Dict[str, Any]:
         """
         Calculate comprehensive portfolio metrics
         
         Args:
-            holdings: List of PortfolioHolding objects
+            holdings: List of PortfolioHolding objects or a PortfolioBook
             
         Returns:
             dict: Portfolio metrics including total value, gain/loss, diversity score, etc.
         """
-        if not holdings:
-            return {
-                'total_value': 0,
-                'total_cost': 0,
-                'total_gain_loss': 0,
-                'total_gain_loss_pct': 0,
-                'diversity_score': 0,
-                'num_holdings': 0,
-                'largest_position_pct': 0
-            }
-        
-        total_value = sum(h.market_value for h in holdings)
-        total_cost = sum(h.cost_basis for h in holdings)
-        total_gain_loss = total_value - total_cost
-        total_gain_loss_pct = (total_gain_loss / total_cost * 100) if total_cost > 0 else 0
-        
-        # Calculate diversity score (higher is better, max 100)
-        # Based on: number of holdings, concentration risk, sector diversity
-        num_holdings = len(holdings)
-        
-        # Calculate concentration (largest position as % of portfolio)
-        if total_value > 0:
-            position_percentages = [h.market_value / total_value * 100 for h in holdings]
-            largest_position_pct = max(position_percentages)
-            
-            # Diversity score: penalize concentration, reward more holdings
-            # Perfect score: 10+ holdings, no position > 15%
-            holdings_score = min(num_holdings / 10 * 50, 50)  # Max 50 points
-            concentration_score = max(0, (30 - largest_position_pct) / 30 * 50)  # Max 50 points
-            diversity_score = holdings_score + concentration_score
-        else:
-            largest_position_pct = 0
-            diversity_score = 0
-        
-        return {
-            'total_value': total_value,
-            'total_cost': total_cost,
-            'total_gain_loss': total_gain_loss,
-            'total_gain_loss_pct': total_gain_loss_pct,
-            'diversity_score': diversity_score,
-            'num_holdings': num_holdings,
-            'largest_position_pct': largest_position_pct
-        }
+        # Diversity score (higher is better, max 100): penalize concentration,
+        # reward more holdings. Perfect score: 10+ holdings, no position > 15%
+        return _as_book(holdings).metrics()
     
     @staticmethod
-    def get_top_performers(holdings: List[PortfolioHolding], top_n: int = 3) -> List[Dict[str, Any]]:
+    def get_top_performers(holdings: Holdings, top_n: int = 3) -> List[Dict[str, Any]]:
         """Get top performing holdings by gain %"""
-        sorted_holdings = sorted(holdings, key=lambda h: h.gain_loss_pct, reverse=True)
-        
-        return [{
-            'symbol': h.symbol,
-            'gain_loss_pct': h.gain_loss_pct,
-            'gain_loss': h.gain_loss,
-            'market_value': h.market_value
-        } for h in sorted_holdings[:top_n]]
+        return _as_book(holdings).top_performers(top_n)
     
     @staticmethod
-    def get_bottom_performers(holdings: List[PortfolioHolding], bottom_n: int = 3) -> List[Dict[str, Any]]:
+    def get_bottom_performers(holdings: Holdings, bottom_n: int = 3) -> List[Dict[str, Any]]:
         """Get worst performing holdings by gain %"""
-        sorted_holdings = sorted(holdings, key=lambda h: h.gain_loss_pct)
-        
-        return [{
-            'symbol': h.symbol,
-            'gain_loss_pct': h.gain_loss_pct,
-            'gain_loss': h.gain_loss,
-            'market_value': h.market_value
-        } for h in sorted_holdings[:bottom_n]]
+        return _as_book(holdings).bottom_performers(bottom_n)
     
     @staticmethod
-    def calculate_allocation(holdings: List[PortfolioHolding]) -> pd.DataFrame:
+    def calculate_allocation(holdings: Holdings) -> pd.DataFrame:
         """Calculate portfolio allocation by position"""
-        total_value = sum(h.market_value for h in holdings)
-        
-        allocations = []
-        for h in holdings:
-            pct = (h.market_value / total_value * 100) if total_value > 0 else 0
-            allocations.append({
-                'symbol': h.symbol,
-                'market_value': h.market_value,
-                'allocation_pct': pct
-            })
-        
-        return pd.DataFrame(allocations)
+        return _as_book(holdings).allocation()
     
     @staticmethod
-    def generate_rebalance_suggestions(holdings: List[PortfolioHolding], 
-                                     target_allocation: Dict[str, float] = None) -> List[str]:
+    def generate_rebalance_suggestions(holdings: Holdings, 
+                                     target_allocation: Dict[str, float] = None,
+                                     cash: float = 0.0,
+                                     max_position_pct: float = 30.0) -> List[Dict[str, Any]]:
         """
         Generate rebalancing suggestions
         
+        Trades come from the Rebalancer: positions over `max_position_pct`
+        or more than 5 points off target are traded back to their target
+        (capped at `max_position_pct`) in whole shares.
+        
         Args:
-            holdings: List of PortfolioHolding objects
+            holdings: List of PortfolioHolding objects or a PortfolioBook
             target_allocation: Optional dict of symbol -> target % (e.g., {'AAPL': 20, 'GOOGL': 20})
+            cash: Cash available to fund buys
+            max_position_pct: Largest allowed position (% of portfolio)
             
         Returns:
-            List of rebalancing suggestions as strings
+            List of suggestion dicts with 'type' ('trade', 'diversification',
+            'balanced' or 'empty') and 'message'; trades also carry symbol,
+            action, shares, amount, current_pct and target_pct
         """
+        from .rebalancer import Rebalancer, SELL
+        
+        book = _as_book(holdings)
+        if len(book) == 0 or book.market_value.sum() + cash <= 0:
+            return [{'type': 'empty', 'message': "Portfolio is empty. Start by adding positions."}]
+        
+        targets = {s: pct / 100 for s, pct in (target_allocation or {}).items()
+                   if s in set(book.symbols)}
+        plan = Rebalancer(
+            max_weight=max_position_pct / 100,
+            tolerance=0.05,
+            trade_to_target=True
+        ).plan(book, targets, cash=cash)
+        
         suggestions = []
-        total_value = sum(h.market_value for h in holdings)
-        
-        if total_value == 0:
-            return ["Portfolio is empty. Start by adding positions."]
-        
-        # Check concentration risk
-        for h in holdings:
-            position_pct = (h.market_value / total_value * 100)
-            if position_pct > 30:
-                suggestions.append(
-                    f"⚠️ {h.symbol} is {position_pct:.1f}% of portfolio. "
-                    f"Consider reducing to under 30% for better diversification."
+        for trade in plan.trades.itertuples(index=False):
+            current_pct = trade.current_weight * 100
+            target_pct = trade.target_weight * 100
+            action = "Reduce" if trade.action == SELL else "Increase"
+            if current_pct > max_position_pct:
+                message = (
+                    f"⚠️ {trade.symbol} is {current_pct:.1f}% of portfolio. "
+                    f"Sell {trade.trade_shares:g} shares (${trade.trade_value:,.0f}) "
+                    f"to bring it to {target_pct:.1f}% (under {max_position_pct:.0f}%) "
+                    f"for better diversification."
                 )
+            else:
+                message = (
+                    f"🎯 {trade.symbol}: Current {current_pct:.1f}%, "
+                    f"Target {target_pct:.1f}%. {action} position by "
+                    f"{trade.trade_shares:g} shares (${trade.trade_value:,.0f})."
+                )
+            suggestions.append({
+                'type': 'trade',
+                'symbol': trade.symbol,
+                'action': trade.action,
+                'shares': float(trade.trade_shares),
+                'amount': float(trade.trade_value),
+                'current_pct': current_pct,
+                'target_pct': target_pct,
+                'message': message
+            })
         
         # Check number of holdings
-        if len(holdings) < 5:
-            suggestions.append(
-                f"💡 Consider adding more holdings. You have {len(holdings)}, "
-                f"ideal is 8-15 for good diversification."
-            )
-        elif len(holdings) > 20:
-            suggestions.append(
-                f"💡 You have {len(holdings)} holdings. Consider consolidating to "
-                f"8-15 positions for easier management."
-            )
-        
-        # Check target allocation if provided
-        if target_allocation:
-            for symbol, target_pct in target_allocation.items():
-                holding = next((h for h in holdings if h.symbol == symbol), None)
-                if holding:
-                    actual_pct = (holding.market_value / total_value * 100)
-                    diff = actual_pct - target_pct
-                    
-                    if abs(diff) > 5:  # More than 5% off target
-                        action = "reduce" if diff > 0 else "increase"
-                        suggestions.append(
-                            f"🎯 {symbol}: Current {actual_pct:.1f}%, "
-                            f"Target {target_pct:.1f}%. {action.capitalize()} position by "
-                            f"${abs(diff/100 * total_value):.0f}."
-                        )
+        num_symbols = len(plan.positions)
+        if num_symbols < 5:
+            suggestions.append({
+                'type': 'diversification',
+                'message': f"💡 Consider adding more holdings. You have {num_symbols}, "
+                           f"ideal is 8-15 for good diversification."
+            })
+        elif num_symbols > 20:
+            suggestions.append({
+                'type': 'diversification',
+                'message': f"💡 You have {num_symbols} holdings. Consider consolidating to "
+                           f"8-15 positions for easier management."
+            })
         
         if not suggestions:
-            suggestions.append("✅ Portfolio is well-balanced. No immediate rebalancing needed.")
+            suggestions.append({
+                'type': 'balanced',
+                'message': "✅ Portfolio is well-balanced. No immediate rebalancing needed."
+            })
         
         return suggestions
     
     @staticmethod
-    def simulate_performance(holdings: List[PortfolioHolding], 
+    def simulate_performance(holdings: Holdings, 
                            days: int = 30) -> pd.DataFrame:
         """
         Simulate historical portfolio performance
         
         Args:
-            holdings: List of PortfolioHolding objects
+            holdings: List of PortfolioHolding objects or a PortfolioBook
             days: Number of days to simulate
             
         Returns:
             DataFrame with columns: date, portfolio_value
         """
         dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-        total_cost = sum(h.cost_basis for h in holdings)
+        book = _as_book(holdings)
+        total_cost = book.cost_basis.sum()
         
         # Simulate realistic returns (mean reversion around current performance)
-        current_return = sum(h.gain_loss for h in holdings) / total_cost if total_cost > 0 else 0
+        current_return = book.gain_loss.sum() / total_cost if total_cost > 0 else 0
         daily_returns = np.random.normal(current_return/days, 0.02, days)
         
         portfolio_values = total_cost * (1 + daily_returns).cumprod()
@@ -232,4 +219,56 @@ class PortfolioManager:
             'date': dates,
             'portfolio_value': portfolio_values
         })
-
+    
+    @staticmethod
+    def simulate_monte_carlo(holdings: Holdings, days: int = 252,
+                             num_paths: int = 10_000,
+                             returns_history: Optional[pd.DataFrame] = None,
+                             daily_volatility: float = 0.02,
+                             correlation: float = 0.4,
+                             seed: Optional[int] = None,
+                             workers: Optional[int] = None) -> 'MonteCarloResult':
+        """
+        Monte Carlo distribution of future portfolio value
+        
+        Args:
+            holdings: List of PortfolioHolding objects or a PortfolioBook
+            days: Trading days to simulate
+            num_paths: Number of simulated paths
+            returns_history: Optional daily returns (columns: symbols) to bootstrap;
+                             without it returns are normal with `daily_volatility`
+                             and pairwise `correlation`. Holdings without history
+                             are left out (days with a missing return are dropped)
+                             and reported as the result's uncovered_pct
+            seed: Seed for reproducible results
+            workers: Process count for large runs
+            
+        Returns:
+            MonteCarloResult: Percentile bands, terminal values, probability of loss
+        """
+        from .monte_carlo import MonteCarloSimulator
+        
+        positions = _as_book(holdings).by_symbol()
+        symbols = [str(s) for s in positions.symbols]
+        allocation = dict(zip(symbols, positions.market_value))
+        
+        if returns_history is not None:
+            # Simulate the covered holdings only; zero-filling the rest would treat them as cash
+            covered = [s for s in symbols if s in returns_history.columns and returns_history[s].notna().any()]
+            history = returns_history[covered].dropna()
+            if covered and len(history) > 1:
+                result = MonteCarloSimulator.from_returns(
+                    covered, history.to_numpy(), allocation, seed=seed, workers=workers
+                ).run(days, num_paths)
+                total_value = positions.market_value.sum()
+                if total_value > 0:
+                    result.uncovered_pct = float((1 - result.initial_value / total_value) * 100)
+                return result
+            logger.warning("No usable return history for the holdings; using the normal model")
+        
+        n = len(symbols)
+        cov = daily_volatility ** 2 * (correlation * np.ones((n, n)) + (1 - correlation) * np.eye(n))
+        return MonteCarloSimulator(
+            positions.market_value, positions.market_value.sum(), cov=cov,
+            seed=seed, workers=workers
+        ).run(days, num_paths)
@@ -0,0 +1,545 @@
+"""
+Tax Lot Ledger Module
+Append-only fills, lot-level cost basis and realized/unrealized P&L
+
+Best Practices Implemented:
+- Fills, lots and realizations stored in growable NumPy columns
+  (a few dozen bytes per fill, no per-fill Python objects)
+- Per-symbol index of open lots, compacted lazily, so each sell only
+  touches the lots it consumes
+- FIFO, LIFO, HIFO and specific-ID lot relief
+- Vectorized bulk FIFO matching (interval intersection of cumulative
+  buy/sell quantities) for loading millions of fills
+- Short/long-term split and wash-sale flags for TaxManager.estimate_taxes
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FIFO = 'fifo'
+LIFO = 'lifo'
+HIFO = 'hifo'
+SPECIFIC = 'specific'
+METHODS = (FIFO, LIFO, HIFO, SPECIFIC)
+
+LONG_TERM_NS = 365 * 24 * 3600 * 10**9     # Held more than one year
+WASH_SALE_NS = 30 * 24 * 3600 * 10**9      # +/- 30 days around a loss sale
+QTY_EPSILON = 1e-9
+FIFO_WINDOW = 16  # Lots inspected before falling back to the full book
+
+
+class _Columns:
+    """Named growable NumPy columns sharing one row count"""
+
+    def __init__(self, dtypes: Dict[str, Any], capacity: int = 1024):
+        self._dtypes = dtypes
+        self._data = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+        self.size = 0
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        capacity = len(next(iter(self._data.values())))
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        for name, column in self._data.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._data[name] = grown
+
+    def append(self, **values) -> int:
+        self._reserve(1)
+        row = self.size
+        for name, value in values.items():
+            self._data[name][row] = value
+        self.size += 1
+        return row
+
+    def extend(self, **columns) -> np.ndarray:
+        n = len(next(iter(columns.values())))
+        self._reserve(n)
+        for name, values in columns.items():
+            self._data[name][self.size:self.size + n] = values
+        rows = np.arange(self.size, self.size + n)
+        self.size += n
+        return rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Live view of the filled part of a column"""
+        return self._data[name][:self.size]
+
+    def nbytes(self) -> int:
+        return sum(np.dtype(d).itemsize for d in self._dtypes.values()) * self.size
+
+
+class _OpenLots:
+    """Open lot rows of one symbol in acquisition order (closed rows compacted lazily)"""
+
+    __slots__ = ('rows', 'start', 'size', 'closed')
+
+    def __init__(self):
+        self.rows = np.empty(16, dtype=np.int64)
+        self.start = 0
+        self.size = 0
+        self.closed = 0
+
+    def add(self, rows: np.ndarray) -> None:
+        needed = self.size + len(rows)
+        if needed > len(self.rows):
+            grown = np.empty(max(needed, len(self.rows) * 2), dtype=np.int64)
+            grown[:self.size] = self.rows[:self.size]
+            self.rows = grown
+        self.rows[self.size:needed] = rows
+        self.size = needed
+
+    def view(self) -> np.ndarray:
+        return self.rows[self.start:self.size]
+
+    def compact(self, open_qty: np.ndarray, force: bool = False) -> None:
+        if not force:
+            # FIFO/LIFO close lots at the ends: drop those in O(closed)
+            while self.start < self.size and open_qty[self.rows[self.start]] <= QTY_EPSILON:
+                self.start += 1
+                self.closed -= 1
+            while self.size > self.start and open_qty[self.rows[self.size - 1]] <= QTY_EPSILON:
+                self.size -= 1
+                self.closed -= 1
+
+        if force or self.closed * 2 > self.size - self.start:
+            live = self.view()
+            live = live[open_qty[live] > QTY_EPSILON]
+            self.rows[:len(live)] = live
+            self.start = 0
+            self.size = len(live)
+            self.closed = 0
+
+
+def _to_ns(ts) -> int:
+    return pd.Timestamp(ts).value if ts is not None else time.time_ns()
+
+
+class TaxLotLedger:
+    """
+    Append-only ledger of fills with lot-level cost basis
+
+    Buys open lots (lot id = row number); sells relieve lots by the
+    ledger's method, or a per-sell override. Every relief is stored as a
+    realization row with proceeds, cost, holding period and lot id.
+    """
+
+    def __init__(self, method: str = FIFO):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}")
+        self.method = method
+
+        self._symbols: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._open: List[_OpenLots] = []
+
+        self.fills = _Columns({'symbol': np.int32, 'qty': np.float64, 'price': np.float64,
+                               'timestamp': np.int64})
+        self.lots = _Columns({'symbol': np.int32, 'fill': np.int64, 'qty': np.float64,
+                              'open_qty': np.float64, 'price': np.float64, 'timestamp': np.int64})
+        self.realized = _Columns({'symbol': np.int32, 'lot': np.int64, 'fill': np.int64,
+                                  'qty': np.float64, 'proceeds': np.float64, 'cost': np.float64,
+                                  'acquired': np.int64, 'sold': np.int64})
+
+    # ------------------------------------------------------------------
+    # Symbols
+    # ------------------------------------------------------------------
+
+    def _code(self, symbol: str) -> int:
+        code = self._codes.get(symbol)
+        if code is None:
+            code = len(self._symbols)
+            self._codes[symbol] = code
+            self._symbols.append(symbol)
+            self._open.append(_OpenLots())
+        return code
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    # ------------------------------------------------------------------
+    # Recording fills
+    # ------------------------------------------------------------------
+
+    def buy(self, symbol: str, qty: float, price: float, timestamp=None) -> int:
+        """Record a buy; returns the new lot id"""
+        if qty <= 0:
+            raise ValueError("Buy quantity must be positive")
+        code = self._code(symbol)
+        ts = _to_ns(timestamp)
+        fill = self.fills.append(symbol=code, qty=qty, price=price, timestamp=ts)
+        lot = self.lots.append(symbol=code, fill=fill, qty=qty, open_qty=qty, price=price, timestamp=ts)
+        self._open[code].add(np.array([lot]))
+        return lot
+
+    def sell(self, symbol: str, qty: float, price: float, timestamp=None,
+             method: Optional[str] = None,
+             lot_ids: Optional[Sequence[int]] = None) -> float:
+        """
+        Record a sell and relieve lots
+
+        Args:
+            symbol: Ticker
+            qty: Shares sold (positive)
+            price: Sale price per share
+            timestamp: Fill time (default: now)
+            method: Override the ledger's lot method for this sale
+            lot_ids: Lots to relieve, in order, for specific-ID (repeats are ignored)
+
+        Returns:
+            float: Realized gain/loss of this sale
+        """
+        if qty <= 0:
+            raise ValueError("Sell quantity must be positive")
+        method = method or (SPECIFIC if lot_ids is not None else self.method)
+        code = self._codes.get(symbol)
+        open_lots = self._open[code] if code is not None else None
+        open_qty = self.lots['open_qty']
+
+        if open_lots is None:
+            raise ValueError(f"Sell of {qty} {symbol} exceeds open quantity")
+
+        rows = open_lots.view()
+        if method in (FIFO, LIFO):
+            ordered = rows if method == FIFO else rows[::-1]
+            # Most sales close a handful of lots; avoid scanning deep books
+            candidates = ordered[:FIFO_WINDOW]
+            if open_qty[candidates].sum() < qty - QTY_EPSILON:
+                candidates = ordered
+        elif method == HIFO:
+            candidates = rows[np.argsort(-self.lots['price'][rows], kind='stable')]
+        elif method == SPECIFIC:
+            if lot_ids is None:
+                raise ValueError("lot_ids are required for specific-ID sales")
+            candidates = np.asarray(lot_ids, dtype=np.int64)
+            # A repeated id must not relieve its lot twice; keep first-occurrence order
+            _, first = np.unique(candidates, return_index=True)
+            candidates = candidates[np.sort(first)]
+            if np.any((candidates < 0) | (candidates >= self.lots.size)):
+                raise ValueError("lot_ids must be existing lot ids")
+            if np.any(self.lots['symbol'][candidates] != code):
+                raise ValueError("lot_ids must belong to the symbol being sold")
+        else:
+            raise ValueError(f"method must be one of {METHODS}")
+
+        # Take whole lots in candidate order until the sale is covered
+        available = open_qty[candidates]
+        before = np.cumsum(available) - available
+        take = np.clip(qty - before, 0, available)
+        used = take > QTY_EPSILON
+        lots, take = candidates[used], take[used]
+        if take.sum() < qty - QTY_EPSILON:
+            raise ValueError(f"Sell of {qty} {symbol} exceeds the quantity in the selected lots")
+
+        ts = _to_ns(timestamp)
+        fill = self.fills.append(symbol=code, qty=-qty, price=price, timestamp=ts)
+        open_qty[lots] -= take
+        open_lots.closed += int((open_qty[lots] <= QTY_EPSILON).sum())
+        open_lots.compact(open_qty)
+
+        cost = take * self.lots['price'][lots]
+        self.realized.extend(
+            symbol=np.full(len(lots), code, dtype=np.int32),
+            lot=lots,
+            fill=np.full(len(lots), fill),
+            qty=take,
+            proceeds=take * price,
+            cost=cost,
+            acquired=self.lots['timestamp'][lots],
+            sold=np.full(len(lots), ts)
+        )
+        return float(take.sum() * price - cost.sum())
+
+    def record(self, symbol: str, qty: float, price: float, timestamp=None, **kwargs) -> Union[int, float]:
+        """Signed-quantity entry point: qty > 0 buys, qty < 0 sells"""
+        if qty > 0:
+            return self.buy(symbol, qty, price, timestamp)
+        return self.sell(symbol, -qty, price, timestamp, **kwargs)
+
+    def load_fills(self, fills: pd.DataFrame) -> int:
+        """
+        Bulk-append fills (symbol, qty signed, price, timestamp), in time order
+
+        FIFO ledgers are matched fully vectorized per symbol; other methods
+        replay sells one by one.
+
+        Returns:
+            int: Number of fills loaded
+        """
+        fills = fills.sort_values('timestamp', kind='stable')
+        if self.method != FIFO:
+            for row in fills.itertuples(index=False):
+                self.record(row.symbol, row.qty, row.price, row.timestamp)
+            return len(fills)
+
+        for symbol, group in fills.groupby('symbol', sort=False):
+            self._load_fifo(str(symbol), group)
+        return len(fills)
+
+    def _load_fifo(self, symbol: str, group: pd.DataFrame) -> None:
+        code = self._code(symbol)
+        qty = group['qty'].to_numpy(dtype=np.float64)
+        price = group['price'].to_numpy(dtype=np.float64)
+        stamps = pd.DatetimeIndex(group['timestamp'])
+        if stamps.tz is None:
+            stamps = stamps.tz_localize('UTC')
+        ts = stamps.as_unit('ns').asi8
+
+        open_lots = self._open[code]
+        open_qty = self.lots['open_qty']
+        existing = open_lots.view().copy()
+
+        # Oversell check: running position never negative
+        start_position = open_qty[existing].sum()
+        if np.any(start_position + np.cumsum(qty) < -QTY_EPSILON):
+            raise ValueError(f"Sells of {symbol} exceed open quantity")
+
+        fill_rows = self.fills.extend(symbol=np.full(len(qty), code, dtype=np.int32),
+                                      qty=qty, price=price, timestamp=ts)
+        is_buy = qty > 0
+        new_lots = self.lots.extend(
+            symbol=np.full(is_buy.sum(), code, dtype=np.int32), fill=fill_rows[is_buy],
+            qty=qty[is_buy], open_qty=qty[is_buy], price=price[is_buy], timestamp=ts[is_buy]
+        )
+        open_qty = self.lots['open_qty']
+        queue = np.concatenate([existing, new_lots])
+        sells = ~is_buy
+
+        if sells.any():
+            # Lot k covers [B[k-1], B[k]) of cumulative bought quantity, sale j covers
+            # [S[j-1], S[j]) of cumulative sold quantity; FIFO pairs are the overlaps.
+            lot_end = np.cumsum(open_qty[queue])
+            sell_qty = -qty[sells]
+            sell_end = np.cumsum(sell_qty)
+            bounds = np.unique(np.concatenate([[0.0], lot_end, sell_end]))
+            bounds = bounds[bounds <= sell_end[-1] + QTY_EPSILON]
+            lo, hi = bounds[:-1], bounds[1:]
+            size = hi - lo
+            keep = size > QTY_EPSILON
+            lo, size = lo[keep], size[keep]
+
+            lot_idx = queue[np.minimum(np.searchsorted(lot_end, lo, side='right'), len(queue) - 1)]
+            sale = np.searchsorted(sell_end, lo, side='right')
+
+            sell_fills = fill_rows[sells]
+            sold_ts = ts[sells][sale]
+            self.realized.extend(
+                symbol=np.full(len(size), code, dtype=np.int32),
+                lot=lot_idx,
+                fill=sell_fills[sale],
+                qty=size,
+                proceeds=size * price[sells][sale],
+                cost=size * self.lots['price'][lot_idx],
+                acquired=self.lots['timestamp'][lot_idx],
+                sold=sold_ts
+            )
+            np.subtract.at(open_qty, lot_idx, size)
+
+        open_lots.add(new_lots)
+        open_lots.compact(open_qty, force=True)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def open_lots(self, symbol: Optional[str] = None) -> pd.DataFrame:
+        """Open lots: lot id, symbol, open quantity, cost price, acquired time"""
+        open_qty = self.lots['open_qty']
+        if symbol is not None:
+            code = self._codes.get(symbol)
+            rows = self._open[code].view() if code is not None else np.empty(0, dtype=np.int64)
+            rows = rows[open_qty[rows] > QTY_EPSILON]
+        else:
+            rows = np.flatnonzero(open_qty > QTY_EPSILON)
+
+        return pd.DataFrame({
+            'lot_id': rows,
+            'symbol': np.asarray(self._symbols, dtype=object)[self.lots['symbol'][rows]] if len(rows) else [],
+            'qty': open_qty[rows],
+            'cost_price': self.lots['price'][rows],
+            'acquired': pd.to_datetime(self.lots['timestamp'][rows], utc=True),
+        })
+
+    def positions(self) -> pd.DataFrame:
+        """Per-symbol open quantity and average cost (PortfolioHolding inputs)"""
+        open_qty = self.lots['open_qty']
+        codes = self.lots['symbol']
+        k = len(self._symbols)
+        qty = np.bincount(codes, weights=open_qty, minlength=k)
+        cost = np.bincount(codes, weights=open_qty * self.lots['price'], minlength=k)
+        avg = np.zeros(k)
+        np.divide(cost, qty, out=avg, where=qty > QTY_EPSILON)
+        held = qty > QTY_EPSILON
+        return pd.DataFrame({
+            'symbol': np.asarray(self._symbols, dtype=object)[held],
+            'shares': qty[held],
+            'avg_price': avg[held],
+            'cost_basis': cost[held],
+        })
+
+    def unrealized(self, prices: Dict[str, float]) -> pd.DataFrame:
+        """Unrealized gain/loss per symbol at the given prices, split short/long term"""
+        k = len(self._symbols)
+        price_table = np.full(k, np.nan)
+        for symbol, price in prices.items():
+            code = self._codes.get(symbol)
+            if code is not None:
+                price_table[code] = price
+
+        open_qty = self.lots['open_qty']
+        codes = self.lots['symbol']
+        live = (open_qty > QTY_EPSILON) & ~np.isnan(price_table[codes])
+        gain = np.where(live, open_qty * (price_table[codes] - self.lots['price']), 0.0)
+        long_term = (time.time_ns() - self.lots['timestamp']) > LONG_TERM_NS
+
+        return pd.DataFrame({
+            'symbol': self._symbols,
+            'unrealized': np.bincount(codes, weights=gain, minlength=k),
+            'short_term': np.bincount(codes, weights=np.where(long_term, 0.0, gain), minlength=k),
+            'long_term': np.bincount(codes, weights=np.where(long_term, gain, 0.0), minlength=k),
+        })
+
+    def _wash_sale_mask(self) -> np.ndarray:
+        """
+        Loss realizations with a buy of the same symbol within 30 days of the sale
+
+        The lot being sold does not count as the replacement purchase.
+        """
+        r = self.realized
+        loss = (r['proceeds'] - r['cost']) < 0
+        flags = np.zeros(r.size, dtype=bool)
+        if not loss.any():
+            return flags
+
+        buys = self.fills['qty'] > 0
+        buy_codes = self.fills['symbol'][buys]
+        buy_ts = self.fills['timestamp'][buys]
+        order = np.lexsort((buy_ts, buy_codes))
+        key = buy_codes[order].astype(np.int64) * 2**40 + (buy_ts[order] // 10**9)
+
+        idx = np.flatnonzero(loss)
+        code = r['symbol'][idx].astype(np.int64)
+        sold = r['sold'][idx] // 10**9
+        window = WASH_SALE_NS // 10**9
+        lo = np.searchsorted(key, code * 2**40 + sold - window, side='left')
+        hi = np.searchsorted(key, code * 2**40 + sold + window, side='right')
+        count = hi - lo
+
+        # Discount the sold lot's own purchase when it falls inside the window
+        acquired = r['acquired'][idx] // 10**9
+        own = np.abs(acquired - sold) <= window
+        flags[idx] = (count - own) > 0
+        return flags
+
+    def realized_gains(self, year: Optional[int] = None) -> pd.DataFrame:
+        """Realization rows (optionally for one tax year) with term and wash-sale flags"""
+        r = self.realized
+        sold = r['sold']
+        mask = np.ones(r.size, dtype=bool)
+        if year is not None:
+            start = pd.Timestamp(year=year, month=1, day=1, tz='UTC').value
+            end = pd.Timestamp(year=year + 1, month=1, day=1, tz='UTC').value
+            mask = (sold >= start) & (sold < end)
+
+        gain = r['proceeds'] - r['cost']
+        return pd.DataFrame({
+            'symbol': np.asarray(self._symbols, dtype=object)[r['symbol'][mask]] if mask.any() else [],
+            'lot_id': r['lot'][mask],
+            'qty': r['qty'][mask],
+            'proceeds': r['proceeds'][mask],
+            'cost': r['cost'][mask],
+            'gain': gain[mask],
+            'acquired': pd.to_datetime(r['acquired'][mask], utc=True),
+            'sold': pd.to_datetime(sold[mask], utc=True),
+            'long_term': (sold - r['acquired'])[mask] > LONG_TERM_NS,
+            'wash_sale': self._wash_sale_mask()[mask],
+        })
+
+    def capital_gains(self, year: Optional[int] = None) -> Dict[str, float]:
+        """
+        Net short- and long-term capital gains for TaxManager.estimate_taxes
+
+        Wash-sale losses are disallowed in full (basis adjustment of the
+        replacement lot is not modeled).
+        """
+        r = self.realized
+        sold = r['sold']
+        mask = np.ones(r.size, dtype=bool)
+        if year is not None:
+            start = pd.Timestamp(year=year, month=1, day=1, tz='UTC').value
+            end = pd.Timestamp(year=year + 1, month=1, day=1, tz='UTC').value
+            mask = (sold >= start) & (sold < end)
+
+        gain = (r['proceeds'] - r['cost'])[mask]
+        wash = self._wash_sale_mask()[mask]
+        long_term = ((sold - r['acquired']) > LONG_TERM_NS)[mask]
+        allowed = np.where(wash, 0.0, gain)
+
+        return {
+            'short_term': float(allowed[~long_term].sum()),
+            'long_term': float(allowed[long_term].sum()),
+            'wash_sale_disallowed': float(-gain[wash].sum()),
+            'proceeds': float(r['proceeds'][mask].sum()),
+        }
+
+    def memory_usage(self) -> int:
+        """Bytes used by stored fills, lots and realizations"""
+        return self.fills.nbytes() + self.lots.nbytes() + self.realized.nbytes()
+
+
+def benchmark_ledger(num_fills: int = 1_000_000, num_symbols: int = 500,
+                     seed: int = 0) -> Dict[str, Any]:
+    """
+    Time bulk FIFO loading, incremental sells and reporting on synthetic fills
+
+    Returns:
+        dict: Seconds per stage and bytes used
+    """
+    rng = np.random.default_rng(seed)
+    symbols = np.array([f'SYM{i:04d}' for i in range(num_symbols)], dtype=object)
+
+    # Every symbol opens with one buy, then trades are ~60% buys / 40% half-size sells
+    n = num_fills - num_symbols
+    codes = np.concatenate([np.arange(num_symbols), rng.integers(0, num_symbols, n)])
+    qty = np.concatenate([np.full(num_symbols, 1000.0), rng.integers(1, 100, n).astype(np.float64)])
+    is_sell = np.concatenate([np.zeros(num_symbols, dtype=bool), rng.random(n) < 0.4])
+    qty[is_sell] *= -0.5
+    fills = pd.DataFrame({
+        'symbol': symbols[codes],
+        'qty': qty,
+        'price': rng.uniform(10, 500, num_fills),
+        'timestamp': pd.Timestamp('2020-01-01', tz='UTC') + pd.to_timedelta(np.arange(num_fills), unit='min'),
+    })
+
+    results: Dict[str, Any] = {'fills': len(fills)}
+    ledger = TaxLotLedger(FIFO)
+    start = time.perf_counter()
+    ledger.load_fills(fills)
+    results['bulk_load_seconds'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(10_000):
+        symbol = symbols[i % num_symbols]
+        ledger.buy(symbol, 10, 100.0, pd.Timestamp('2023-01-01', tz='UTC'))
+        ledger.sell(symbol, 5, 110.0, pd.Timestamp('2023-01-02', tz='UTC'),
+                    method=(FIFO, LIFO, HIFO)[i % 3])
+    results['incremental_20k_fills_seconds'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ledger.capital_gains(2023)
+    ledger.unrealized({s: 100.0 for s in symbols})
+    results['reporting_seconds'] = time.perf_counter() - start
+    results['bytes'] = ledger.memory_usage()
+
+    logger.info(f"Tax lot ledger benchmark: {results}")
+    return results
@@ -0,0 +1,221 @@
+"""
+Portfolio Valuation Module
+Incremental revaluation of a portfolio on price updates
+
+Best Practices Implemented:
+- Per-symbol positions with running totals: a price update touches only
+  the symbols that changed, never the whole book
+- Weights derived on demand from the running total (O(1) per symbol)
+- Every revaluation publishes a diff (changed positions + new totals)
+- Periodic full resync to bound floating-point drift in running sums
+- Plugs into the QuoteBus as a listener for streaming ticks
+"""
+
+from typing import Any, Callable, Dict, List, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .portfolio_book import PortfolioBook
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESYNC_EVERY = 10_000  # Revaluations between full recomputes of the totals
+
+
+@dataclass
+class PositionChange:
+    """New state of one position after a price update"""
+    symbol: str
+    price: float
+    previous_price: float
+    market_value: float
+    gain_loss: float
+    gain_loss_pct: float
+    weight: float
+
+
+@dataclass
+class ValuationDiff:
+    """What changed in one revaluation"""
+    seq: int
+    timestamp: datetime
+    changes: Dict[str, PositionChange]
+    total_value: float
+    total_cost: float
+    total_gain_loss: float
+    total_gain_loss_pct: float
+    value_change: float
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+
+class PortfolioValuationEngine:
+    """
+    Keeps a portfolio's market values and totals current as prices arrive
+
+    Lots are aggregated per symbol once at construction. apply_prices()
+    then costs O(k) for k changed symbols. Weights of unchanged positions
+    move with the total; subscribers recompute them as
+    market_value / diff.total_value, or call weight(symbol).
+    """
+
+    def __init__(self, book: PortfolioBook, resync_every: int = DEFAULT_RESYNC_EVERY):
+        positions = book.by_symbol()
+        self.symbols: List[str] = [str(s) for s in positions.symbols]
+        self._index: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+
+        self.shares = positions.shares.copy()
+        self.cost_basis = positions.cost_basis
+        self.price = positions.current_price.copy()
+        self.market_value = self.shares * self.price
+
+        self.total_cost = float(self.cost_basis.sum())
+        self.total_value = float(self.market_value.sum())
+
+        self.resync_every = resync_every
+        self._updates_since_resync = 0
+        self._seq = 0
+        self._subscribers: List[Callable[[ValuationDiff], None]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_positions(cls, positions: Sequence[Dict[str, Any]], **kwargs) -> 'PortfolioValuationEngine':
+        """Build from dicts with symbol/shares/avg_price/current_price keys"""
+        return cls(PortfolioBook.from_frame(pd.DataFrame(list(positions))), **kwargs)
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[ValuationDiff], None]) -> None:
+        """Call `callback(diff)` after every revaluation that changed something"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ValuationDiff], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def on_ticks(self, ticks: Sequence[Any]) -> None:
+        """QuoteBus listener: bus.add_listener(engine.on_ticks)"""
+        self.apply_prices({t.symbol: t.price for t in ticks})
+
+    # ------------------------------------------------------------------
+    # Revaluation
+    # ------------------------------------------------------------------
+
+    @property
+    def total_gain_loss(self) -> float:
+        return self.total_value - self.total_cost
+
+    @property
+    def total_gain_loss_pct(self) -> float:
+        return (self.total_gain_loss / self.total_cost * 100) if self.total_cost > 0 else 0.0
+
+    def weight(self, symbol: str) -> float:
+        """Current portfolio weight of a symbol (0-1)"""
+        i = self._index[symbol]
+        return float(self.market_value[i] / self.total_value) if self.total_value else 0.0
+
+    def _resync(self) -> None:
+        self.total_value = float(self.market_value.sum())
+        self._updates_since_resync = 0
+
+    def apply_prices(self, prices: Dict[str, float]) -> ValuationDiff:
+        """
+        Revalue the positions whose price changed
+
+        Args:
+            prices: symbol -> new price; unknown symbols are ignored
+
+        Returns:
+            ValuationDiff: Changed positions and new totals (falsy if nothing changed)
+        """
+        with self._lock:
+            changed = []
+            value_change = 0.0
+
+            for symbol, price in prices.items():
+                i = self._index.get(symbol)
+                if i is None or price is None or price == self.price[i]:
+                    continue
+                new_value = self.shares[i] * price
+                value_change += new_value - self.market_value[i]
+                changed.append((symbol, i, self.price[i]))
+                self.price[i] = price
+                self.market_value[i] = new_value
+
+            if not changed:
+                return self._diff({}, 0.0)
+
+            self.total_value += value_change
+            self._updates_since_resync += 1
+            if self._updates_since_resync >= self.resync_every:
+                self._resync()
+
+            changes = {}
+            for symbol, i, previous in changed:
+                cost = self.cost_basis[i]
+                gain = self.market_value[i] - cost
+                changes[symbol] = PositionChange(
+                    symbol=symbol,
+                    price=float(self.price[i]),
+                    previous_price=float(previous),
+                    market_value=float(self.market_value[i]),
+                    gain_loss=float(gain),
+                    gain_loss_pct=float(gain / cost * 100) if cost else 0.0,
+                    weight=float(self.market_value[i] / self.total_value) if self.total_value else 0.0
+                )
+
+            self._seq += 1
+            diff = self._diff(changes, value_change)
+            subscribers = tuple(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(diff)
+            except Exception as e:
+                logger.warning(f"Valuation subscriber failed: {e}")
+
+        return diff
+
+    def _diff(self, changes: Dict[str, PositionChange], value_change: float) -> ValuationDiff:
+        return ValuationDiff(
+            seq=self._seq,
+            timestamp=datetime.now(),
+            changes=changes,
+            total_value=self.total_value,
+            total_cost=self.total_cost,
+            total_gain_loss=self.total_gain_loss,
+            total_gain_loss_pct=self.total_gain_loss_pct,
+            value_change=value_change
+        )
+
+    def snapshot(self) -> pd.DataFrame:
+        """Full per-position table (O(N); for display, not per tick)"""
+        with self._lock:
+            cost = self.cost_basis
+            gain = self.market_value - cost
+            gain_pct = np.zeros(len(cost))
+            np.divide(gain, cost, out=gain_pct, where=cost != 0)
+            avg_price = np.zeros(len(cost))
+            np.divide(cost, self.shares, out=avg_price, where=self.shares != 0)
+
+            return pd.DataFrame({
+                'symbol': self.symbols,
+                'shares': self.shares.copy(),
+                'avg_price': avg_price,
+                'current_price': self.price.copy(),
+                'market_value': self.market_value.copy(),
+                'cost_basis': cost,
+                'gain_loss': gain,
+                'gain_loss_pct': gain_pct * 100,
+                'weight': self.market_value / self.total_value if self.total_value else np.zeros(len(cost))
+            })
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from src.trading.backtester import Backtester, BarPanel, MovingAverageCrossover
+
+
+def _panel_with_late_listing() -> BarPanel:
+    """Two symbols on one calendar; the second only starts trading on bar 100"""
+    rng = np.random.default_rng(0)
+    n = 600
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, 2)), axis=0))
+    close[:100, 1] = np.nan
+    timestamps = pd.bdate_range('2020-01-01', periods=n)
+    return BarPanel(['EARLY', 'LATE'], timestamps, close, close, close, close, np.full_like(close, 1e6))
+
+
+def test_sma_starts_at_each_symbols_first_valid_bar():
+    panel = _panel_with_late_listing()
+    close = panel.filled_close()
+    sma = MovingAverageCrossover._sma(close, 20)
+
+    assert np.isnan(sma[:118, 1]).all()
+    np.testing.assert_allclose(sma[119, 1], close[100:120, 1].mean())
+    np.testing.assert_allclose(sma[-1], close[-20:].mean(axis=0))
+
+
+def test_late_listed_symbol_still_trades():
+    panel = _panel_with_late_listing()
+    strategy = MovingAverageCrossover(fast=10, slow=30)
+
+    signals = strategy.signals(panel)
+    assert np.count_nonzero(signals[:, 1]) > 0
+
+    result = Backtester(panel, strategy, initial_cash=100_000).run()
+    assert (result.trades['symbol'] == 'LATE').any()
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from src.data.bar_store import BarBuffer, BarStore
+
+
+def _bars(start: str, closes) -> pd.DataFrame:
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=len(closes), freq='15min', tz='UTC'),
+        'open': closes, 'high': closes + 1, 'low': closes - 1, 'close': closes, 'volume': 1000.0,
+    })
+
+
+def test_append_replaces_a_revised_last_bar(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.append('AAPL', '15m', _bars('2024-01-02 14:30', [100, 101, 102]))
+
+    # The last bar was still forming; a refresh returns it revised plus one new bar
+    revised = _bars('2024-01-02 15:00', [105, 106])
+    revised.loc[0, 'volume'] = 5000.0
+    assert store.append('AAPL', '15m', revised) == 2
+
+    loaded = store.load('AAPL', '15m')
+    np.testing.assert_allclose(loaded['close'], [100, 101, 105, 106])
+    assert loaded['volume'].iloc[2] == 5000.0
+    assert loaded['timestamp'].is_monotonic_increasing
+
+
+def test_append_ignores_bars_older_than_the_last_one(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.append('AAPL', '15m', _bars('2024-01-02 14:30', [100, 101, 102]))
+
+    assert store.append('AAPL', '15m', _bars('2024-01-02 14:30', [90, 91])) == 0
+    np.testing.assert_allclose(store.load('AAPL', '15m')['close'], [100, 101, 102])
+
+
+def test_buffer_extend_replaces_the_forming_last_bar():
+    buffer = BarBuffer(capacity=4)
+    buffer.extend(_bars('2024-01-02 14:30', [100, 101, 102]))
+
+    assert buffer.extend(_bars('2024-01-02 15:00', [103])) == 1
+    assert buffer.rows == 3
+    assert buffer.frame()['close'].iloc[-1] == 103
+
+    assert buffer.extend(_bars('2024-01-02 15:00', [104, 105, 106])) == 3
+    np.testing.assert_allclose(buffer.frame()['close'], [100, 101, 104, 105, 106])
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from src.data.fetch_scheduler import FetchScheduler
+
+
+class FakeProvider:
+    """Records every call; optionally holds calls open until released"""
+
+    def __init__(self, hold: bool = False):
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+        self._lock = threading.Lock()
+
+    def quote(self, symbol: str) -> dict:
+        with self._lock:
+            self.calls.append((symbol, time.monotonic()))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.release.wait(5)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+        return {'symbol': symbol, 'price': 100.0}
+
+
+def test_concurrent_requests_for_one_key_share_a_call():
+    provider = FakeProvider(hold=True)
+    scheduler = FetchScheduler(max_workers=4, rate_limits={'fake': (100.0, 10.0)})
+    try:
+        futures = [scheduler.submit('fake', ('quote', 'AAPL'), provider.quote, 'AAPL') for _ in range(10)]
+        provider.release.set()
+        results = [f.result(timeout=5) for f in futures]
+    finally:
+        scheduler.shutdown()
+
+    assert len(provider.calls) == 1
+    assert all(r == {'symbol': 'AAPL', 'price': 100.0} for r in results)
+    assert scheduler.stats['submitted'] == 1
+    assert scheduler.stats['collapsed'] == 9
+
+
+def test_throughput_is_held_to_the_token_bucket():
+    rate, burst, n = 20.0, 2.0, 12
+    provider = FakeProvider()
+    scheduler = FetchScheduler(max_workers=8, rate_limits={'fake': (rate, burst)})
+    try:
+        start = time.monotonic()
+        results, failures = scheduler.fetch_many(
+            'fake', {i: (provider.quote, (f'SYM{i}',)) for i in range(n)}, timeout=10
+        )
+    finally:
+        scheduler.shutdown()
+
+    assert len(results) == n and not failures
+    # The burst goes out at once; every later call waits for a refill
+    assert provider.calls[-1][1] - start >= (n - burst) / rate * 0.9
+    for i, (_, at) in enumerate(provider.calls):
+        assert i + 1 <= burst + (at - start) * rate + 1e-6
+
+
+def test_concurrent_calls_never_exceed_the_worker_ceiling():
+    provider = FakeProvider(hold=True)
+    scheduler = FetchScheduler(max_workers=3, rate_limits={'fake': (1000.0, 100.0)})
+    try:
+        futures = [scheduler.submit('fake', i, provider.quote, f'SYM{i}') for i in range(12)]
+        time.sleep(0.1)
+        assert provider.active == 3
+        assert scheduler.in_flight() == 12
+        provider.release.set()
+        for f in futures:
+            f.result(timeout=5)
+    finally:
+        scheduler.shutdown()
+
+    assert len(provider.calls) == 12
+    assert provider.max_active == 3
+    assert scheduler.in_flight() == 0
+    assert scheduler.stats['completed'] == 12
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.analytics.indicators import IndicatorEngine
+
+
+def _bars(n: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-02 09:30', periods=n, freq='15min'),
+        'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1e4,
+    })
+
+
+def _sma(engine: IndicatorEngine, bars: pd.DataFrame, source: str = 'live') -> np.ndarray:
+    return engine.compute('AAA', '15m', bars, ['sma:20'], source=source)['sma_20'].to_numpy()
+
+
+def _expected(bars: pd.DataFrame) -> np.ndarray:
+    return bars['close'].rolling(20).mean().to_numpy()
+
+
+def test_appended_bars_match_full_recompute():
+    engine, bars = IndicatorEngine(), _bars()
+    _sma(engine, bars.iloc[:200])
+    np.testing.assert_allclose(_sma(engine, bars), _expected(bars))
+
+
+def test_revised_closes_are_not_served_from_cache():
+    engine, bars = IndicatorEngine(), _bars()
+    _sma(engine, bars)
+    revised = bars.assign(close=bars['close'] * 2)
+    np.testing.assert_allclose(_sma(engine, revised), _expected(revised))
+
+
+def test_frame_with_gaps_is_aligned_by_timestamp():
+    engine, bars = IndicatorEngine(), _bars()
+    _sma(engine, bars)
+    gapped = bars.drop(index=range(150, 160)).reset_index(drop=True)
+    np.testing.assert_allclose(_sma(engine, gapped), _expected(gapped))
+
+
+def test_sources_do_not_share_entries():
+    engine, live, synthetic = IndicatorEngine(), _bars(seed=0), _bars(seed=1)
+    _sma(engine, live, source='live')
+    np.testing.assert_allclose(_sma(engine, synthetic, source='synthetic'), _expected(synthetic))
+    assert len(engine._entries) == 2
@@ -0,0 +1,20 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.performance import PerformanceIndex
+
+
+@pytest.mark.parametrize('tz', [None, 'UTC'])
+def test_trailing_ytd_works_for_naive_and_utc_dates(tz):
+    dates = pd.date_range('2023-06-01', '2024-06-30', freq='D', tz=tz)
+    index = PerformanceIndex(dates, 100 * np.cumprod(np.full(len(dates), 1.001)))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        trailing = index.trailing(end='2024-03-31')
+
+    # YTD runs from the 2023-12-31 close: 91 daily returns of 0.1%
+    assert trailing.loc['account_0', 'YTD'] == pytest.approx(1.001 ** 91 - 1)
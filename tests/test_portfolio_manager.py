@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.trading.portfolio_manager import PortfolioHolding, PortfolioManager
+
+
+def test_monte_carlo_leaves_out_holdings_without_history():
+    holdings = [PortfolioHolding('AAA', 100, 10.0, 10.0), PortfolioHolding('ZZZ', 100, 10.0, 10.0)]
+    rng = np.random.default_rng(0)
+    history = pd.DataFrame({'AAA': rng.normal(0, 0.02, 500)})
+    history.iloc[:5, 0] = np.nan
+
+    result = PortfolioManager.simulate_monte_carlo(holdings, days=20, num_paths=2000,
+                                                   returns_history=history, seed=1)
+
+    assert result.initial_value == pytest.approx(1000.0)
+    assert result.summary()['uncovered_pct'] == pytest.approx(50.0)
+    assert np.isfinite(result.terminal_values).all()
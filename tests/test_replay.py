@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from src.data.bar_store import BarStore
+from src.data.replay import BarReplaySource
+
+
+def _store_with_overnight_gap(root) -> BarStore:
+    day1 = pd.date_range('2024-01-02 20:00', periods=3, freq='15min', tz='UTC')
+    day2 = pd.date_range('2024-01-03 14:30', periods=3, freq='15min', tz='UTC')
+    close = np.arange(6, dtype=float) + 100
+    store = BarStore(str(root))
+    store.append('AAPL', '15m', pd.DataFrame({
+        'timestamp': day1.append(day2), 'open': close, 'high': close, 'low': close,
+        'close': close, 'volume': 1000.0,
+    }))
+    return store
+
+
+def _replay_waits(store: BarStore, speed: float) -> list:
+    source = BarReplaySource(['AAPL'], '15m', store=store, speed=speed, max_wait=2.0)
+    waits = []
+    source._stop.wait = waits.append
+    while source.next_batch():
+        pass
+    return waits
+
+
+def test_speed_scales_normal_bar_gaps(tmp_path):
+    store = _store_with_overnight_gap(tmp_path)
+    real_time = _replay_waits(store, speed=1.0)
+    fast = _replay_waits(store, speed=10.0)
+
+    assert real_time == [900.0, 900.0, 2.0, 900.0, 900.0]
+    assert fast == [90.0, 90.0, 2.0, 90.0, 90.0]
+    assert sum(fast) < sum(real_time)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from src.analytics.analytics_engine import PortfolioAnalytics
+from src.analytics.risk_engine import RiskEngine, returns_from_prices
+
+
+def _prices(scale: float, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range('2024-01-01', periods=120, tz='UTC')
+    close = 100 * np.cumprod(1 + rng.normal(0, scale, (120, 2)), axis=0)
+    return pd.DataFrame(close, index=timestamps, columns=['AAA', 'BBB'])
+
+
+def test_covariance_cache_distinguishes_data_on_the_same_dates():
+    engine = RiskEngine()
+    calm = returns_from_prices(_prices(0.01, 0))
+    volatile = returns_from_prices(_prices(0.03, 1))
+
+    cov_calm, _ = engine.covariance(calm)
+    cov_volatile, _ = engine.covariance(volatile)
+
+    assert engine.cov_misses == 2
+    assert cov_volatile[0, 0] > 4 * cov_calm[0, 0]
+
+    engine.covariance(returns_from_prices(_prices(0.01, 0)))
+    assert engine.cov_hits == 1
+
+
+def test_historical_var_scales_by_covered_value():
+    returns = returns_from_prices(_prices(0.01, 0))
+    holdings = pd.DataFrame({'symbol': ['AAA', 'BBB'], 'market_value': [1000.0, 1000.0],
+                             'gain_loss_pct': [1.0, 2.0]})
+    with_uncovered = pd.concat([holdings, pd.DataFrame(
+        {'symbol': ['ZZZ'], 'market_value': [2000.0], 'gain_loss_pct': [0.0]})])
+
+    covered = PortfolioAnalytics._historical_risk_metrics(holdings, returns)
+    partial = PortfolioAnalytics._historical_risk_metrics(with_uncovered, returns)
+
+    assert partial['var_95_daily'] == covered['var_95_daily']
+    assert covered['uncovered_pct'] == 0.0
+    assert partial['uncovered_pct'] == 50.0
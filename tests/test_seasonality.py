@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from src.analytics.seasonality import SeasonalityModel
+
+
+def test_partial_months_at_both_ends_do_not_skew_flat_income():
+    # 390 days of flat daily income from 11 January to 3 days into February
+    dates = pd.date_range(end='2025-02-03', periods=390, freq='D')
+    assert dates[0].day != 1
+    history = pd.DataFrame({'date': dates, 'amount': 100.0})
+
+    factors = SeasonalityModel(persist=False).fit('flat', history)
+
+    # Only month length moves a complete month's total (February ~0.92)
+    np.testing.assert_allclose(factors.month, 1.0, atol=0.1)
+    assert factors.month[1] > 0.9
+
+
+def test_incremental_update_matches_full_fit():
+    dates = pd.date_range('2023-03-17', '2025-02-03', freq='D')
+    rng = np.random.default_rng(0)
+    history = pd.DataFrame({'date': dates, 'amount': rng.gamma(2.0, 50.0, len(dates))})
+
+    incremental = SeasonalityModel(persist=False)
+    incremental.fit('u', history.iloc[:300])
+    incremental.fit('u', history)
+    full = SeasonalityModel(persist=False).fit('u', history)
+
+    assert incremental.incremental_updates == 1
+    np.testing.assert_allclose(incremental.factors('u').month, full.month)
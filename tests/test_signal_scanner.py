@@ -0,0 +1,30 @@
+import numpy as np
+
+from src.analytics.signal_scanner import SignalScanner, _ema, _rsi_last
+
+
+def _closes(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (2, 200)), axis=1))
+
+
+def test_leading_nan_row_is_seeded_at_its_first_bar():
+    close = _closes()
+    late = close.copy()
+    late[1, :60] = np.nan
+
+    np.testing.assert_allclose(_ema(late, 12)[1, 60:], _ema(close[1:, 60:], 12)[0])
+    np.testing.assert_allclose(_rsi_last(late, 14)[1], _rsi_last(close[1:, 60:], 14)[0])
+    np.testing.assert_allclose(_rsi_last(late, 14)[0], _rsi_last(close, 14)[0])
+
+
+def test_scan_scores_late_listings_and_halts():
+    close = _closes()
+    close[0, :60] = np.nan       # Late listing
+    close[1, 120:125] = np.nan   # Halt
+
+    result = SignalScanner().scan(close, ['LATE', 'HALT']).set_index('symbol')
+
+    assert np.isfinite(result['macd_hist']).all()
+    assert (result['macd_hist'] != 0).all()
+    assert np.isfinite(result['change_pct']).all()
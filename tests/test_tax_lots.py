@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.trading.tax_lots import FIFO, TaxLotLedger
+
+
+def _random_fills(n: int = 2000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    symbols = np.array(['AAA', 'BBB', 'CCC'], dtype=object)
+    codes = np.concatenate([np.arange(3), rng.integers(0, 3, n - 3)])
+    qty = np.concatenate([np.full(3, 500.0), rng.integers(1, 50, n - 3).astype(float)])
+    is_sell = np.concatenate([np.zeros(3, dtype=bool), rng.random(n - 3) < 0.4])
+    qty[is_sell] *= -0.5
+    return pd.DataFrame({
+        'symbol': symbols[codes],
+        'qty': qty,
+        'price': rng.uniform(10, 100, n),
+        'timestamp': pd.Timestamp('2022-01-01', tz='UTC') + pd.to_timedelta(np.arange(n), unit='h'),
+    })
+
+
+def test_bulk_fifo_load_matches_incremental_fills():
+    fills = _random_fills()
+    bulk = TaxLotLedger(FIFO)
+    bulk.load_fills(fills)
+
+    incremental = TaxLotLedger(FIFO)
+    for row in fills.itertuples(index=False):
+        incremental.record(row.symbol, row.qty, row.price, row.timestamp)
+
+    pd.testing.assert_frame_equal(bulk.positions(), incremental.positions())
+    for key, value in incremental.capital_gains().items():
+        assert bulk.capital_gains()[key] == pytest.approx(value)
+    # Lot ids differ (bulk loading numbers lots per symbol); lots are identified by acquisition time
+    by_lot = ['symbol', 'acquired', 'sold']
+    bulk_gains = bulk.realized_gains().groupby(by_lot)[['qty', 'gain']].sum()
+    incremental_gains = incremental.realized_gains().groupby(by_lot)[['qty', 'gain']].sum()
+    pd.testing.assert_frame_equal(bulk_gains, incremental_gains, check_exact=False)
+
+
+def test_loss_sale_with_repurchase_within_30_days_is_a_wash_sale():
+    ledger = TaxLotLedger(FIFO)
+    ledger.buy('AAA', 10, 100.0, '2024-01-02')
+    ledger.sell('AAA', 10, 80.0, '2024-03-01')
+    ledger.buy('AAA', 10, 82.0, '2024-03-15')
+    ledger.buy('BBB', 10, 50.0, '2024-01-02')
+    ledger.sell('BBB', 10, 40.0, '2024-06-01')
+
+    gains = ledger.realized_gains()
+    assert gains.set_index('symbol')['wash_sale'].to_dict() == {'AAA': True, 'BBB': False}
+
+    summary = ledger.capital_gains(2024)
+    assert summary['wash_sale_disallowed'] == pytest.approx(200.0)
+    assert summary['short_term'] == pytest.approx(-100.0)
+
+
+def test_specific_id_sale_relieves_a_repeated_lot_once():
+    ledger = TaxLotLedger(FIFO)
+    lot = ledger.buy('AAA', 10, 100.0, '2024-01-02')
+
+    with pytest.raises(ValueError):
+        ledger.sell('AAA', 20, 120.0, '2024-02-01', lot_ids=[lot, lot])
+
+    gain = ledger.sell('AAA', 10, 120.0, '2024-02-01', lot_ids=[lot, lot])
+    assert gain == pytest.approx(200.0)
+    assert ledger.positions().empty
+    assert ledger.realized_gains()['qty'].sum() == pytest.approx(10.0)